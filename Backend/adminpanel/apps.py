@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class AdminpanelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'adminpanel'
+
+    def ready(self):
+        # Register the background tasks (adminpanel.jobs) in web and worker processes
+        from . import tasks  # noqa: F401
+        # Register the system checks (adminpanel.checks)
+        from . import checks  # noqa: F401
+        from .models import Articles, Authors, Billboards, Categories, Comments, Contributors, Ebook, Magazines, Publications, Videos
+        from .pdf_pipeline import process_on_save
+        from .response_cache import invalidate_on_write
+        # Any save or delete of these invalidates the cached responses built from them
+        invalidate_on_write(Articles, Authors, Billboards, Categories, Comments, Contributors, Ebook, Magazines, Publications, Videos)
+        # Saving a magazine or ebook with a new PDF queues its page count and previews
+        process_on_save(Magazines, Ebook)
@@ -0,0 +1,20 @@
+"""
+Deployment checks (`manage.py check --deploy`) for settings the API depends on in production.
+"""
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+@register(deploy=True)
+def check_media_host(app_configs, **kwargs):
+    """
+    Without MEDIA_HOST, media URLs in API responses are relative to MEDIA_URL (most views
+    serialize without the request), and the client on another origin cannot load them.
+    """
+    if getattr(settings, 'MEDIA_HOST', ''):
+        return []
+    return [Error(
+        'MEDIA_HOST is not set: media URLs in API responses are relative paths.',
+        hint="Set MEDIA_HOST to the origin serving MEDIA_URL, e.g. 'https://api.example.com'.",
+        id='adminpanel.E001',
+    )]
@@ -0,0 +1,303 @@
+"""
+Resumable chunked uploads for large files (magazine and ebook PDFs).
+
+A client creates a session (POST /api/uploads/ with the file name, size and
+optionally its SHA-256), then PUTs the raw bytes of each numbered chunk to
+/api/uploads/<id>/chunks/<index>/, in any order and in parallel. Chunk `index` covers
+bytes [index * chunk_size, (index + 1) * chunk_size) and is written at that offset of a
+preallocated staging file as it is read from the request, so no request holds more than
+a small buffer or a worker for longer than one chunk. A failed chunk is simply PUT
+again; GET /api/uploads/<id>/ lists the chunks still missing after a reconnect.
+
+Completing the session hashes the staging file, checks it against the announced
+SHA-256 and moves it into the content-addressed uploads/ layout (adminpanel.uploads)
+without copying it.
+
+Sessions live on disk under MEDIA_ROOT/.staging/<id>/ (never served, see
+adminpanel.media), so every web worker sees the same state:
+
+    session.json    what the client announced
+    data.part       the staging file
+    chunks/<index>  one marker per chunk received, holding the chunk's SHA-256
+    result.json     the stored upload, once completed
+
+Abandoned sessions are removed by the periodic 'uploads.purge' job.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+
+from django.conf import settings
+
+from .uploads import store_staged_file
+
+CHUNKED_UPLOAD_CHUNK_SIZE = getattr(settings, 'CHUNKED_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024)
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = 64 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_SIZE = getattr(settings, 'CHUNKED_UPLOAD_MAX_SIZE', 1024 * 1024 * 1024)
+# Seconds after which an unfinished session is deleted
+CHUNKED_UPLOAD_EXPIRY = getattr(settings, 'CHUNKED_UPLOAD_EXPIRY', 24 * 60 * 60)
+
+# Bytes read from the request per write
+CHUNK_READ_SIZE = 64 * 1024
+
+UPLOAD_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class ChunkedUploadError(Exception):
+    """
+    A request the upload session cannot accept; `status_code` is the HTTP status to answer.
+    """
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def staging_root():
+    """
+    Helper function to get the directory chunked upload sessions are kept in.
+    """
+    return os.path.join(settings.MEDIA_ROOT, '.staging')
+
+
+def _session_dir(upload_id):
+    return os.path.join(staging_root(), upload_id)
+
+
+def _write_json(path, data):
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w') as handle:
+        json.dump(data, handle)
+    os.replace(temp_path, path)
+
+
+def create_session(filename, size, upload_parts, entity_type, entity_id, file_purpose='', sha256=None, chunk_size=None):
+    """
+    Start an upload of `size` bytes that will be stored under `upload_parts` (see
+    views.get_upload_parts). Returns the session.
+    """
+    if size <= 0 or size > CHUNKED_UPLOAD_MAX_SIZE:
+        raise ChunkedUploadError(f'size must be between 1 and {CHUNKED_UPLOAD_MAX_SIZE} bytes')
+    chunk_size = chunk_size or CHUNKED_UPLOAD_CHUNK_SIZE
+    if chunk_size < CHUNK_READ_SIZE or chunk_size > CHUNKED_UPLOAD_MAX_CHUNK_SIZE:
+        raise ChunkedUploadError(f'chunk_size must be between {CHUNK_READ_SIZE} and {CHUNKED_UPLOAD_MAX_CHUNK_SIZE} bytes')
+    if sha256 is not None:
+        sha256 = sha256.lower()
+        if not SHA256_RE.match(sha256):
+            raise ChunkedUploadError('sha256 must be the hex SHA-256 of the whole file')
+
+    upload_id = uuid.uuid4().hex
+    session_dir = _session_dir(upload_id)
+    os.makedirs(os.path.join(session_dir, 'chunks'))
+    # Preallocate (sparsely) so chunks can be written at their offsets in any order
+    with open(os.path.join(session_dir, 'data.part'), 'wb') as staging_file:
+        staging_file.truncate(size)
+
+    session = {
+        'upload_id': upload_id,
+        'filename': filename,
+        'extension': os.path.splitext(filename)[1].lower(),
+        'size': size,
+        'chunk_size': chunk_size,
+        'chunk_count': (size + chunk_size - 1) // chunk_size,
+        'sha256': sha256,
+        'upload_parts': upload_parts,
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'file_purpose': file_purpose,
+        'created_at': time.time(),
+    }
+    _write_json(os.path.join(session_dir, 'session.json'), session)
+    return session
+
+
+def load_session(upload_id):
+    """
+    Get the session `upload_id`, or raise ChunkedUploadError (404).
+    """
+    if not UPLOAD_ID_RE.match(upload_id or ''):
+        raise ChunkedUploadError('Upload session not found', 404)
+    try:
+        with open(os.path.join(_session_dir(upload_id), 'session.json')) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        raise ChunkedUploadError('Upload session not found', 404)
+
+
+def get_result(session):
+    """
+    Helper function to get (relative_path, content_hash, created) of a completed
+    session, or None.
+    """
+    try:
+        with open(os.path.join(_session_dir(session['upload_id']), 'result.json')) as handle:
+            result = json.load(handle)
+    except OSError:
+        return None
+    return result['relative_path'], result['content_hash'], result['created']
+
+
+def received_chunks(session):
+    """
+    Helper function to get the sorted indexes of the chunks received so far.
+    """
+    try:
+        names = os.listdir(os.path.join(_session_dir(session['upload_id']), 'chunks'))
+    except FileNotFoundError:
+        return []
+    return sorted(int(name) for name in names if name.isdigit())
+
+
+def chunk_length(session, index):
+    """
+    Helper function to get the number of bytes of chunk `index` (the last one is short).
+    """
+    return min(session['chunk_size'], session['size'] - index * session['chunk_size'])
+
+
+def get_session_status(session):
+    """
+    Progress of a session: the chunks received and missing, and the bytes received.
+    """
+    result = get_result(session)
+    # The chunk markers are removed once the upload is completed
+    received = list(range(session['chunk_count'])) if result is not None else received_chunks(session)
+    received_set = set(received)
+    return {
+        'upload_id': session['upload_id'],
+        'filename': session['filename'],
+        'size': session['size'],
+        'chunk_size': session['chunk_size'],
+        'chunk_count': session['chunk_count'],
+        'received_chunks': received,
+        'missing_chunks': [index for index in range(session['chunk_count']) if index not in received_set],
+        'bytes_received': sum(chunk_length(session, index) for index in received),
+        'completed': result is not None,
+    }
+
+
+def write_chunk(session, index, stream, content_length, offset=None, sha256=None):
+    """
+    Write chunk `index` from the request `stream` at its offset of the staging file.
+    `offset` (when the client sent one) must match the chunk's offset, and `sha256`
+    (when sent) the chunk's bytes; a chunk is only marked received once both check out.
+    """
+    session_dir = _session_dir(session['upload_id'])
+    if get_result(session) is not None or os.path.exists(os.path.join(session_dir, 'complete.lock')):
+        raise ChunkedUploadError('Upload already completed', 409)
+    if index < 0 or index >= session['chunk_count']:
+        raise ChunkedUploadError(f'Chunk index must be between 0 and {session["chunk_count"] - 1}')
+    start = index * session['chunk_size']
+    if offset is not None and offset != start:
+        raise ChunkedUploadError(f'Chunk {index} starts at offset {start}, not {offset}')
+    length = chunk_length(session, index)
+    if content_length != length:
+        raise ChunkedUploadError(f'Chunk {index} must be {length} bytes, got {content_length}')
+
+    digest = hashlib.sha256()
+    fd = os.open(os.path.join(session_dir, 'data.part'), os.O_WRONLY)
+    try:
+        position = start
+        remaining = length
+        while remaining:
+            data = stream.read(min(CHUNK_READ_SIZE, remaining))
+            if not data:
+                raise ChunkedUploadError(f'Chunk {index} ended after {length - remaining} of {length} bytes')
+            digest.update(data)
+            while data:
+                written = os.pwrite(fd, data, position)
+                position += written
+                remaining -= written
+                data = data[written:]
+    finally:
+        os.close(fd)
+
+    chunk_hash = digest.hexdigest()
+    if sha256 is not None and sha256.lower() != chunk_hash:
+        raise ChunkedUploadError(f'Checksum mismatch for chunk {index}', 422)
+    with open(os.path.join(session_dir, 'chunks', str(index)), 'w') as marker:
+        marker.write(chunk_hash)
+    return chunk_hash
+
+
+def complete_session(session):
+    """
+    Check that every chunk arrived and the file matches the announced SHA-256, then
+    move it into the uploads/ layout. Returns (relative_path, content_hash, created);
+    completing an already completed session returns the same result.
+    """
+    result = get_result(session)
+    if result is not None:
+        return result
+    session_dir = _session_dir(session['upload_id'])
+    missing = session['chunk_count'] - len(received_chunks(session))
+    if missing:
+        raise ChunkedUploadError(f'{missing} chunks are missing', 409)
+
+    lock_path = os.path.join(session_dir, 'complete.lock')
+    try:
+        os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        raise ChunkedUploadError('Upload is already being completed', 409)
+    try:
+        staging_path = os.path.join(session_dir, 'data.part')
+        digest = hashlib.sha256()
+        with open(staging_path, 'rb') as staging_file:
+            os.fsync(staging_file.fileno())
+            for block in iter(lambda: staging_file.read(1024 * 1024), b''):
+                digest.update(block)
+        content_hash = digest.hexdigest()
+
+        if session['sha256'] and session['sha256'] != content_hash:
+            # Some chunk was corrupted without a chunk checksum to catch it: start over
+            shutil.rmtree(os.path.join(session_dir, 'chunks'))
+            os.makedirs(os.path.join(session_dir, 'chunks'))
+            raise ChunkedUploadError('Checksum mismatch for the whole file; upload every chunk again', 422)
+
+        relative_path, content_hash, created = store_staged_file(
+            staging_path, session['upload_parts'], session['extension'], content_hash
+        )
+        _write_json(os.path.join(session_dir, 'result.json'), {
+            'relative_path': relative_path, 'content_hash': content_hash, 'created': created
+        })
+        shutil.rmtree(os.path.join(session_dir, 'chunks'), ignore_errors=True)
+        return relative_path, content_hash, created
+    finally:
+        os.remove(lock_path)
+
+
+def delete_session(session):
+    """
+    Cancel an upload and remove its staging files.
+    """
+    shutil.rmtree(_session_dir(session['upload_id']), ignore_errors=True)
+
+
+def purge_expired_sessions():
+    """
+    Delete sessions (completed or not) that received nothing for CHUNKED_UPLOAD_EXPIRY
+    seconds. Returns the number deleted.
+    """
+    cutoff = time.time() - CHUNKED_UPLOAD_EXPIRY
+    deleted = 0
+    try:
+        entries = list(os.scandir(staging_root()))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        if not UPLOAD_ID_RE.match(entry.name) or not entry.is_dir():
+            continue
+        try:
+            # Receiving a chunk adds a marker to chunks/, completing adds result.json
+            last_activity = max(entry.stat().st_mtime, os.stat(os.path.join(entry.path, 'chunks')).st_mtime)
+        except FileNotFoundError:
+            last_activity = entry.stat().st_mtime
+        if last_activity < cutoff:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            deleted += 1
+    return deleted
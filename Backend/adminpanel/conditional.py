@@ -0,0 +1,69 @@
+"""
+Conditional GET support (ETag / Last-Modified / 304) for read APIs.
+
+Validators come from the response cache versions of the models a response is built
+from (see response_cache), which every save and delete bumps. Reading them is one cache
+lookup, so a matching If-None-Match is answered with 304 before any rows are fetched or
+serialized, and no table is scanned to decide. Versions are nanosecond timestamps of the
+last write, which also gives Last-Modified. Detail views name the URL kwarg of their row
+(`lookup`); its updated_at, read by primary key, is added so writes made with update()
+are seen too. Responses that also change with the calendar (e.g. "previous months")
+name a `period` function returning the start of the current period.
+"""
+import hashlib
+from datetime import datetime, timezone
+
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from .response_cache import get_model_versions
+
+
+def _has_updated_at(model):
+    return any(field.name == 'updated_at' for field in model._meta.concrete_fields)
+
+
+def get_validators(request, models, lookup=None, kwargs=None, period=None):
+    """
+    Helper function to compute (etag, last_modified) for a request once.
+    With `lookup`, the updated_at of the first model's row named by that URL kwarg is
+    included as well; with `period`, the start of the current period.
+    """
+    cached = getattr(request, '_conditional_validators', None)
+    if cached is not None:
+        return cached
+
+    versions = get_model_versions(models)
+    parts = [request.get_full_path(), str(versions)]
+    last_modified = datetime.fromtimestamp(max(versions) / 1e9, tz=timezone.utc)
+
+    if lookup and _has_updated_at(models[0]):
+        row_updated_at = models[0]._default_manager.filter(pk=kwargs[lookup]).values_list('updated_at', flat=True).first()
+        parts.append(row_updated_at.isoformat() if row_updated_at else '')
+        if row_updated_at and row_updated_at > last_modified:
+            last_modified = row_updated_at
+
+    if period is not None:
+        period_start = period()
+        parts.append(period_start.isoformat())
+        if period_start > last_modified:
+            last_modified = period_start
+
+    etag = hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+    request._conditional_validators = (etag, last_modified)
+    return request._conditional_validators
+
+
+def conditional_response(*models, lookup=None, period=None):
+    """
+    Decorator for APIView.get handlers. Sends ETag and Last-Modified and answers
+    matching If-None-Match / If-Modified-Since with 304.
+    Apply above @cached_response so a 304 skips the cache lookup as well.
+    """
+    def etag_func(request, *args, **kwargs):
+        return get_validators(request, models, lookup, kwargs, period)[0]
+
+    def last_modified_func(request, *args, **kwargs):
+        return get_validators(request, models, lookup, kwargs, period)[1]
+
+    return method_decorator(condition(etag_func=etag_func, last_modified_func=last_modified_func))
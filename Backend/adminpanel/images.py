@@ -0,0 +1,188 @@
+"""
+Responsive derivatives of uploaded images (covers, author photos, billboards).
+
+Each content-addressed upload (see adminpanel.uploads) gets resized WebP and JPEG
+variants with EXIF stripped, at fixed widths:
+
+    uploads/derivatives/<entity>/<sha256>.<ext>/<variant>-<width>w.<webp|jpg>
+
+They are rendered by a background job after the upload ('images.derivatives', see
+adminpanel.tasks). The names are derived from the source path, and serve_media renders
+a variant on first request if the job has not run yet, so serializers publish srcset
+strings after reading only the source's header (once per process: the source never
+changes). A srcset lists the width each variant is rendered at, the source's own width
+when it is narrower. Derivatives of an immutable source are immutable too.
+
+Pillow is optional; without it no srcset is published (and serve_media redirects
+requests for variants to the original).
+"""
+import os
+import re
+from functools import lru_cache
+
+from django.conf import settings
+
+from .media import is_content_addressed, replace_atomically
+from .media_urls import resolve_media_path
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+# Variant name -> target width in pixels; images are never upscaled
+IMAGE_VARIANTS = getattr(settings, 'IMAGE_VARIANTS', {'thumb': 320, 'card': 640, 'hero': 1280})
+IMAGE_QUALITY = getattr(settings, 'IMAGE_QUALITY', 80)
+# srcset key / file extension -> Pillow format
+IMAGE_FORMATS = {'webp': 'WEBP', 'jpg': 'JPEG'}
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.jfif']
+
+DERIVATIVE_RE = re.compile(r'^uploads/derivatives/(?P<source>.+)/(?P<variant>[a-z]+)-(?P<width>\d+)w\.(?P<extension>[a-z]+)$')
+
+
+def derivative_path(relative_path, variant, extension):
+    """
+    Helper function to get the media path of one variant of an uploaded image.
+    """
+    source = relative_path[len('uploads/'):] if relative_path.startswith('uploads/') else relative_path
+    return f'uploads/derivatives/{source}/{variant}-{IMAGE_VARIANTS[variant]}w.{extension}'
+
+
+def parse_derivative_path(relative_path):
+    """
+    Helper function to map a derivative media path back to (source path, variant,
+    extension), or None when the path is not a current derivative.
+    """
+    match = DERIVATIVE_RE.match(relative_path)
+    if not match:
+        return None
+    variant, extension = match.group('variant'), match.group('extension')
+    if IMAGE_VARIANTS.get(variant) != int(match.group('width')) or extension not in IMAGE_FORMATS:
+        return None
+    return f"uploads/{match.group('source')}", variant, extension
+
+
+def has_derivatives(relative_path):
+    """
+    Helper function to tell whether an image path gets derivatives: content-addressed
+    image uploads only, since files overwritten in place would leave stale variants.
+    """
+    return (
+        bool(relative_path)
+        and is_content_addressed(relative_path)
+        and os.path.splitext(relative_path)[1].lower() in IMAGE_EXTENSIONS
+    )
+
+
+def _render_variant(image, width, extension, target):
+    if image.width > width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    if extension == 'jpg':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # EXIF (camera, GPS) is dropped: Pillow only writes it when passed exif=
+    replace_atomically(target, lambda temp_path: image.save(
+        temp_path, IMAGE_FORMATS[extension], quality=IMAGE_QUALITY, optimize=extension == 'jpg'
+    ))
+
+
+def generate_image_derivatives(relative_path, only=None):
+    """
+    Render the variants of an uploaded image (all of them, or the (variant, extension)
+    pairs in `only`). Returns the media paths written, or None without Pillow.
+    """
+    if Image is None:
+        return None
+    source = os.path.join(settings.MEDIA_ROOT, relative_path)
+    written = []
+    with Image.open(source) as image:
+        # Apply the EXIF orientation before the EXIF block is dropped
+        image = ImageOps.exif_transpose(image)
+        for variant, width in IMAGE_VARIANTS.items():
+            for extension in IMAGE_FORMATS:
+                if only is not None and (variant, extension) not in only:
+                    continue
+                path = derivative_path(relative_path, variant, extension)
+                _render_variant(image, width, extension, os.path.join(settings.MEDIA_ROOT, path))
+                written.append(path)
+    return written
+
+
+def render_missing_derivative(relative_path):
+    """
+    Called by serve_media for a missing file. When `relative_path` is a derivative of
+    an existing upload, renders it and returns `relative_path`, or returns the source
+    path when Pillow is not installed. Returns None otherwise.
+    """
+    parsed = parse_derivative_path(relative_path)
+    if parsed is None:
+        return None
+    source_path, variant, extension = parsed
+    if not has_derivatives(source_path) or not os.path.isfile(os.path.join(settings.MEDIA_ROOT, source_path)):
+        return None
+    if Image is None:
+        return source_path
+    try:
+        generate_image_derivatives(source_path, only={(variant, extension)})
+    except Exception:
+        return source_path
+    return relative_path
+
+
+# EXIF orientations that rotate the image by 90 degrees (width and height swap)
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def _source_width(relative_path):
+    # Displayed width of an uploaded image, from its header; raises OSError when the
+    # file is missing or not an image
+    with Image.open(os.path.join(settings.MEDIA_ROOT, relative_path)) as image:
+        if image.getexif().get(0x0112) in ROTATED_ORIENTATIONS:
+            return image.height
+        return image.width
+
+
+@lru_cache(maxsize=8192)
+def _srcset_candidates(relative_path):
+    # Per format, ('<derivative path>', ' <width>w') for each variant, to be joined with a
+    # base URL; None when the image has no derivatives. Variants are never upscaled, so
+    # those at or above the source width render identically: only the first is listed
+    if Image is None or not has_derivatives(relative_path):
+        return None
+    source_width = _source_width(relative_path)
+    variants = []
+    for variant, width in sorted(IMAGE_VARIANTS.items(), key=lambda item: item[1]):
+        variants.append((variant, min(width, source_width)))
+        if width >= source_width:
+            break
+    return {
+        extension: [
+            (derivative_path(relative_path, variant, extension), f' {width}w')
+            for variant, width in variants
+        ]
+        for extension in IMAGE_FORMATS
+    }
+
+
+def image_srcset(value, default_subdir=None, base=None):
+    """
+    srcset strings per format for a stored image reference, e.g.
+    {'webp': '/media/uploads/derivatives/.../thumb-320w.webp 320w, ...', 'jpg': '...'},
+    or None when the image has no derivatives or Pillow is not installed. `default_subdir`
+    and `base` are used as by media_urls.build_media_url.
+    """
+    relative_path, url = resolve_media_path(value, default_subdir)
+    try:
+        candidates = _srcset_candidates(relative_path) if relative_path else None
+    except OSError:
+        # Not cached: the upload may be readable on the next request
+        candidates = None
+    if candidates is None:
+        return None
+    base = base or settings.MEDIA_URL
+    return {
+        extension: ', '.join(base + path + width for path, width in variants)
+        for extension, variants in candidates.items()
+    }
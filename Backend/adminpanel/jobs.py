@@ -0,0 +1,240 @@
+"""
+Database-backed background job queue.
+
+Request handlers enqueue work (enqueue('pdf.process', {...})) and return; `manage.py
+run_worker` claims due jobs and runs them, CPU-bound tasks in a process pool and
+I/O-bound ones in a thread pool. Failed jobs are retried with exponential backoff up to
+their max_attempts. Periodic tasks (registered with `every=`) keep one queued job each,
+re-enqueued for their next run when they finish.
+
+Jobs are claimed with a compare-and-set UPDATE (status 'queued' -> 'running'), which
+works on every supported database, MariaDB 10.4 included (no SKIP LOCKED). A worker
+refreshes the heartbeat of the jobs it runs; jobs whose heartbeat is older than
+JOB_LOCK_TIMEOUT were left by a worker that died and are requeued (or failed, once they
+have used all of their attempts). A worker only records the outcome of a job it still
+holds, so a job requeued from under it is not finished twice.
+"""
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Avg, Count, F, Min, Q
+from django.utils import timezone
+
+from .models import Job
+
+# Seconds between heartbeats of a worker's running jobs
+JOB_HEARTBEAT_INTERVAL = getattr(settings, 'JOB_HEARTBEAT_INTERVAL', 30)
+# Seconds without a heartbeat after which a running job is considered abandoned
+JOB_LOCK_TIMEOUT = getattr(settings, 'JOB_LOCK_TIMEOUT', 5 * 60)
+# Retry delays: JOB_RETRY_BASE_DELAY * 2 ** (attempt - 1), capped, with jitter
+JOB_RETRY_BASE_DELAY = getattr(settings, 'JOB_RETRY_BASE_DELAY', 30)
+JOB_RETRY_MAX_DELAY = getattr(settings, 'JOB_RETRY_MAX_DELAY', 6 * 60 * 60)
+# Finished jobs are deleted after this many days
+JOB_RETENTION_DAYS = getattr(settings, 'JOB_RETENTION_DAYS', 7)
+
+# name -> {'function', 'kind' ('cpu' or 'io'), 'max_attempts', 'every'}
+TASKS = {}
+
+
+def task(name, kind='io', max_attempts=5, every=None):
+    """
+    Register a function as the task `name`. It is called with the job's payload as
+    keyword arguments. `kind='cpu'` runs it in the worker's process pool. `every` (a
+    timedelta, or a function returning the next run time after a datetime) makes it
+    periodic.
+    """
+    def register(function):
+        TASKS[name] = {'function': function, 'kind': kind, 'max_attempts': max_attempts, 'every': every}
+        return function
+    return register
+
+
+def enqueue(name, payload=None, run_at=None, unique_key=None, max_attempts=None):
+    """
+    Queue the task `name`. With `unique_key`, a job with that key that is still queued
+    or running is returned instead of adding a second one.
+    """
+    values = {
+        'name': name,
+        'payload': payload or {},
+        'run_at': run_at or timezone.now(),
+        'unique_key': unique_key,
+    }
+    if max_attempts is None and name in TASKS:
+        max_attempts = TASKS[name]['max_attempts']
+    if max_attempts is not None:
+        values['max_attempts'] = max_attempts
+    if unique_key is None:
+        return Job.objects.create(**values)
+    try:
+        with transaction.atomic():
+            return Job.objects.create(**values)
+    except IntegrityError:
+        return Job.objects.get(unique_key=unique_key)
+
+
+def _next_periodic_run(every, after):
+    if callable(every):
+        return every(after)
+    return after + every
+
+
+def schedule_periodic_jobs():
+    """
+    Make sure every periodic task has a queued (or running) job.
+    """
+    now = timezone.now()
+    for name, definition in TASKS.items():
+        if definition['every'] is not None:
+            enqueue(name, run_at=_next_periodic_run(definition['every'], now), unique_key=f'periodic:{name}')
+
+
+def requeue_stale_jobs():
+    """
+    Put jobs back in the queue whose worker stopped sending heartbeats, and fail those
+    that have used all of their attempts. Returns the number of jobs requeued.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=JOB_LOCK_TIMEOUT)
+    stale = Job.objects.filter(status='running').filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    for job in stale.filter(attempts__gte=F('max_attempts')):
+        if Job.objects.filter(id=job.id, status='running', locked_by=job.locked_by).update(
+            status='failed', finished_at=now, unique_key=None, locked_by=None,
+            last_error=f'Worker {job.locked_by} stopped sending heartbeats on the last attempt'
+        ):
+            _schedule_next_run(job, now)
+    return stale.filter(attempts__lt=F('max_attempts')).update(status='queued', locked_by=None, run_at=now)
+
+
+def heartbeat_jobs(worker_id, job_ids):
+    """
+    Refresh the heartbeat of the jobs `worker_id` is running. Called by run_worker
+    every JOB_HEARTBEAT_INTERVAL seconds.
+    """
+    if not job_ids:
+        return 0
+    return Job.objects.filter(id__in=job_ids, status='running', locked_by=worker_id).update(heartbeat_at=timezone.now())
+
+
+def claim_jobs(worker_id, limit, kinds=None):
+    """
+    Claim up to `limit` due jobs for `worker_id`, oldest run_at first. `kinds` limits
+    the claim to tasks of those kinds. Returns the claimed jobs.
+    """
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    names = [name for name, definition in TASKS.items() if kinds is None or definition['kind'] in kinds]
+    candidates = Job.objects.filter(status='queued', run_at__lte=now, name__in=names).order_by('run_at', 'id')
+    claimed = []
+    for job_id in candidates.values_list('id', flat=True)[:limit * 2]:
+        # Another worker may claim the same row first; only one UPDATE matches
+        if Job.objects.filter(id=job_id, status='queued').update(
+            status='running', locked_by=worker_id, started_at=now, heartbeat_at=now, attempts=F('attempts') + 1
+        ):
+            claimed.append(Job.objects.get(id=job_id))
+            if len(claimed) == limit:
+                break
+    return claimed
+
+
+def execute_task(name, payload):
+    """
+    Run the task `name` with `payload` in a worker thread or process. The connections it
+    opened are closed afterwards; pool threads and processes outlive a single job.
+    """
+    try:
+        return TASKS[name]['function'](**payload)
+    finally:
+        connections.close_all()
+
+
+def retry_delay(attempts):
+    """
+    Helper function to get the backoff before retry number `attempts`, in seconds.
+    """
+    delay = min(JOB_RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), JOB_RETRY_MAX_DELAY)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _held(job):
+    # The job as long as the worker that claimed it still holds it
+    return Job.objects.filter(id=job.id, status='running', locked_by=job.locked_by)
+
+
+def _schedule_next_run(job, now):
+    every = TASKS.get(job.name, {}).get('every')
+    if every is not None:
+        enqueue(job.name, job.payload, run_at=_next_periodic_run(every, now), unique_key=f'periodic:{job.name}')
+
+
+def complete_job(job):
+    """
+    Mark a claimed job as succeeded and schedule the next run of a periodic task.
+    Returns False when the job was requeued from under the worker meanwhile.
+    """
+    now = timezone.now()
+    if not _held(job).update(status='succeeded', finished_at=now, unique_key=None, locked_by=None, last_error=None):
+        return False
+    _schedule_next_run(job, now)
+    return True
+
+
+def fail_job(job, error):
+    """
+    Record a failed attempt: requeue the job with backoff, or mark it failed once it
+    has used all of its attempts. `error` is the exception raised by the task. Returns
+    True when the job was marked failed.
+    """
+    message = ''.join(traceback.format_exception(type(error), error, error.__traceback__))[-10000:]
+    now = timezone.now()
+    if job.attempts < job.max_attempts:
+        _held(job).update(
+            status='queued', locked_by=None, last_error=message,
+            run_at=now + timedelta(seconds=retry_delay(job.attempts))
+        )
+        return False
+    if not _held(job).update(status='failed', finished_at=now, unique_key=None, locked_by=None, last_error=message):
+        return False
+    # A periodic task keeps its schedule even after a run gave up
+    _schedule_next_run(job, now)
+    return True
+
+
+def purge_finished_jobs():
+    """
+    Delete succeeded/failed jobs older than JOB_RETENTION_DAYS.
+    """
+    cutoff = timezone.now() - timedelta(days=JOB_RETENTION_DAYS)
+    deleted, _ = Job.objects.filter(status__in=['succeeded', 'failed'], finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def get_queue_stats():
+    """
+    Queue depth per status and task, and latency: how overdue the oldest due job is,
+    and the average wait between run_at and start over the last hour.
+    """
+    now = timezone.now()
+    depth = {status: 0 for status, label in Job.STATUS_CHOICES}
+    by_task = {}
+    for row in Job.objects.order_by().values('name', 'status').annotate(count=Count('id')):
+        depth[row['status']] += row['count']
+        by_task.setdefault(row['name'], {})[row['status']] = row['count']
+
+    oldest_due = Job.objects.filter(status='queued', run_at__lte=now).aggregate(oldest=Min('run_at'))['oldest']
+    recent_wait = Job.objects.filter(started_at__gte=now - timedelta(hours=1)).aggregate(
+        wait=Avg(F('started_at') - F('run_at'))
+    )['wait']
+    return {
+        'depth': depth,
+        'by_task': by_task,
+        'due': Job.objects.filter(status='queued', run_at__lte=now).count(),
+        'oldest_due_seconds': round((now - oldest_due).total_seconds(), 1) if oldest_due else 0,
+        'average_wait_seconds': round(recent_wait.total_seconds(), 1) if recent_wait else None,
+    }
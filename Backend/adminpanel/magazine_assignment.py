@@ -0,0 +1,94 @@
+"""
+Incremental magazine assignment.
+
+An active article belongs to its publication's magazine for the month it was published
+in or, when there is no such issue, to the issue of the following month (the outcome the
+monthly assign_magazine_to_articles run produces). Articles are assigned when they are
+written and when a magazine for their period is created, so the magazine of an article
+no longer waits for the cron job; the command remains as a backfill
+(`assign_magazine_to_articles --all-months` for every issue).
+"""
+from datetime import date
+
+from .models import Articles, Magazines, publish_date_parts, publish_month_range
+
+
+def _month_start(year, month, offset=0):
+    month_index = year * 12 + (month - 1) + offset
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def find_article_magazine(publication_id, publish_date):
+    """
+    Helper function to find the magazine an article of `publication_id` published at
+    `publish_date` belongs to, or None.
+    """
+    year, month = publish_date_parts(publish_date)
+    if publication_id is None or year is None:
+        return None
+    issue_dates = [_month_start(year, month), _month_start(year, month, 1)]
+    magazines = Magazines.objects.filter(
+        publication_id=publication_id,
+        status='Active',
+        issue_date__in=issue_dates
+    ).order_by('issue_date', 'id')
+    return magazines.first()
+
+
+def assign_article_magazine(article, previous=None):
+    """
+    Assign the magazine of its period to an active article that was just created or
+    updated. `previous` is the article's (publication_id, publish_date) before an update:
+    an assigned magazine is only replaced when that period changed and the article still
+    had the magazine the old period implied, so manual assignments are kept.
+    Returns True when the article's magazine changed.
+    """
+    if article.status != 'Active':
+        return False
+    if previous is not None and article.magazine_id is not None:
+        if previous == (article.publication_id, article.publish_date):
+            return False
+        previous_magazine = find_article_magazine(*previous)
+        if previous_magazine is None or previous_magazine.id != article.magazine_id:
+            return False
+    elif article.magazine_id is not None:
+        return False
+
+    magazine = find_article_magazine(article.publication_id, article.publish_date)
+    if (magazine.id if magazine else None) == article.magazine_id:
+        return False
+    article.magazine = magazine
+    article.save(update_fields=['magazine'])
+    return True
+
+
+def assign_magazine_articles(magazine):
+    """
+    Assign a magazine to the unassigned active articles of its publication and month, and
+    to those of the previous month when that month has no issue of its own.
+    Returns the number of articles assigned.
+    """
+    if magazine.status != 'Active' or magazine.publication_id is None or magazine.issue_date is None:
+        return 0
+
+    year, month = magazine.issue_date.year, magazine.issue_date.month
+    periods = [publish_month_range(year, month)]
+    previous_month = _month_start(year, month, -1)
+    has_previous_issue = Magazines.objects.filter(
+        publication_id=magazine.publication_id,
+        status='Active',
+        issue_date=previous_month
+    ).exists()
+    if not has_previous_issue:
+        periods.append(publish_month_range(previous_month.year, previous_month.month))
+
+    assigned = 0
+    for month_start, month_end in periods:
+        assigned += Articles.objects.filter(
+            publication_id=magazine.publication_id,
+            status='Active',
+            magazine__isnull=True,
+            publish_date__gte=month_start,
+            publish_date__lt=month_end
+        ).update(magazine=magazine)
+    return assigned
@@ -0,0 +1,102 @@
+"""
+Maintained article counts and frozen tables of contents for magazine issues.
+
+Magazines.article_count holds the number of active articles assigned to the issue, so
+listings read a column instead of counting articles per request. Write paths that
+assign, unassign, delete or change the status of articles refresh it for the magazines
+they touched with one correlated UPDATE, which stays correct under concurrent writes.
+
+Magazines.table_of_contents is a denormalized snapshot of the issue (article ids,
+titles, authors, covers and categories) taken when the issue is published, so an issue
+page is a single primary-key read. It is frozen: later article edits do not change it
+until the issue is saved (published) again or assign_magazine_to_articles adds articles
+to it.
+"""
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Articles, Magazines
+
+
+def refresh_magazine_article_counts(*magazine_ids):
+    """
+    Recompute article_count of the given magazines (None ids are ignored).
+    """
+    magazine_ids = {magazine_id for magazine_id in magazine_ids if magazine_id is not None}
+    if not magazine_ids:
+        return 0
+    active_articles = Articles.objects.filter(
+        magazine_id=OuterRef('pk'),
+        status='Active'
+    ).order_by().values('magazine_id').annotate(count=Count('id')).values('count')
+    return Magazines.objects.filter(id__in=magazine_ids).update(
+        article_count=Coalesce(Subquery(active_articles, output_field=IntegerField()), Value(0))
+    )
+
+
+def build_table_of_contents(magazine):
+    """
+    Helper function to build the table of contents document of a magazine issue
+    from its active articles, with one query.
+    """
+    articles = Articles.objects.filter(magazine_id=magazine.id, status='Active').order_by('publish_date', 'id').values(
+        'id', 'title', 'excerpt', 'cover_image', 'publish_date',
+        'author_id', 'author__author_name', 'author__author_image',
+        'category_id', 'category__name', 'category__display_name',
+    )
+    return {
+        'magazine': {
+            'id': magazine.id,
+            'title': magazine.title,
+            'year': magazine.year,
+            'month': magazine.month,
+            'cover_image': magazine.cover_image,
+            'doc_url': magazine.doc_url,
+            'publication_id': magazine.publication_id,
+        },
+        'articles': [
+            {
+                'id': article['id'],
+                'title': article['title'],
+                'excerpt': article['excerpt'],
+                'cover_image': article['cover_image'],
+                'publish_date': article['publish_date'].isoformat() if article['publish_date'] else None,
+                'author': {
+                    'id': article['author_id'],
+                    'name': article['author__author_name'],
+                    'image': article['author__author_image'],
+                } if article['author_id'] else None,
+                'category': {
+                    'id': article['category_id'],
+                    'name': article['category__name'],
+                    'display_name': article['category__display_name'],
+                } if article['category_id'] else None,
+            }
+            for article in articles
+        ],
+        'generated_at': timezone.now().isoformat(),
+    }
+
+
+def publish_table_of_contents(magazine):
+    """
+    Freeze the table of contents of an active magazine issue. Returns the document,
+    or None when the magazine is not active.
+    """
+    if magazine.status != 'Active':
+        return None
+    magazine.table_of_contents = build_table_of_contents(magazine)
+    Magazines.objects.filter(pk=magazine.pk).update(table_of_contents=magazine.table_of_contents)
+    return magazine.table_of_contents
+
+
+def get_table_of_contents(magazine):
+    """
+    The stored table of contents of a magazine. Read-only: issues without a snapshot
+    (inactive, or published before snapshots existed) are built live until they are
+    published again.
+    """
+    if magazine.table_of_contents is not None:
+        return magazine.table_of_contents
+    return build_table_of_contents(magazine)
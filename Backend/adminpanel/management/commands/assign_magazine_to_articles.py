@@ -1,8 +1,12 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from django.db.models import Count
 from datetime import datetime, timedelta
-from adminpanel.models import Articles, Magazines, Publications
+from adminpanel.magazine_contents import publish_table_of_contents, refresh_magazine_article_counts
+from adminpanel.models import Articles, Magazines, Publications, publish_month_range
+from adminpanel.response_cache import bump_model_versions
 import calendar
+import time
 
 
 class Command(BaseCommand):
@@ -24,11 +28,38 @@ class Command(BaseCommand):
             type=str,
             help='Specific month to process (default: previous month)',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Articles updated per UPDATE statement; 0 updates each publication in one statement (default: 1000)',
+        )
+        parser.add_argument(
+            '--all-months',
+            action='store_true',
+            help='Process the month of every active magazine, oldest first (backfill)',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
+        self.batch_size = options['batch_size']
+        started = time.monotonic()
         target_year = options.get('year')
         target_month = options.get('month')
+
+        if options['all_months']:
+            # Oldest first: a month's own issue takes its articles before the next
+            # month's issue picks up whatever is left
+            issue_dates = Magazines.objects.filter(
+                status='Active',
+                publication__isnull=False,
+                issue_date__isnull=False
+            ).order_by('issue_date').values_list('issue_date', flat=True).distinct()
+            total_updated = 0
+            for issue_date in issue_dates:
+                total_updated += self.process_month(issue_date.year, calendar.month_name[issue_date.month], dry_run)
+            self.finish(total_updated, started)
+            return
         
         # If no specific year/month provided, use previous month
         if not target_year or not target_month:
@@ -43,7 +74,11 @@ class Command(BaseCommand):
             
             target_year = target_year or prev_year
             target_month = target_month or calendar.month_name[prev_month]
-        
+
+        self.finish(self.process_month(target_year, target_month, dry_run), started)
+
+    def process_month(self, target_year, target_month, dry_run):
+        """Assign the target month's magazines to its articles and the previous month's"""
         # Calculate date range for articles to be assigned
         # Articles from the PREVIOUS month should be assigned to the target month's magazine
         # e.g., September 2025 articles → October 2025 magazine
@@ -74,105 +109,66 @@ class Command(BaseCommand):
         self.stdout.write('\n=== STEP 2: PREVIOUS MONTH ASSIGNMENT ===')
         prev_matches = self.assign_previous_month_articles(target_year, target_month, article_year, article_month_num, dry_run)
         
-        total_updated = exact_matches + prev_matches
+        return exact_matches + prev_matches
+
+    def finish(self, total_updated, started):
+        if total_updated:
+            # Cached article responses embed magazine assignments
+            bump_model_versions(Articles, Magazines)
         self.stdout.write(
-            self.style.SUCCESS(f'\nTOTAL: Successfully assigned magazines to {total_updated} articles')
+            self.style.SUCCESS(f'\nTOTAL: Successfully assigned magazines to {total_updated} articles in {time.monotonic() - started:.2f}s')
         )
     
     def assign_exact_matches(self, target_year, target_month, dry_run):
         """Assign magazines using exact month/year matching"""
-        # Get all magazines for the target month/year
-        magazines = Magazines.objects.filter(
-            year=target_year,
-            month=target_month,
-            status='Active'
-        )
-        
-        if not magazines.exists():
-            self.stdout.write(
-                self.style.WARNING(f'No active magazines found for {target_month} {target_year}')
-            )
-            return 0
-        
-        self.stdout.write(f'Found {magazines.count()} magazines for {target_month} {target_year}')
-        
-        # Get the month number for the target month
-        target_month_num = list(calendar.month_name).index(target_month)
-        
         # Find articles with exact month/year match that don't have magazines
-        articles_to_update = Articles.objects.filter(
-            publish_date_year=target_year,
-            publish_date_month=target_month_num,
-            status='Active',
-            magazine__isnull=True
+        target_month_num = list(calendar.month_name).index(target_month)
+        month_start, month_end = publish_month_range(target_year, target_month_num)
+        return self.assign_magazines(
+            target_year, target_month, month_start, month_end, dry_run, show_examples=False
         )
-        
-        total_articles = articles_to_update.count()
-        self.stdout.write(f'Found {total_articles} articles with exact {target_month} {target_year} match')
-        
-        if total_articles == 0:
-            self.stdout.write(self.style.WARNING('No articles found for exact matching'))
-            return 0
-        
-        if dry_run:
-            self.stdout.write(self.style.WARNING('DRY RUN: Would assign magazines to exact matches'))
-            return 0
-        
-        # Update articles by matching publication
-        updated_count = 0
-        with transaction.atomic():
-            for article in articles_to_update:
-                # Find the matching magazine for this article's publication
-                matching_magazine = None
-                for magazine in magazines:
-                    if (article.publication and magazine.publication and 
-                        article.publication.id == magazine.publication.id):
-                        matching_magazine = magazine
-                        break
-                
-                if matching_magazine:
-                    article.magazine = matching_magazine
-                    article.save()
-                    updated_count += 1
-                    self.stdout.write(f'  Assigned "{matching_magazine.title}" to "{article.title}"')
-                else:
-                    self.stdout.write(
-                        self.style.WARNING(f'  No matching magazine found for article "{article.title}" (Publication: {article.publication.display_name if article.publication else "No Publication"})')
-                    )
-        
-        return updated_count
     
     def assign_previous_month_articles(self, target_year, target_month, article_year, article_month_num, dry_run):
         """Assign magazines using previous month logic"""
+        # Create date range for the PREVIOUS month (articles to be assigned)
+        start_date, end_date = publish_month_range(article_year, article_month_num)
         
-        # Get all magazines for the target month/year
+        self.stdout.write(
+            f'Looking for articles published between {start_date.strftime("%Y-%m-%d")} '
+            f'and {end_date.strftime("%Y-%m-%d")}'
+        )
+        return self.assign_magazines(
+            target_year, target_month, start_date, end_date, dry_run, show_examples=True
+        )
+    
+    def get_magazines_by_publication(self, target_year, target_month):
+        """Map publication_id -> the first active magazine of that publication for the month"""
+        magazines_by_publication = {}
         magazines = Magazines.objects.filter(
             year=target_year,
             month=target_month,
-            status='Active'
-        )
-        
-        if not magazines.exists():
+            status='Active',
+            publication__isnull=False
+        ).order_by('id')
+        for magazine in magazines:
+            magazines_by_publication.setdefault(magazine.publication_id, magazine)
+        return magazines_by_publication
+    
+    def assign_magazines(self, target_year, target_month, start_date, end_date, dry_run, show_examples):
+        """
+        Assign the month's magazines to the unassigned articles published in [start_date, end_date),
+        with UPDATE statements per publication instead of saving articles one by one
+        """
+        started = time.monotonic()
+        magazines_by_publication = self.get_magazines_by_publication(target_year, target_month)
+        if not magazines_by_publication:
             self.stdout.write(
                 self.style.WARNING(f'No active magazines found for {target_month} {target_year}')
             )
             return 0
         
-        self.stdout.write(f'Found {magazines.count()} magazines for {target_month} {target_year}')
-        
-        # Create date range for the PREVIOUS month (articles to be assigned)
-        start_date = datetime(article_year, article_month_num, 1)
-        if article_month_num == 12:
-            end_date = datetime(article_year + 1, 1, 1)
-        else:
-            end_date = datetime(article_year, article_month_num + 1, 1)
-        
-        self.stdout.write(
-            f'Looking for articles published between {start_date.strftime("%Y-%m-%d")} '
-            f'and {end_date.strftime("%Y-%m-%d")}'
-        )
+        self.stdout.write(f'Found {len(magazines_by_publication)} magazines for {target_month} {target_year}')
         
-        # Find articles that need to be assigned
         articles_to_update = Articles.objects.filter(
             publish_date__gte=start_date,
             publish_date__lt=end_date,
@@ -180,62 +176,75 @@ class Command(BaseCommand):
             magazine__isnull=True  # Only articles that don't already have a magazine assigned
         )
         
-        total_articles = articles_to_update.count()
+        # Count candidate articles per publication in one grouped query
+        counts_by_publication = {
+            row['publication_id']: row['count']
+            for row in articles_to_update.order_by().values('publication_id').annotate(count=Count('id'))
+        }
+        total_articles = sum(counts_by_publication.values())
         self.stdout.write(f'Found {total_articles} articles to update')
         
         if total_articles == 0:
             self.stdout.write(self.style.WARNING('No articles found to update'))
             return 0
         
-        # Group articles by publication for better reporting
-        articles_by_publication = {}
-        for article in articles_to_update:
-            pub_name = article.publication.display_name if article.publication else 'No Publication'
-            if pub_name not in articles_by_publication:
-                articles_by_publication[pub_name] = []
-            articles_by_publication[pub_name].append(article)
+        publications = Publications.objects.in_bulk(
+            [publication_id for publication_id in counts_by_publication if publication_id is not None]
+        )
+        
+        def publication_name(publication_id):
+            publication = publications.get(publication_id)
+            return publication.display_name if publication else 'No Publication'
         
         # Display what will be updated
         self.stdout.write('\nArticles to be updated:')
-        for pub_name, articles in articles_by_publication.items():
-            self.stdout.write(f'  {pub_name}: {len(articles)} articles')
-            for article in articles[:3]:  # Show first 3 articles as examples
-                self.stdout.write(f'    - {article.title} ({article.publish_date})')
-            if len(articles) > 3:
-                self.stdout.write(f'    ... and {len(articles) - 3} more')
+        for publication_id, count in counts_by_publication.items():
+            magazine = magazines_by_publication.get(publication_id)
+            target = f'"{magazine.title}"' if magazine else 'no matching magazine'
+            self.stdout.write(f'  {publication_name(publication_id)}: {count} articles -> {target}')
+            if show_examples:
+                examples = articles_to_update.filter(publication_id=publication_id).values_list('title', 'publish_date')[:3]
+                for title, publish_date in examples:  # Show first 3 articles as examples
+                    self.stdout.write(f'    - {title} ({publish_date})')
+                if count > 3:
+                    self.stdout.write(f'    ... and {count - 3} more')
         
         if dry_run:
-            self.stdout.write(self.style.WARNING('DRY RUN: Would assign magazines to previous month articles'))
+            self.stdout.write(self.style.WARNING('DRY RUN: Would assign magazines to these articles'))
             return 0
         
-        # Auto-confirm for non-interactive environments
         self.stdout.write(f'\nAuto-assigning magazines to {total_articles} articles...')
         
-        # Update articles by matching publication
         updated_count = 0
         with transaction.atomic():
-            for article in articles_to_update:
-                # Find the matching magazine for this article's publication
-                matching_magazine = None
-                for magazine in magazines:
-                    if (article.publication and magazine.publication and 
-                        article.publication.id == magazine.publication.id):
-                        matching_magazine = magazine
-                        break
-                
-                if matching_magazine:
-                    article.magazine = matching_magazine
-                    article.save()
-                    updated_count += 1
-                    self.stdout.write(f'  Assigned "{matching_magazine.title}" to "{article.title}"')
-                else:
+            for publication_id, count in counts_by_publication.items():
+                magazine = magazines_by_publication.get(publication_id)
+                if magazine is None:
                     self.stdout.write(
-                        self.style.WARNING(f'  No matching magazine found for article "{article.title}" (Publication: {article.publication.display_name if article.publication else "No Publication"})')
+                        self.style.WARNING(f'  No matching magazine found for {count} articles (Publication: {publication_name(publication_id)})')
                     )
+                    continue
+                
+                articles = articles_to_update.filter(publication_id=publication_id)
+                publication_updated = 0
+                if self.batch_size > 0:
+                    while True:
+                        batch_ids = list(articles.order_by('id').values_list('id', flat=True)[:self.batch_size])
+                        if not batch_ids:
+                            break
+                        publication_updated += Articles.objects.filter(id__in=batch_ids).update(magazine=magazine)
+                        self.stdout.write(f'  {publication_name(publication_id)}: {publication_updated}/{count} articles assigned')
+                else:
+                    publication_updated = articles.update(magazine=magazine)
+                    self.stdout.write(f'  {publication_name(publication_id)}: {publication_updated}/{count} articles assigned')
+                
+                updated_count += publication_updated
+                self.stdout.write(f'  Assigned "{magazine.title}" to {publication_updated} articles')
+                
+                if publication_updated:
+                    # Keep the issue's maintained count and table of contents in step
+                    refresh_magazine_article_counts(magazine.id)
+                    publish_table_of_contents(magazine)
         
-        # Show summary by publication
-        self.stdout.write('\nSummary by publication:')
-        for pub_name, articles in articles_by_publication.items():
-            self.stdout.write(f'  {pub_name}: {len(articles)} articles updated')
-        
+        self.stdout.write(f'Updated {updated_count} articles in {time.monotonic() - started:.2f}s')
         return updated_count
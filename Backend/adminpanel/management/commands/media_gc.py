@@ -0,0 +1,314 @@
+import hashlib
+import os
+import re
+import stat
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from adminpanel.media_urls import resolve_media_path
+from adminpanel.models import Articles, Authors, Billboards, Contributors, Ebook, Magazines, Publications, Videos
+from adminpanel.pdf_pipeline import preview_dir_for
+
+# (model, column, directories under uploads/ a bare file name in the column may live in)
+MEDIA_COLUMNS = [
+    (Articles, 'cover_image', ['articles']),
+    (Authors, 'author_image', ['authors']),
+    (Billboards, 'image', ['billboards']),
+    (Magazines, 'cover_image', ['magazines']),
+    (Magazines, 'doc_url', ['magazinesPdf', 'magazines']),
+    (Ebook, 'cover_image', ['ebooks/covers']),
+    (Ebook, 'doc_url', ['ebooks/documents']),
+    (Publications, 'cover_image', ['publications']),
+    (Contributors, 'cover_image', ['hilalteam']),
+]
+# Rich-text columns that may embed uploaded media by URL
+MEDIA_TEXT_COLUMNS = [
+    (Articles, 'description'),
+    (Authors, 'introduction'),
+    (Ebook, 'description'),
+    (Publications, 'description'),
+    (Contributors, 'about'),
+    (Videos, 'description'),
+]
+# Frozen tables of contents (adminpanel.magazine_contents) keep the paths they were
+# built with: (path of keys into the document, '*' for each list item, directories)
+TABLE_OF_CONTENTS_MEDIA = [
+    (['magazine', 'cover_image'], ['magazines']),
+    (['magazine', 'doc_url'], ['magazinesPdf', 'magazines']),
+    (['articles', '*', 'cover_image'], ['articles']),
+    (['articles', '*', 'author', 'image'], ['authors']),
+]
+# Directories under uploads/ whose files the columns above account for; files anywhere
+# else (e.g. gallery/, linked from content by hand) are reported but never deleted
+MANAGED_DIRECTORIES = [
+    'articles', 'authors', 'billboards', 'magazines', 'magazinesPdf', 'ebooks/covers',
+    'ebooks/documents', 'publications', 'hilalteam', 'derivatives', 'previews',
+]
+
+EMBEDDED_MEDIA_RE = re.compile(r'uploads/[^\s"\'<>()?#]+')
+
+# Rows fetched per round trip while collecting references
+QUERY_CHUNK_SIZE = 2000
+
+
+def _digest(path):
+    # 8-byte digests keep the reference set small; a collision only keeps an orphan
+    return hashlib.blake2b(path.encode('utf-8'), digest_size=8).digest()
+
+
+class Command(BaseCommand):
+    help = 'Report disk usage under MEDIA_ROOT/uploads per entity and delete files no database row references'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Delete the orphaned files (default: only report them)',
+        )
+        parser.add_argument(
+            '--min-age',
+            type=float,
+            default=24,
+            help='Hours a file must be unmodified before it counts as orphaned; uploads are stored before the row that references them (default: 24)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Files deleted per batch (default: 500)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0,
+            help='Seconds to sleep between delete batches (default: 0)',
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='Print every orphaned file',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        started = time.monotonic()
+        uploads_root = os.path.join(settings.MEDIA_ROOT, 'uploads')
+        if not os.path.isdir(uploads_root):
+            self.stdout.write(self.style.WARNING(f'{uploads_root} does not exist.'))
+            return
+
+        self.stdout.write(self.style.SUCCESS('Collecting media references...'))
+        self.collect_references()
+        self.stdout.write(
+            f'  {len(self.references)} referenced files, {len(self.preview_dirs)} preview directories '
+            f'({time.monotonic() - started:.2f}s)'
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'Scanning {uploads_root}...'))
+        cutoff = time.time() - options['min_age'] * 3600
+        usage = {}
+        batch = []
+        deleted_count = deleted_bytes = 0
+        for relative_path, stat_result in self.walk(uploads_root):
+            entity = self.entity_for(relative_path)
+            entity_usage = usage.setdefault(entity, {'files': 0, 'bytes': 0, 'orphans': 0, 'orphan_bytes': 0, 'recent': 0})
+            entity_usage['files'] += 1
+            entity_usage['bytes'] += stat_result.st_size
+            if self.is_referenced(relative_path) or not self.is_managed(relative_path):
+                continue
+            if stat_result.st_mtime > cutoff:
+                entity_usage['recent'] += 1
+                continue
+
+            entity_usage['orphans'] += 1
+            entity_usage['orphan_bytes'] += stat_result.st_size
+            if options['list']:
+                self.stdout.write(f'  orphan: {relative_path} ({stat_result.st_size} bytes)')
+            if options['delete']:
+                batch.append((relative_path, stat_result.st_size))
+                if len(batch) >= options['batch_size']:
+                    count, size = self.delete_batch(batch)
+                    deleted_count += count
+                    deleted_bytes += size
+                    batch = []
+                    if options['pause']:
+                        time.sleep(options['pause'])
+        if batch:
+            count, size = self.delete_batch(batch)
+            deleted_count += count
+            deleted_bytes += size
+
+        self.write_report(usage)
+        orphan_count = sum(entity_usage['orphans'] for entity_usage in usage.values())
+        orphan_bytes = sum(entity_usage['orphan_bytes'] for entity_usage in usage.values())
+        if options['delete']:
+            self.stdout.write(self.style.SUCCESS(
+                f'\nDeleted {deleted_count} of {orphan_count} orphaned files ({self.format_size(deleted_bytes)}) '
+                f'in {time.monotonic() - started:.2f}s'
+            ))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'\n{orphan_count} orphaned files ({self.format_size(orphan_bytes)}). '
+                f'This was a DRY RUN; run with --delete to remove them.'
+            ))
+
+    def collect_references(self):
+        """
+        Digests of every media path the database references, read with values_list in
+        chunks (frozen tables of contents included), plus the page preview directories
+        of magazines and ebooks.
+        """
+        self.references = set()
+        self.preview_dirs = set()
+
+        for model, column, directories in MEDIA_COLUMNS:
+            values = model.objects.exclude(**{f'{column}__isnull': True}).exclude(**{column: ''})
+            for value in values.values_list(column, flat=True).iterator(chunk_size=QUERY_CHUNK_SIZE):
+                self.add_reference(value, directories)
+
+        documents = Magazines.objects.exclude(table_of_contents__isnull=True).values_list('table_of_contents', flat=True)
+        for document in documents.iterator(chunk_size=QUERY_CHUNK_SIZE):
+            for keys, directories in TABLE_OF_CONTENTS_MEDIA:
+                for value in self.document_values(document, keys):
+                    self.add_reference(value, directories)
+
+        for model in [Magazines, Ebook]:
+            values = model.objects.exclude(preview_dir__isnull=True).exclude(preview_dir='')
+            for value in values.values_list('preview_dir', flat=True).iterator(chunk_size=QUERY_CHUNK_SIZE):
+                self.preview_dirs.add(_digest(value.strip().strip('/')))
+
+        for model, column in MEDIA_TEXT_COLUMNS:
+            values = model.objects.filter(**{f'{column}__contains': 'uploads/'})
+            for text in values.values_list(column, flat=True).iterator(chunk_size=QUERY_CHUNK_SIZE):
+                for match in EMBEDDED_MEDIA_RE.findall(text):
+                    self.references.add(_digest(match))
+
+    def add_reference(self, value, directories):
+        """
+        Record a stored media reference; a bare file name may live in any of `directories`.
+        """
+        if not isinstance(value, str) or not value.strip():
+            return
+        for directory in directories:
+            # Not memoized: a full scan would only churn the cache
+            relative_path, _ = resolve_media_path(value, directory, memoize=False)
+            if relative_path is None:
+                break
+            self.references.add(_digest(relative_path))
+            if relative_path.lower().endswith('.pdf'):
+                self.preview_dirs.add(_digest(preview_dir_for(relative_path)))
+
+    def document_values(self, document, keys):
+        """
+        Helper function to get the values at a key path of a JSON document, '*' standing
+        for every item of a list.
+        """
+        values = [document]
+        for key in keys:
+            if key == '*':
+                values = [item for value in values if isinstance(value, list) for item in value]
+            else:
+                values = [value.get(key) for value in values if isinstance(value, dict)]
+        return values
+
+    def walk(self, root):
+        """
+        Yield (path relative to MEDIA_ROOT, stat) for every regular file under `root`,
+        one directory listing at a time. Hidden entries and symlinks are skipped.
+        """
+        pending = [root]
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('.') or entry.is_symlink():
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                            continue
+                        stat_result = entry.stat(follow_symlinks=False)
+                        if stat.S_ISREG(stat_result.st_mode):
+                            relative_path = os.path.relpath(entry.path, settings.MEDIA_ROOT).replace(os.sep, '/')
+                            yield relative_path, stat_result
+            except FileNotFoundError:
+                continue
+
+    def is_referenced(self, relative_path):
+        if _digest(relative_path) in self.references:
+            return True
+        parts = relative_path.split('/')
+        if len(parts) > 3 and parts[1] == 'derivatives':
+            # uploads/derivatives/<entity>/<source file>/<variant>: kept with its source
+            return _digest('uploads/' + '/'.join(parts[2:-1])) in self.references
+        if len(parts) > 3 and parts[1] == 'previews':
+            # uploads/previews/<entity>/<pdf stem>/page-NNNN.<ext>: kept with its PDF
+            return _digest('/'.join(parts[:-1])) in self.preview_dirs
+        return False
+
+    def is_managed(self, relative_path):
+        directory = relative_path[len('uploads/'):]
+        return any(directory.startswith(managed + '/') for managed in MANAGED_DIRECTORIES)
+
+    def entity_for(self, relative_path):
+        """
+        Helper function to get the usage report row of a file: its directory under
+        uploads/ (two levels for ebooks/, derivatives/ and previews/).
+        """
+        parts = relative_path.split('/')[1:-1]
+        if not parts:
+            return '(uploads root)'
+        if parts[0] in ('ebooks', 'derivatives', 'previews') and len(parts) > 1:
+            return f'{parts[0]}/{parts[1]}'
+        return parts[0]
+
+    def delete_batch(self, batch):
+        deleted_count = deleted_bytes = 0
+        directories = set()
+        for relative_path, size in batch:
+            try:
+                os.remove(os.path.join(settings.MEDIA_ROOT, relative_path))
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                self.stdout.write(self.style.ERROR(f'  Could not delete {relative_path}: {str(e)}'))
+                continue
+            deleted_count += 1
+            deleted_bytes += size
+            if relative_path.startswith(('uploads/derivatives/', 'uploads/previews/')):
+                directories.add(os.path.dirname(relative_path))
+        # Derivative and preview directories of deleted sources are left empty
+        for directory in sorted(directories, reverse=True):
+            try:
+                os.rmdir(os.path.join(settings.MEDIA_ROOT, directory))
+            except OSError:
+                pass
+        self.stdout.write(f'  Deleted {deleted_count} files ({self.format_size(deleted_bytes)})')
+        return deleted_count, deleted_bytes
+
+    def write_report(self, usage):
+        self.stdout.write('\n' + '=' * 78)
+        self.stdout.write(f'{"Directory":<24}{"Files":>9}{"Size":>12}{"Orphans":>10}{"Orphan size":>13}{"Too new":>10}')
+        self.stdout.write('=' * 78)
+        totals = {'files': 0, 'bytes': 0, 'orphans': 0, 'orphan_bytes': 0, 'recent': 0}
+        for entity in sorted(usage, key=lambda name: -usage[name]['bytes']):
+            row = usage[entity]
+            for key in totals:
+                totals[key] += row[key]
+            self.write_report_row(entity, row)
+        self.stdout.write('-' * 78)
+        self.write_report_row('Total', totals)
+
+    def write_report_row(self, name, row):
+        self.stdout.write(
+            f'{name:<24}{row["files"]:>9}{self.format_size(row["bytes"]):>12}'
+            f'{row["orphans"]:>10}{self.format_size(row["orphan_bytes"]):>13}{row["recent"]:>10}'
+        )
+
+    def format_size(self, size):
+        for unit in ['B', 'KB', 'MB', 'GB']:
+            if size < 1024 or unit == 'GB':
+                return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+            size /= 1024
@@ -0,0 +1,297 @@
+import json
+import mimetypes
+import os
+import random
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+from adminpanel.images import IMAGE_EXTENSIONS
+from adminpanel.jobs import enqueue
+from adminpanel.media import media_relative_path
+from adminpanel.models import Articles, Authors, Billboards, Contributors, Publications
+from adminpanel.response_cache import bump_model_versions
+from adminpanel.uploads import store_upload
+
+# Target name -> (model, field holding the image, directory the client reads it from).
+# Fields keep the bare file name, as FileUploadView uploads do.
+MEDIA_TARGETS = {
+    'articles': (Articles, 'cover_image', ['uploads', 'articles']),
+    'authors': (Authors, 'author_image', ['uploads', 'authors']),
+    'publications': (Publications, 'cover_image', ['uploads', 'publications']),
+    'contributors': (Contributors, 'cover_image', ['uploads', 'hilalteam']),
+    'billboards': (Billboards, 'image', ['uploads', 'billboards']),
+}
+
+# Extensions kept from the remote URL; anything else is derived from the Content-Type
+REMOTE_MEDIA_EXTENSIONS = IMAGE_EXTENSIONS + ['.webp', '.gif']
+# Bytes read from the response per write
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Statuses worth retrying; other 4xx responses fail immediately
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class RetryableDownloadError(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Download remotely hosted images (e.g. Cloudinary) of articles, authors, publications, contributors and billboards into local media storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only',
+            nargs='+',
+            choices=list(MEDIA_TARGETS),
+            help='Only migrate these targets (default: all)',
+        )
+        parser.add_argument(
+            '--host',
+            help='Only migrate URLs containing this host, e.g. res.cloudinary.com',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Concurrent downloads (default: 8)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Rows updated per bulk_update and checkpoint (default: 200)',
+        )
+        parser.add_argument(
+            '--retries',
+            type=int,
+            default=3,
+            help='Retries per download after timeouts, connection errors and 429/5xx responses (default: 3)',
+        )
+        parser.add_argument(
+            '--backoff',
+            type=float,
+            default=1.0,
+            help='Seconds before the first retry, doubled for each further retry (default: 1)',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=30,
+            help='Connect/read timeout in seconds (default: 30)',
+        )
+        parser.add_argument(
+            '--max-size',
+            type=int,
+            default=50 * 1024 * 1024,
+            help='Largest file downloaded, in bytes (default: 50 MB)',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Checkpoint file (default: MEDIA_ROOT/.staging/migrate_remote_media.json)',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore the checkpoint of the targets being run (for this --host) and start from the first row',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the URLs that would be migrated without downloading them',
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--workers and --batch-size must be at least 1')
+        self.options = options
+        self.checkpoint_path = options.get('checkpoint') or os.path.join(
+            settings.MEDIA_ROOT, '.staging', 'migrate_remote_media.json'
+        )
+        self.checkpoint = self.load_checkpoint()
+
+        # One pooled session: connections to the same host are reused across downloads
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=options['workers'])
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        started = time.monotonic()
+        totals = {'migrated': 0, 'skipped': 0, 'errors': 0, 'bytes': 0}
+        try:
+            with ThreadPoolExecutor(max_workers=options['workers'], thread_name_prefix='media') as pool:
+                for name in options.get('only') or MEDIA_TARGETS:
+                    counts = self.migrate_target(name, pool)
+                    for key in totals:
+                        totals[key] += counts[key]
+        finally:
+            self.session.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\nMigrated {totals['migrated']} images ({totals['bytes']} bytes), skipped {totals['skipped']}, "
+            f"{totals['errors']} errors in {time.monotonic() - started:.2f}s"
+        ))
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('This was a DRY RUN. No changes were made.'))
+
+    def load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path) as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return {}
+
+    def save_checkpoint(self):
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        temp_path = f'{self.checkpoint_path}.tmp'
+        with open(temp_path, 'w') as handle:
+            json.dump(self.checkpoint, handle, indent=2)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def migrate_target(self, name, pool):
+        """
+        Migrate one target in batches of rows, in id order from the checkpoint. Rows that
+        failed in an earlier run are retried first; they stay in the checkpoint until they
+        succeed. A run limited to a --host keeps its own checkpoint: it skips rows of other hosts.
+        """
+        model, field, upload_parts = MEDIA_TARGETS[name]
+        key = f"{name}@{self.options['host']}" if self.options.get('host') else name
+        if self.options['restart']:
+            self.checkpoint.pop(key, None)
+        state = self.checkpoint.setdefault(key, {'last_id': 0, 'failed': {}})
+        remote = Q(**{f'{field}__startswith': 'http://'}) | Q(**{f'{field}__startswith': 'https://'})
+        rows = model.objects.filter(remote)
+        if self.options.get('host'):
+            rows = rows.filter(**{f'{field}__icontains': self.options['host']})
+        rows = rows.order_by('id').only('id', field)
+        update_fields = [field]
+        if any(model_field.name == 'updated_at' for model_field in model._meta.concrete_fields):
+            # bulk_update skips auto_now; conditional GETs validate on MAX(updated_at)
+            update_fields.append('updated_at')
+        retry_ids = sorted(int(row_id) for row_id in state['failed'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Migrating {name}.{field} (from id {state["last_id"] + 1}, retrying {len(retry_ids)} failed rows)...'
+        ))
+        counts = {'migrated': 0, 'skipped': 0, 'errors': 0, 'bytes': 0}
+        while True:
+            retrying = bool(retry_ids)
+            if retrying:
+                batch_ids, retry_ids = retry_ids[:self.options['batch_size']], retry_ids[self.options['batch_size']:]
+                batch = list(rows.filter(id__in=batch_ids))
+                if not self.options['dry_run']:
+                    # Rows no longer remote (fixed by hand, or deleted) have nothing left to retry
+                    for row_id in set(batch_ids) - {row.id for row in batch}:
+                        state['failed'].pop(str(row_id), None)
+            else:
+                batch = list(rows.filter(id__gt=state['last_id'])[:self.options['batch_size']])
+                if not batch:
+                    break
+
+            urls = {}
+            for row in batch:
+                url = getattr(row, field).strip()
+                if media_relative_path(url):
+                    # An absolute URL to our own media
+                    counts['skipped'] += 1
+                    continue
+                urls.setdefault(url, []).append(row)
+
+            if self.options['dry_run']:
+                for url, url_rows in urls.items():
+                    self.stdout.write(f'  [DRY RUN] {name} {", ".join(str(row.id) for row in url_rows)}: {url}')
+                    counts['migrated'] += len(url_rows)
+                if not retrying:
+                    state['last_id'] = batch[-1].id
+                continue
+
+            # Each distinct URL is downloaded once, however many rows use it
+            results = pool.map(lambda url: (url, self.download(url, upload_parts)), list(urls))
+            updated = []
+            for url, (result, error) in results:
+                url_rows = urls[url]
+                if error:
+                    counts['errors'] += len(url_rows)
+                    for row in url_rows:
+                        state['failed'][str(row.id)] = f'{url}: {error}'
+                    self.stdout.write(self.style.ERROR(f'  {name} {", ".join(str(row.id) for row in url_rows)}: {url}: {error}'))
+                    continue
+                relative_path, created, size = result
+                counts['bytes'] += size
+                for row in url_rows:
+                    setattr(row, field, os.path.basename(relative_path))
+                    state['failed'].pop(str(row.id), None)
+                    updated.append(row)
+                if created and os.path.splitext(relative_path)[1] in IMAGE_EXTENSIONS:
+                    enqueue('images.derivatives', {'relative_path': relative_path}, unique_key=f'images.derivatives:{relative_path}')
+
+            if updated:
+                if 'updated_at' in update_fields:
+                    now = timezone.now()
+                    for row in updated:
+                        row.updated_at = now
+                model.objects.bulk_update(updated, update_fields)
+                counts['migrated'] += len(updated)
+            # Rows are only passed once their new value is stored; failed ones stay in
+            # `failed` and are retried by the next run
+            if not retrying:
+                state['last_id'] = batch[-1].id
+            self.save_checkpoint()
+            self.stdout.write(f'  {name}: up to id {state["last_id"]}, {counts["migrated"]} migrated, {counts["errors"]} errors')
+
+        if counts['migrated'] and not self.options['dry_run']:
+            bump_model_versions(model)
+        return counts
+
+    def download(self, url, upload_parts):
+        """
+        Download `url` into the content-addressed uploads layout, retrying transient
+        failures with exponential backoff. Returns ((relative_path, created, size), None)
+        or (None, error message). Runs in a pool thread.
+        """
+        retries = self.options['retries']
+        for attempt in range(retries + 1):
+            try:
+                return self.fetch(url, upload_parts), None
+            except (RetryableDownloadError, requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                if attempt == retries:
+                    return None, f'{str(e)} (after {retries + 1} attempts)'
+                time.sleep(self.options['backoff'] * 2 ** attempt * random.uniform(0.8, 1.2))
+            except Exception as e:
+                return None, str(e)
+
+    def fetch(self, url, upload_parts):
+        timeout = self.options['timeout']
+        with self.session.get(url, stream=True, timeout=(timeout, timeout)) as response:
+            if response.status_code in RETRY_STATUSES:
+                raise RetryableDownloadError(f'HTTP {response.status_code}')
+            response.raise_for_status()
+
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            if content_type and not content_type.startswith('image/'):
+                raise ValueError(f'Not an image ({content_type})')
+            extension = os.path.splitext(urllib.parse.urlparse(url).path)[1].lower()
+            if extension not in REMOTE_MEDIA_EXTENSIONS:
+                extension = mimetypes.guess_extension(content_type) or '.jpg'
+            if extension == '.jpe':
+                extension = '.jpg'
+
+            size = 0
+            max_size = self.options['max_size']
+
+            def chunks():
+                nonlocal size
+                # Streamed to a temporary file and hashed as it arrives (see store_upload)
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_size:
+                        raise ValueError(f'Larger than {max_size} bytes')
+                    yield chunk
+
+            relative_path, content_hash, created = store_upload(chunks(), upload_parts, extension)
+            return relative_path, created, size
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand
+from adminpanel.models import Ebook, Magazines
+from adminpanel.pdf_pipeline import pdf_for_row, process_pdf
+from adminpanel.response_cache import bump_model_versions
+
+
+class Command(BaseCommand):
+    help = 'Linearize magazine/ebook PDFs, record their page count and size, and render page previews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the PDFs that would be processed without processing them',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Reprocess PDFs that were already processed',
+        )
+        parser.add_argument(
+            '--model',
+            choices=['magazines', 'ebooks'],
+            help='Only process magazines or ebooks (default: both)',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        models = {'magazines': Magazines, 'ebooks': Ebook}
+        if options.get('model'):
+            models = {options['model']: models[options['model']]}
+        
+        started = time.monotonic()
+        processed_count = 0
+        error_count = 0
+        for name, model in models.items():
+            rows = model.objects.filter(doc_url__isnull=False).exclude(doc_url='')
+            if not options['all']:
+                rows = rows.filter(page_count__isnull=True)
+            rows = rows.order_by('id').only('id', 'doc_url')
+            
+            self.stdout.write(self.style.SUCCESS(f'Processing {name} PDFs...'))
+            model_processed = 0
+            for row in rows.iterator():
+                relative_path = pdf_for_row(row)
+                if not relative_path:
+                    continue
+                if dry_run:
+                    self.stdout.write(f'  Would process {name} {row.id}: {relative_path}')
+                    continue
+                try:
+                    values = process_pdf(relative_path, model, row.id)
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f'  Error processing {name} {row.id} ({relative_path}): {str(e)}'))
+                    error_count += 1
+                    continue
+                model_processed += 1
+                self.stdout.write(
+                    f'  {name} {row.id}: {values["page_count"] or "?"} pages, {values["file_size"]} bytes'
+                    + (f', previews in {values["preview_dir"]}' if values.get('preview_dir') else '')
+                )
+            
+            if model_processed:
+                bump_model_versions(model)
+            processed_count += model_processed
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'\nProcessed {processed_count} PDFs ({error_count} errors) in {time.monotonic() - started:.2f}s')
+        )
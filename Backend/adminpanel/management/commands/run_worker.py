@@ -0,0 +1,156 @@
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from adminpanel.jobs import (
+    JOB_HEARTBEAT_INTERVAL, TASKS, claim_jobs, complete_job, execute_task, fail_job, get_queue_stats,
+    heartbeat_jobs, requeue_stale_jobs, schedule_periodic_jobs
+)
+from adminpanel.worker_process import init_process
+
+# Seconds between checks for jobs abandoned by dead workers
+STALE_CHECK_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs: CPU-bound tasks in a process pool, I/O-bound tasks in a thread pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=os.cpu_count() or 2,
+            help='Worker processes for CPU-bound tasks (default: number of CPUs)',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=8,
+            help='Worker threads for I/O-bound tasks (default: 8)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between checks for due jobs (default: 1)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run the jobs that are due, wait for them and exit',
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Print queue depth and latency and exit',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(get_queue_stats(), indent=2))
+            return
+
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.capacity = {'cpu': max(options['processes'], 1), 'io': max(options['threads'], 1)}
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        requeue_stale_jobs()
+        if not options['once']:
+            schedule_periodic_jobs()
+
+        # The forkserver is started from here, before it could inherit an open connection
+        connections.close_all()
+        self.start_process_pool()
+        self.thread_pool = ThreadPoolExecutor(max_workers=self.capacity['io'], thread_name_prefix='job')
+        self.stdout.write(self.style.SUCCESS(
+            f'Worker {self.worker_id} started: {self.capacity["cpu"]} processes, {self.capacity["io"]} threads, '
+            f'{len(TASKS)} tasks ({", ".join(sorted(TASKS))})'
+        ))
+
+        self.running = {}
+        succeeded = failed = 0
+        last_stale_check = last_heartbeat = time.monotonic()
+        try:
+            while True:
+                if not self.stopping:
+                    self.claim()
+                if not self.running:
+                    if self.stopping or options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                else:
+                    done, _ = wait(list(self.running), timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if self.finish(future, *self.running.pop(future)):
+                            succeeded += 1
+                        else:
+                            failed += 1
+                if self.running and time.monotonic() - last_heartbeat > JOB_HEARTBEAT_INTERVAL:
+                    # Tells requeue_stale_jobs (here and in other workers) these are alive
+                    heartbeat_jobs(self.worker_id, [job.id for kind, job, started, pool in self.running.values()])
+                    last_heartbeat = time.monotonic()
+                if time.monotonic() - last_stale_check > STALE_CHECK_INTERVAL:
+                    requeue_stale_jobs()
+                    last_stale_check = time.monotonic()
+        finally:
+            self.thread_pool.shutdown(wait=True)
+            self.process_pool.shutdown(wait=True)
+
+        self.stdout.write(self.style.SUCCESS(f'Worker stopped: {succeeded} jobs succeeded, {failed} attempts failed'))
+
+    def stop(self, signum, frame):
+        if not self.stopping:
+            self.stdout.write(self.style.WARNING('Stopping: waiting for running jobs to finish...'))
+        self.stopping = True
+
+    def start_process_pool(self):
+        # Children come from a forkserver, never forked from this process: the pool is
+        # restarted after a child dies, while the job and heartbeat threads run, and a
+        # fork would copy locks those threads hold
+        self.process_pool = ProcessPoolExecutor(
+            max_workers=self.capacity['cpu'], mp_context=multiprocessing.get_context('forkserver'),
+            initializer=init_process
+        )
+
+    def claim(self):
+        for kind in ['cpu', 'io']:
+            free = self.capacity[kind] - sum(1 for running in self.running.values() if running[0] == kind)
+            for job in claim_jobs(self.worker_id, free, kinds=[kind]):
+                pool = self.process_pool if kind == 'cpu' else self.thread_pool
+                future = pool.submit(execute_task, job.name, job.payload)
+                self.running[future] = (kind, job, time.monotonic(), pool)
+
+    def finish(self, future, kind, job, started, pool):
+        elapsed = time.monotonic() - started
+        try:
+            future.result()
+        except BrokenProcessPool as e:
+            # A child died (killed or crashed); the job is retried in a fresh pool
+            fail_job(job, e)
+            if pool is self.process_pool:
+                self.start_process_pool()
+            self.stdout.write(self.style.ERROR(f'  {job.name} #{job.id}: worker process died'))
+            return False
+        except Exception as e:
+            gave_up = fail_job(job, e)
+            self.stdout.write(self.style.ERROR(
+                f'  {job.name} #{job.id} failed (attempt {job.attempts}/{job.max_attempts}'
+                f'{", giving up" if gave_up else ", will retry"}) after {elapsed:.2f}s: {str(e)}'
+            ))
+            return False
+        if not complete_job(job):
+            self.stdout.write(self.style.WARNING(
+                f'  {job.name} #{job.id} finished after {elapsed:.2f}s, but was requeued meanwhile'
+            ))
+            return False
+        self.stdout.write(f'  {job.name} #{job.id} succeeded in {elapsed:.2f}s')
+        return True
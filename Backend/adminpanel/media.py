@@ -0,0 +1,250 @@
+"""
+Serving uploaded media (MEDIA_ROOT) in production.
+
+django.conf.urls.static() only serves media with DEBUG on and reads every file through
+Python. serve_media answers conditional requests (ETag / Last-Modified / 304) and
+single byte ranges (206), so PDF readers can fetch the pages they jump to, and keeps the
+bytes off the Python heap:
+
+* MEDIA_ACCEL_REDIRECT_PREFIX set (nginx): the response carries X-Accel-Redirect to
+  that internal location and nginx sends the file, ranges included.
+* MEDIA_SENDFILE_HEADER set (e.g. 'X-Sendfile' for Apache/lighttpd): the header carries
+  the absolute file path and the front server sends the file.
+* Otherwise the open file is handed to the WSGI server's wsgi.file_wrapper; gunicorn
+  sends the requested range from the file descriptor with os.sendfile().
+"""
+import mimetypes
+import os
+import re
+import stat
+import tempfile
+from urllib.parse import quote, urlparse
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, HttpResponseRedirect
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe, parse_etags
+from django.views.decorators.http import require_http_methods
+
+MEDIA_ACCEL_REDIRECT_PREFIX = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '')
+MEDIA_SENDFILE_HEADER = getattr(settings, 'MEDIA_SENDFILE_HEADER', '')
+MEDIA_CACHE_CONTROL = getattr(settings, 'MEDIA_CACHE_CONTROL', 'public, max-age=3600')
+# Content-addressed uploads never change at their URL
+MEDIA_IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Bytes read per iteration when the server has no sendfile support
+MEDIA_BLOCK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# uploads/<entity>/<sha256>.<ext> as written by adminpanel.uploads, and files derived
+# from one (uploads/derivatives/<entity>/<sha256>.<ext>/...)
+CONTENT_ADDRESSED_RE = re.compile(r'(^|/)[0-9a-f]{64}\.[A-Za-z0-9]+(/|$)')
+
+
+class FileRange:
+    """
+    File-like view of `length` bytes of an open file starting at `start`.
+    The file is positioned at `start`, so servers that sendfile() from fileno() at the
+    current offset for Content-Length bytes send exactly the range; read() stops at
+    its end for servers that iterate instead.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def is_content_addressed(relative_path):
+    """
+    Helper function to tell whether a media path is named by its content hash.
+    """
+    return bool(relative_path) and CONTENT_ADDRESSED_RE.search(relative_path) is not None
+
+
+def replace_atomically(path, write):
+    """
+    Helper function to (re)write a media file without exposing a partial file: `write`
+    is called with a temporary path in the same directory, which is then renamed over
+    `path`. The file gets the usual upload permissions rather than mkstemp's 0600.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        write(temp_path)
+        os.chmod(temp_path, settings.FILE_UPLOAD_PERMISSIONS or 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def media_relative_path(value):
+    """
+    Helper function to turn a stored media reference (relative path, /media/... path or
+    absolute URL to our media) into a path relative to MEDIA_ROOT, or None when it does
+    not point at local media.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.startswith('http://') or value.startswith('https://'):
+        value = urlparse(value).path
+    value = value.lstrip('/')
+    media_prefix = settings.MEDIA_URL.strip('/')
+    if media_prefix and value.startswith(media_prefix + '/'):
+        value = value[len(media_prefix) + 1:]
+    if not value.startswith('uploads/'):
+        return None
+    return value
+
+
+def media_etag(stat_result):
+    """
+    Helper function to build the validator of a media file from its mtime and size.
+    """
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+def parse_byte_range(header, size):
+    """
+    Helper function to parse a single-range Range header into an inclusive (start, end).
+    Returns None to serve the whole file (no, malformed or multi-range header), or
+    'unsatisfiable' when the range lies beyond the end of the file.
+    """
+    match = RANGE_RE.match((header or '').replace(' ', ''))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return 'unsatisfiable'
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        return 'unsatisfiable'
+    return start, min(end, size - 1)
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or etag in etags or etag in [tag.removeprefix('W/') for tag in etags]
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE') or '')
+    return if_modified_since is not None and int(last_modified) <= if_modified_since
+
+
+def _if_range_matches(request, etag, last_modified):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(last_modified)
+
+
+@require_http_methods(['GET', 'HEAD'])
+def serve_media(request, path):
+    """
+    Serve a file under MEDIA_ROOT with ETag/Last-Modified validation and byte ranges.
+    """
+    if any(part.startswith('.') for part in path.split('/')):
+        # Hidden directories hold unfinished uploads (adminpanel.chunked_uploads)
+        raise Http404('File not found')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except (SuspiciousFileOperation, ValueError):
+        raise Http404('File not found')
+    try:
+        stat_result = os.stat(full_path)
+    except OSError:
+        # Imported here: adminpanel.images builds on this module
+        from .images import render_missing_derivative
+        source_path = render_missing_derivative(path)
+        if source_path is None:
+            raise Http404('File not found')
+        if source_path != path:
+            # Pillow is not installed: fall back to the original image
+            return HttpResponseRedirect(settings.MEDIA_URL + quote(source_path))
+        stat_result = os.stat(full_path)
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise Http404('File not found')
+
+    etag = media_etag(stat_result)
+    last_modified = stat_result.st_mtime
+    validators = {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': MEDIA_IMMUTABLE_CACHE_CONTROL if is_content_addressed(path) else MEDIA_CACHE_CONTROL,
+        'Accept-Ranges': 'bytes',
+    }
+    if _not_modified(request, etag, last_modified):
+        response = HttpResponseNotModified()
+        for header, value in validators.items():
+            response[header] = value
+        return response
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    if MEDIA_ACCEL_REDIRECT_PREFIX or MEDIA_SENDFILE_HEADER:
+        # The front server reads the file and handles Range itself
+        response = HttpResponse(content_type=content_type)
+        if MEDIA_ACCEL_REDIRECT_PREFIX:
+            relative_path = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+            response['X-Accel-Redirect'] = MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + quote(relative_path)
+        else:
+            response[MEDIA_SENDFILE_HEADER] = full_path
+        for header, value in validators.items():
+            response[header] = value
+        return response
+
+    size = stat_result.st_size
+    byte_range = None
+    if _if_range_matches(request, etag, last_modified):
+        byte_range = parse_byte_range(request.META.get('HTTP_RANGE'), size)
+    if byte_range == 'unsatisfiable':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    length = max(end - start + 1, 0)
+    response = FileResponse(FileRange(open(full_path, 'rb'), start, length), content_type=content_type)
+    response.block_size = MEDIA_BLOCK_SIZE
+    response['Content-Length'] = str(length)
+    if byte_range:
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    for header, value in validators.items():
+        response[header] = value
+    return response
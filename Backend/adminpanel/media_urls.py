@@ -0,0 +1,87 @@
+"""
+Resolving stored media references to the URLs API responses carry.
+
+Image and document fields hold bare file names (relative to the uploads/<entity>/
+directory the client reads them from), uploads/... paths, /media/... paths or absolute
+URLs (local or remote, e.g. Cloudinary). build_media_url turns any of them into one URL
+form:
+
+* remote URLs are returned unchanged;
+* local references become <base>uploads/..., where the base is MEDIA_HOST + MEDIA_URL
+  when a CDN/media host is configured, the absolute MEDIA_URL of the request otherwise
+  (computed once per request), or plain MEDIA_URL without a request.
+
+The client runs on another origin, so production needs MEDIA_HOST: most views serialize
+without the request, and their URLs would be relative to the client's origin
+(`check --deploy` fails, adminpanel.E001). Settings are read on each call, not at import.
+
+Normalizing a stored value is memoized per (value, default directory, MEDIA_URL), so
+serializing a long list costs one string concatenation per field.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+
+from .media import media_relative_path
+
+
+def get_media_base_url(request=None):
+    """
+    Helper function to get the prefix media paths are appended to, e.g.
+    'https://cdn.hilal.gov.pk/media/' or 'https://api.hilal.gov.pk/media/'.
+    The request's absolute base is computed once and kept on the request.
+    """
+    # e.g. 'https://cdn.hilal.gov.pk'; media URLs then no longer depend on the request host
+    media_host = getattr(settings, 'MEDIA_HOST', '')
+    if media_host:
+        return media_host.rstrip('/') + settings.MEDIA_URL
+    if request is None:
+        return settings.MEDIA_URL
+    base = getattr(request, '_media_base_url', None)
+    if base is None:
+        base = request.build_absolute_uri(settings.MEDIA_URL)
+        request._media_base_url = base
+    return base
+
+
+def _resolve_media_path(value, default_subdir, media_url):
+    value = (value or '').strip()
+    if not value:
+        return None, None
+    relative_path = media_relative_path(value)
+    if relative_path:
+        return relative_path, None
+    if value.startswith('http://') or value.startswith('https://'):
+        return None, value
+    value = value.lstrip('/')
+    media_prefix = media_url.strip('/')
+    if media_prefix and value.startswith(media_prefix + '/'):
+        value = value[len(media_prefix) + 1:]
+    if default_subdir is None:
+        return None, None
+    return f'uploads/{default_subdir}/{value}', None
+
+
+# Keyed on MEDIA_URL too, so a changed setting never serves stale paths
+_resolve_media_path_cached = lru_cache(maxsize=8192)(_resolve_media_path)
+
+
+def resolve_media_path(value, default_subdir=None, memoize=True):
+    """
+    Normalize a stored media reference. Returns (relative_path, None) for local media,
+    relative_path being uploads/...; (None, url) for remote URLs; (None, None) when
+    there is nothing to link to. `memoize=False` skips the cache, for one-off scans.
+    """
+    resolve = _resolve_media_path_cached if memoize else _resolve_media_path
+    return resolve(value, default_subdir, settings.MEDIA_URL)
+
+
+def build_media_url(value, default_subdir=None, request=None, base=None):
+    """
+    URL of a stored media reference (see the module docstring). `base` skips the
+    lookup of get_media_base_url when the caller already has it.
+    """
+    relative_path, url = resolve_media_path(value, default_subdir)
+    if relative_path is None:
+        return url if url is not None else value
+    return (base or get_media_base_url(request)) + relative_path
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.14 on 2026-10-17 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminpanel', '0042_remove_publications_urdu_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='articles',
+            index=models.Index(fields=['status', 'publish_date'], name='articles_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articles',
+            index=models.Index(fields=['publication', 'status', 'publish_date'], name='articles_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articles',
+            index=models.Index(fields=['category', 'status', 'publish_date'], name='articles_cat_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articles',
+            index=models.Index(fields=['magazine', 'status', 'publish_date'], name='articles_mag_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articles',
+            index=models.Index(fields=['author', 'status', 'publish_date'], name='articles_author_date_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated manually to backfill publish_date_year/publish_date_month for existing articles
+
+from django.db import migrations
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def backfill_article_date_fields(apps, schema_editor):
+    """
+    Recompute the denormalized year/month columns from publish_date in SQL.
+    Articles.save() keeps them in step from here on.
+    """
+    Articles = apps.get_model('adminpanel', 'Articles')
+    Articles.objects.filter(publish_date__isnull=False).update(
+        publish_date_year=ExtractYear('publish_date'),
+        publish_date_month=ExtractMonth('publish_date'),
+    )
+    Articles.objects.filter(publish_date__isnull=True).update(
+        publish_date_year=None,
+        publish_date_month=None,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminpanel', '0043_add_articles_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_article_date_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated manually for FULLTEXT search indexes (see adminpanel/search.py)
+
+from django.db import migrations
+
+
+# (index name, table, columns) - kept in step with search.FULLTEXT_INDEXES
+FULLTEXT_INDEXES = [
+    ('articles_title_desc_ft', 'articles', ['title', 'description']),
+    ('articles_title_ft', 'articles', ['title']),
+    ('billboards_title_ft', 'billboards', ['title']),
+    ('ebooks_title_ft', 'ebooks', ['title']),
+    ('authors_name_email_ft', 'authors', ['author_name', 'email']),
+]
+
+
+def add_fulltext_indexes(apps, schema_editor):
+    """
+    Add FULLTEXT indexes with raw SQL; Django has no FULLTEXT index type for MySQL
+    and billboards/ebooks/authors are unmanaged tables.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'mysql':
+        return
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for index_name, table, columns in FULLTEXT_INDEXES:
+            column_sql = ', '.join(quote(column) for column in columns)
+            cursor.execute(f"ALTER TABLE {quote(table)} ADD FULLTEXT INDEX {quote(index_name)} ({column_sql})")
+
+
+def remove_fulltext_indexes(apps, schema_editor):
+    """
+    Drop the FULLTEXT indexes
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'mysql':
+        return
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for index_name, table, columns in FULLTEXT_INDEXES:
+            cursor.execute(f"ALTER TABLE {quote(table)} DROP INDEX {quote(index_name)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminpanel', '0044_backfill_article_date_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            add_fulltext_indexes,
+            remove_fulltext_indexes,
+        ),
+    ]
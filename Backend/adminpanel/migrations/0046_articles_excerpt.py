@@ -0,0 +1,56 @@
+# Generated by Django 4.2.14 on 2026-10-17 23:58
+
+import html
+import re
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+# A copy of adminpanel.models.build_excerpt as of this migration, so later changes
+# to the model helper do not change what the migration does
+ARTICLE_EXCERPT_LENGTH = 200
+
+
+def build_excerpt(description):
+    """
+    Short plain-text excerpt of an article body (Quill HTML) for list views.
+    """
+    if not description:
+        return None
+    # Keep words in adjacent paragraphs/lines apart before dropping the markup
+    description = re.sub(r'<(?:br|/p|/div|/li|/h[1-6]|/blockquote)\b[^>]*>', ' ', description, flags=re.IGNORECASE)
+    text = ' '.join(html.unescape(strip_tags(description)).split())
+    return Truncator(text).chars(ARTICLE_EXCERPT_LENGTH) or None
+
+
+def backfill_article_excerpts(apps, schema_editor):
+    """
+    Compute excerpts for existing articles in batches, loading one chunk of bodies at a time
+    """
+    Articles = apps.get_model('adminpanel', 'Articles')
+    batch = []
+    for article in Articles.objects.only('id', 'description').iterator(chunk_size=500):
+        article.excerpt = build_excerpt(article.description)
+        batch.append(article)
+        if len(batch) >= 500:
+            Articles.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    if batch:
+        Articles.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminpanel', '0045_add_fulltext_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articles',
+            name='excerpt',
+            field=models.CharField(blank=True, help_text='Plain-text excerpt derived from description', max_length=255, null=True),
+        ),
+        migrations.RunPython(backfill_article_excerpts, migrations.RunPython.noop),
+    ]
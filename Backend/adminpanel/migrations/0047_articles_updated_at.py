@@ -0,0 +1,37 @@
+# Generated by Django 4.2.14 on 2026-10-17 23:28
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, Now
+
+
+def backfill_articles_updated_at(apps, schema_editor):
+    """
+    Seed updated_at for existing articles so their validators are stable.
+    auto_now keeps it current from here on.
+    """
+    Articles = apps.get_model('adminpanel', 'Articles')
+    Articles.objects.filter(updated_at__isnull=True).update(
+        updated_at=Coalesce('publish_date', Now())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminpanel', '0046_articles_excerpt'),
+    ]
+
+    operations = [
+        # Plain first: adding an auto_now column fills existing rows with the current time
+        migrations.AddField(
+            model_name='articles',
+            name='updated_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(backfill_articles_updated_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='articles',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, null=True),
+        ),
+    ]
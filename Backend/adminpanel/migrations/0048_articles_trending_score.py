@@ -0,0 +1,22 @@
+# Generated by Django 4.2.14 on 2026-10-17 23:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminpanel', '0047_articles_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articles',
+            name='trending_score',
+            field=models.FloatField(blank=True, help_text='Time-decayed view count in log2 space, maintained by adminpanel.view_counter', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='articles',
+            index=models.Index(fields=['publication', 'status', 'trending_score'], name='articles_pub_trending_idx'),
+        ),
+    ]
@@ -0,0 +1,150 @@
+# Generated manually for typed date columns on the unmanaged magazines/ebooks/billboards tables
+
+import calendar
+from datetime import date, datetime
+
+from django.db import migrations
+from django.utils.dateparse import parse_date, parse_datetime
+
+# Copies of adminpanel.models.parse_loose_date and magazine_issue_date as of this
+# migration, so later changes to the model helpers do not change what it does
+LOOSE_DATE_FORMATS = ['%d-%m-%Y', '%d/%m/%Y', '%Y/%m/%d', '%B %d, %Y', '%b %d, %Y', '%d %B %Y', '%d %b %Y', '%B %Y', '%b %Y']
+
+
+def parse_loose_date(value):
+    """
+    Parse a date typed into one of the legacy free-text date columns.
+    Returns None when the value is empty or not recognisable.
+    """
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        parsed = parse_datetime(value)
+        if parsed is not None:
+            return parsed.date()
+        parsed = parse_date(value)
+        if parsed is not None:
+            return parsed
+    except ValueError:
+        # Well-formed but invalid, e.g. 2025-02-30
+        return None
+    for date_format in LOOSE_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def magazine_issue_date(year, month, publish_date=None):
+    """
+    First day of a magazine's issue month from its year and month name,
+    falling back to the free-text publish_date.
+    """
+    if year and month:
+        month_names = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+        month_number = month_names.get(str(month).strip().lower())
+        if month_number is None and str(month).strip().isdigit():
+            month_number = int(month)
+        if month_number and 1 <= month_number <= 12:
+            return date(int(year), month_number, 1)
+    return parse_loose_date(publish_date)
+
+# Rows parsed and written per batch
+BACKFILL_BATCH_SIZE = 1000
+
+# (table, new column, source columns, parser) - kept in step with the model fields
+TYPED_COLUMNS = [
+    ('magazines', 'issue_date', ['year', 'month', 'publish_date'], magazine_issue_date),
+    ('ebooks', 'published_on', ['publish_date'], parse_loose_date),
+    ('billboards', 'created_on', ['created'], parse_loose_date),
+]
+
+# (index name, table, columns) - kept in step with the models' Meta.indexes
+TYPED_COLUMN_INDEXES = [
+    ('magazines_status_issue_idx', 'magazines', ['status', 'issue_date']),
+    ('magazines_pub_issue_idx', 'magazines', ['publication_id', 'status', 'issue_date']),
+    ('ebooks_published_on_idx', 'ebooks', ['published_on']),
+    ('billboards_created_on_idx', 'billboards', ['created_on']),
+]
+
+
+def add_typed_columns(apps, schema_editor):
+    """
+    Add the date columns and their indexes with raw SQL; the tables are unmanaged,
+    so Django's migration state does not track their fields.
+    """
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    existing_tables = connection.introspection.table_names()
+    with connection.cursor() as cursor:
+        for table, column, source_columns, parse in TYPED_COLUMNS:
+            if table in existing_tables:
+                cursor.execute(f"ALTER TABLE {quote(table)} ADD COLUMN {quote(column)} date NULL")
+        for index_name, table, columns in TYPED_COLUMN_INDEXES:
+            if table in existing_tables:
+                column_sql = ', '.join(quote(column) for column in columns)
+                cursor.execute(f"CREATE INDEX {quote(index_name)} ON {quote(table)} ({column_sql})")
+
+
+def remove_typed_columns(apps, schema_editor):
+    """
+    Drop the indexes and date columns
+    """
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    existing_tables = connection.introspection.table_names()
+    with connection.cursor() as cursor:
+        for index_name, table, columns in TYPED_COLUMN_INDEXES:
+            if table in existing_tables:
+                cursor.execute(schema_editor.sql_delete_index % {'name': quote(index_name), 'table': quote(table)})
+        for table, column, source_columns, parse in TYPED_COLUMNS:
+            if table in existing_tables:
+                cursor.execute(f"ALTER TABLE {quote(table)} DROP COLUMN {quote(column)}")
+
+
+def backfill_typed_columns(apps, schema_editor):
+    """
+    Parse the existing year/month and free-text date strings into the new columns,
+    walking each table by primary key in batches. Unparseable strings are left NULL.
+    Model.save() keeps the columns in step from here on.
+    """
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    existing_tables = connection.introspection.table_names()
+    with connection.cursor() as cursor:
+        for table, column, source_columns, parse in TYPED_COLUMNS:
+            if table not in existing_tables:
+                continue
+            source_sql = ', '.join(quote(source) for source in source_columns)
+            last_id = 0
+            while True:
+                cursor.execute(
+                    f"SELECT {quote('id')}, {source_sql} FROM {quote(table)} "
+                    f"WHERE {quote('id')} > %s ORDER BY {quote('id')} LIMIT {BACKFILL_BATCH_SIZE}",
+                    [last_id]
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                updates = [(parse(*row[1:]), row[0]) for row in rows]
+                updates = [update for update in updates if update[0] is not None]
+                if updates:
+                    cursor.executemany(
+                        f"UPDATE {quote(table)} SET {quote(column)} = %s WHERE {quote('id')} = %s",
+                        updates
+                    )
+                last_id = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminpanel', '0048_articles_trending_score'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_typed_columns, remove_typed_columns),
+        migrations.RunPython(backfill_typed_columns, migrations.RunPython.noop),
+    ]
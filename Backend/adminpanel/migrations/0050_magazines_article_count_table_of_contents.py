@@ -0,0 +1,62 @@
+# Generated manually for the maintained article_count and table_of_contents columns on the unmanaged magazines table
+
+from django.db import migrations, models
+
+
+def add_magazine_columns(apps, schema_editor):
+    """
+    Add article_count and table_of_contents with raw SQL; the magazines table is
+    unmanaged, so Django's migration state does not track its fields.
+    """
+    connection = schema_editor.connection
+    if 'magazines' not in connection.introspection.table_names():
+        return
+    quote = connection.ops.quote_name
+    json_type = models.JSONField().db_type(connection)
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {quote('magazines')} ADD COLUMN {quote('article_count')} integer NOT NULL DEFAULT 0")
+        cursor.execute(f"ALTER TABLE {quote('magazines')} ADD COLUMN {quote('table_of_contents')} {json_type} NULL")
+
+
+def remove_magazine_columns(apps, schema_editor):
+    """
+    Drop article_count and table_of_contents
+    """
+    connection = schema_editor.connection
+    if 'magazines' not in connection.introspection.table_names():
+        return
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {quote('magazines')} DROP COLUMN {quote('table_of_contents')}")
+        cursor.execute(f"ALTER TABLE {quote('magazines')} DROP COLUMN {quote('article_count')}")
+
+
+def backfill_article_counts(apps, schema_editor):
+    """
+    Count the active articles of every magazine with one correlated UPDATE.
+    Tables of contents are frozen when issues are next published or first read.
+    """
+    connection = schema_editor.connection
+    if 'magazines' not in connection.introspection.table_names():
+        return
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {quote('magazines')} SET {quote('article_count')} = ("
+            f"SELECT COUNT(*) FROM {quote('articles')} "
+            f"WHERE {quote('articles')}.{quote('magazine_id')} = {quote('magazines')}.{quote('id')} "
+            f"AND {quote('articles')}.{quote('status')} = %s)",
+            ['Active']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminpanel', '0049_typed_temporal_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_magazine_columns, remove_magazine_columns),
+        migrations.RunPython(backfill_article_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated manually for the PDF metadata columns on the unmanaged magazines/ebooks tables
+
+from django.db import migrations
+
+# (table, column, SQL type) - kept in step with the model fields
+PDF_COLUMNS = [
+    (table, column, column_type)
+    for table in ('magazines', 'ebooks')
+    for column, column_type in (
+        ('page_count', 'integer'),
+        ('file_size', 'bigint'),
+        ('preview_dir', 'varchar(255)'),
+    )
+]
+
+
+def add_pdf_columns(apps, schema_editor):
+    """
+    Add the columns with raw SQL; the tables are unmanaged, so Django's migration
+    state does not track their fields. They are filled by adminpanel.pdf_pipeline
+    (`manage.py process_pdfs` for existing PDFs).
+    """
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    existing_tables = connection.introspection.table_names()
+    with connection.cursor() as cursor:
+        for table, column, column_type in PDF_COLUMNS:
+            if table in existing_tables:
+                cursor.execute(f"ALTER TABLE {quote(table)} ADD COLUMN {quote(column)} {column_type} NULL")
+
+
+def remove_pdf_columns(apps, schema_editor):
+    """
+    Drop the PDF metadata columns
+    """
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    existing_tables = connection.introspection.table_names()
+    with connection.cursor() as cursor:
+        for table, column, column_type in PDF_COLUMNS:
+            if table in existing_tables:
+                cursor.execute(f"ALTER TABLE {quote(table)} DROP COLUMN {quote(column)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminpanel', '0050_magazines_article_count_table_of_contents'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_pdf_columns, remove_pdf_columns),
+    ]
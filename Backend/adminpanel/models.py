@@ -1,8 +1,109 @@
 from django.db import models
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
 from api.models import CustomUser
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import date, datetime
+import calendar
+import html
 import re
 
+# Length of the plain-text excerpt stored alongside each article body
+ARTICLE_EXCERPT_LENGTH = 200
+
+
+def publish_month_range(year, month):
+    """
+    Half-open [start, end) datetime range covering a calendar month.
+    Filtering publish_date__gte/__lt on this range can use the publish_date indexes,
+    unlike publish_date__month/__year which wrap the column in MONTH()/YEAR().
+    """
+    start = datetime(int(year), int(month), 1)
+    if start.month == 12:
+        end = datetime(start.year + 1, 1, 1)
+    else:
+        end = datetime(start.year, start.month + 1, 1)
+    if timezone.is_naive(start):
+        start = timezone.make_aware(start)
+        end = timezone.make_aware(end)
+    return start, end
+
+
+def publish_date_parts(publish_date):
+    """
+    Year and month for the denormalized publish_date_year/publish_date_month columns.
+    Database expressions (e.g. F() in a bulk update) are extracted in SQL instead.
+    """
+    if publish_date is None:
+        return None, None
+    if hasattr(publish_date, 'resolve_expression'):
+        return ExtractYear(publish_date), ExtractMonth(publish_date)
+    publish_date = Articles._meta.get_field('publish_date').to_python(publish_date)
+    if timezone.is_aware(publish_date):
+        publish_date = timezone.localtime(publish_date)
+    return publish_date.year, publish_date.month
+
+
+# Free-text date formats seen in the legacy publish_date/created CharFields
+LOOSE_DATE_FORMATS = ['%d-%m-%Y', '%d/%m/%Y', '%Y/%m/%d', '%B %d, %Y', '%b %d, %Y', '%d %B %Y', '%d %b %Y', '%B %Y', '%b %Y']
+
+
+def parse_loose_date(value):
+    """
+    Parse a date typed into one of the legacy free-text date columns.
+    Returns None when the value is empty or not recognisable.
+    """
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        parsed = parse_datetime(value)
+        if parsed is not None:
+            return parsed.date()
+        parsed = parse_date(value)
+        if parsed is not None:
+            return parsed
+    except ValueError:
+        # Well-formed but invalid, e.g. 2025-02-30
+        return None
+    for date_format in LOOSE_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def magazine_issue_date(year, month, publish_date=None):
+    """
+    First day of a magazine's issue month from its year and month name,
+    falling back to the free-text publish_date.
+    """
+    if year and month:
+        month_names = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+        month_number = month_names.get(str(month).strip().lower())
+        if month_number is None and str(month).strip().isdigit():
+            month_number = int(month)
+        if month_number and 1 <= month_number <= 12:
+            return date(int(year), month_number, 1)
+    return parse_loose_date(publish_date)
+
+
+def build_excerpt(description):
+    """
+    Short plain-text excerpt of an article body (Quill HTML) for list views.
+    """
+    if not description:
+        return None
+    # Keep words in adjacent paragraphs/lines apart before dropping the markup
+    description = re.sub(r'<(?:br|/p|/div|/li|/h[1-6]|/blockquote)\b[^>]*>', ' ', description, flags=re.IGNORECASE)
+    text = ' '.join(html.unescape(strip_tags(description)).split())
+    return Truncator(text).chars(ARTICLE_EXCERPT_LENGTH) or None
+
+
 class Publications(models.Model):
     name = models.CharField(max_length=255)
     display_name = models.CharField(max_length=255, default='')
@@ -35,6 +136,41 @@ class Categories(models.Model):
         managed = True
         db_table = 'categories'
 
+class ArticlesQuerySet(models.QuerySet):
+    """
+    Keeps the derived columns (publish_date_year/publish_date_month, excerpt) in step
+    with their sources, and updated_at current, on bulk write paths that bypass Articles.save().
+    """
+
+    def update(self, **kwargs):
+        if 'publish_date' in kwargs:
+            year, month = publish_date_parts(kwargs['publish_date'])
+            kwargs['publish_date_year'] = year
+            kwargs['publish_date_month'] = month
+        if 'description' in kwargs and not hasattr(kwargs['description'], 'resolve_expression'):
+            kwargs['excerpt'] = build_excerpt(kwargs['description'])
+        # auto_now is not applied by queryset updates
+        kwargs.setdefault('updated_at', timezone.now())
+        return super().update(**kwargs)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.sync_derived_fields()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        derived_fields = Articles.derived_fields_for(fields)
+        updated_at = timezone.now()
+        for obj in objs:
+            if derived_fields:
+                obj.sync_derived_fields()
+            obj.updated_at = updated_at
+        fields = list(fields) + derived_fields + ['updated_at']
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+
 class Articles(models.Model):
     author = models.ForeignKey('Authors', models.DO_NOTHING, null=True, blank=True)
     publication = models.ForeignKey(Publications, models.DO_NOTHING, null=True, blank=True)
@@ -50,10 +186,50 @@ class Articles(models.Model):
     status = models.CharField(max_length=8, blank=True, null=True)
     description = models.TextField(blank=True, null=True)
     section = models.CharField(max_length=100, blank=True, null=True)
-    
+    excerpt = models.CharField(max_length=255, blank=True, null=True, help_text="Plain-text excerpt derived from description")
+    updated_at = models.DateTimeField(auto_now=True, blank=True, null=True, db_index=True)
+    trending_score = models.FloatField(blank=True, null=True, help_text="Time-decayed view count in log2 space, maintained by adminpanel.view_counter")
+
+    objects = ArticlesQuerySet.as_manager()
+
+    # Derived columns, keyed by the field they are computed from
+    DERIVED_FIELDS = {
+        'publish_date': ['publish_date_year', 'publish_date_month'],
+        'description': ['excerpt'],
+    }
+
+    @classmethod
+    def derived_fields_for(cls, fields):
+        """Derived columns that must be written when `fields` are written"""
+        return [derived for source, derived_list in cls.DERIVED_FIELDS.items() if source in fields for derived in derived_list]
+
+    def sync_derived_fields(self):
+        """Derive publish_date_year/publish_date_month and excerpt from their sources"""
+        self.publish_date_year, self.publish_date_month = publish_date_parts(self.publish_date)
+        if 'description' not in self.get_deferred_fields():
+            self.excerpt = build_excerpt(self.description)
+
+    def save(self, *args, **kwargs):
+        self.sync_derived_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | set(self.derived_fields_for(update_fields)) | {'updated_at'}
+        super().save(*args, **kwargs)
+
     class Meta:
         managed = True
         db_table = 'articles'
+        # Composite indexes for the public listing access paths:
+        # status='Active' + one FK filter, ordered by -publish_date
+        indexes = [
+            models.Index(fields=['status', 'publish_date'], name='articles_status_date_idx'),
+            models.Index(fields=['publication', 'status', 'publish_date'], name='articles_pub_date_idx'),
+            models.Index(fields=['category', 'status', 'publish_date'], name='articles_cat_date_idx'),
+            models.Index(fields=['magazine', 'status', 'publish_date'], name='articles_mag_date_idx'),
+            models.Index(fields=['author', 'status', 'publish_date'], name='articles_author_date_idx'),
+            # Popular articles: status='Active' + publication, ordered by -trending_score
+            models.Index(fields=['publication', 'status', 'trending_score'], name='articles_pub_trending_idx'),
+        ]
 
 
 class Comments(models.Model):
@@ -97,10 +273,21 @@ class Billboards(models.Model):
         choices=[('Active', 'Active'), ('Disabled', 'Disabled')],
         default='Active'
     )
+    created_on = models.DateField(blank=True, null=True, help_text="Parsed from created")
+
+    def save(self, *args, **kwargs):
+        self.created_on = parse_loose_date(self.created)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'created' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'created_on'}
+        super().save(*args, **kwargs)
 
     class Meta:
         managed = False
         db_table = 'billboards'
+        indexes = [
+            models.Index(fields=['created_on'], name='billboards_created_on_idx'),
+        ]
 
 
 class Magazines(models.Model):
@@ -116,10 +303,30 @@ class Magazines(models.Model):
     # New fields for magazine period
     year = models.IntegerField(blank=True, null=True, help_text="Year of the magazine (e.g., 2025)")
     month = models.CharField(max_length=20, blank=True, null=True, help_text="Month of the magazine (e.g., 'September', 'October')")
+    issue_date = models.DateField(blank=True, null=True, help_text="First day of the issue month, derived from year/month (or publish_date)")
+    # Maintained by adminpanel.magazine_contents
+    article_count = models.IntegerField(default=0, help_text="Number of active articles assigned to the magazine")
+    table_of_contents = models.JSONField(blank=True, null=True, help_text="Snapshot of the issue's articles taken when it was published")
+    # Filled in by adminpanel.pdf_pipeline when the row is saved with a new doc_url
+    page_count = models.IntegerField(blank=True, null=True)
+    file_size = models.BigIntegerField(blank=True, null=True, help_text="Size of the PDF in bytes")
+    preview_dir = models.CharField(max_length=255, blank=True, null=True, help_text="Media path of the rendered page previews (page-0001.webp/.jpg, ...)")
+
+    def save(self, *args, **kwargs):
+        self.issue_date = magazine_issue_date(self.year, self.month, self.publish_date)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'year', 'month', 'publish_date'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'issue_date'}
+        super().save(*args, **kwargs)
     
     class Meta:
         managed = False
         db_table = 'magazines'
+        # Listings sort by -issue_date, optionally within status/publication
+        indexes = [
+            models.Index(fields=['status', 'issue_date'], name='magazines_status_issue_idx'),
+            models.Index(fields=['publication', 'status', 'issue_date'], name='magazines_pub_issue_idx'),
+        ]
 
 
 class Ebook(models.Model):
@@ -132,10 +339,25 @@ class Ebook(models.Model):
     doc_url = models.CharField(max_length=255, blank=True, null=True)
     is_archived = models.BooleanField(default=False)  # New field to indicate if the ebook is archived
     description = models.TextField(blank=True, null=True)
+    published_on = models.DateField(blank=True, null=True, help_text="Parsed from publish_date")
+    # Filled in by adminpanel.pdf_pipeline when the row is saved with a new doc_url
+    page_count = models.IntegerField(blank=True, null=True)
+    file_size = models.BigIntegerField(blank=True, null=True, help_text="Size of the PDF in bytes")
+    preview_dir = models.CharField(max_length=255, blank=True, null=True, help_text="Media path of the rendered page previews (page-0001.webp/.jpg, ...)")
+
+    def save(self, *args, **kwargs):
+        self.published_on = parse_loose_date(self.publish_date)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'publish_date' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'published_on'}
+        super().save(*args, **kwargs)
 
     class Meta:
         managed = False
         db_table = 'ebooks'
+        indexes = [
+            models.Index(fields=['published_on'], name='ebooks_published_on_idx'),
+        ]
 
 
 class Authors(models.Model):
@@ -235,3 +457,42 @@ class Contributors(models.Model):
         managed = True
         db_table = 'contributors'
         ordering = ['publication', 'order', 'name']
+
+
+class Job(models.Model):
+    """
+    A unit of background work for `manage.py run_worker` (see adminpanel.jobs).
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100, help_text="Registered task name, e.g. 'pdf.process'")
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    run_at = models.DateTimeField(default=timezone.now, help_text="Earliest time the job may run")
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    # Held while the job is queued or running, so the same work is not enqueued twice
+    unique_key = models.CharField(max_length=255, unique=True, blank=True, null=True)
+    last_error = models.TextField(blank=True, null=True)
+    locked_by = models.CharField(max_length=100, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    # Refreshed by the worker running the job; a stale heartbeat means the worker died
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f'{self.name} #{self.id} ({self.status})'
+
+    class Meta:
+        managed = True
+        db_table = 'jobs'
+        indexes = [
+            # Workers claim due jobs: status='queued' ordered by run_at
+            models.Index(fields=['status', 'run_at'], name='jobs_status_run_at_idx'),
+        ]
@@ -0,0 +1,271 @@
+"""
+Post-upload processing of magazine and ebook PDFs.
+
+When a Magazines/Ebook row is saved with a new doc_url, the pipeline runs on its PDF as
+a background job ('pdf.process', see adminpanel.tasks). It:
+* linearizes the file ("fast web view"), so a reader fetching byte ranges (see
+  adminpanel.media) can show the first page before the rest arrives. Stored files never
+  change, so the linearized copy is stored under its own hash (adminpanel.uploads) and
+  the row's doc_url is pointed at it. media_gc removes the original once no row or
+  frozen table of contents refers to it;
+* records the page count and file size on the Magazines/Ebook row;
+* renders a JPEG and a WebP preview of every page into preview_dir, so readers can
+  show page images progressively.
+
+The libraries are optional and each step is skipped when they are missing:
+pikepdf (or the qpdf binary) for linearization, pypdf (or pikepdf) for the page count,
+and pypdfium2 (or poppler's pdftoppm binary) with Pillow for the previews.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save
+
+from .jobs import enqueue
+from .media import replace_atomically
+from .media_urls import resolve_media_path
+from .models import Ebook, Magazines
+from .uploads import store_staged_file
+
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+try:
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+PDF_PREVIEW_WIDTH = getattr(settings, 'PDF_PREVIEW_WIDTH', 1200)
+PDF_PREVIEW_QUALITY = getattr(settings, 'PDF_PREVIEW_QUALITY', 80)
+PDF_PREVIEW_FORMATS = [('jpg', 'JPEG'), ('webp', 'WEBP')]
+
+# Seconds allowed for the qpdf/pdftoppm binaries per file
+PDF_TOOL_TIMEOUT = 600
+
+# Upload entity types whose PDFs are processed, and the model their entity_id refers to
+PDF_ENTITY_MODELS = {
+    'magazinesPdf': Magazines,
+    'ebooks': Ebook,
+}
+# Directories under uploads/ a bare file name in doc_url may live in, most likely first
+PDF_DIRECTORIES = {
+    Magazines: ['magazinesPdf', 'magazines'],
+    Ebook: ['ebooks/documents'],
+}
+
+
+def preview_dir_for(relative_path):
+    """
+    Helper function to get the media path previews of a PDF are rendered to, e.g.
+    uploads/magazinesPdf/7-0-hilal-archive.pdf -> uploads/previews/magazinesPdf/7-0-hilal-archive
+    """
+    stem = os.path.splitext(relative_path)[0]
+    if stem.startswith('uploads/'):
+        stem = stem[len('uploads/'):]
+    return f'uploads/previews/{stem}'
+
+
+def linearize_pdf(path, output_path):
+    """
+    Write a linearized copy of a PDF to output_path. Returns True when it was written,
+    False when the PDF already is linearized or no tool is available.
+    """
+    if pikepdf is not None:
+        with pikepdf.open(path) as pdf:
+            if pdf.is_linearized:
+                return False
+            replace_atomically(output_path, lambda temp_path: pdf.save(temp_path, linearize=True))
+        return True
+
+    qpdf = shutil.which('qpdf')
+    if qpdf:
+        check = subprocess.run([qpdf, '--is-linearized', path], capture_output=True, timeout=PDF_TOOL_TIMEOUT)
+        if check.returncode == 0:
+            return False
+
+        def write(temp_path):
+            # qpdf exits with 3 for warnings; the output is still written
+            result = subprocess.run([qpdf, '--linearize', path, temp_path], capture_output=True, timeout=PDF_TOOL_TIMEOUT)
+            if result.returncode not in (0, 3):
+                raise RuntimeError(result.stderr.decode('utf-8', 'replace').strip())
+
+        replace_atomically(output_path, write)
+        return True
+    return False
+
+
+def store_linearized_pdf(relative_path):
+    """
+    Linearize a PDF under MEDIA_ROOT into a new content-addressed file next to it.
+    Returns the media path of the linearized file, or relative_path when there was
+    nothing to do.
+    """
+    path = os.path.join(settings.MEDIA_ROOT, relative_path)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+    os.close(fd)
+    try:
+        try:
+            linearized = linearize_pdf(path, temp_path)
+        except Exception:
+            # A PDF the linearizer cannot read is served as uploaded
+            linearized = False
+        if not linearized:
+            os.remove(temp_path)
+            return relative_path
+        return store_staged_file(temp_path, relative_path.split('/')[:-1], '.pdf')[0]
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def count_pdf_pages(path):
+    """
+    Number of pages of a PDF, or None when no PDF library is available.
+    """
+    if pypdf is not None:
+        return len(pypdf.PdfReader(path).pages)
+    if pikepdf is not None:
+        with pikepdf.open(path) as pdf:
+            return len(pdf.pages)
+    return None
+
+
+def _save_preview(image, preview_dir, page_number):
+    image = image.convert('RGB')
+    if image.width > PDF_PREVIEW_WIDTH:
+        image = image.resize((PDF_PREVIEW_WIDTH, round(image.height * PDF_PREVIEW_WIDTH / image.width)), Image.LANCZOS)
+    for extension, image_format in PDF_PREVIEW_FORMATS:
+        target = os.path.join(preview_dir, f'page-{page_number:04d}.{extension}')
+        replace_atomically(target, lambda temp_path: image.save(temp_path, image_format, quality=PDF_PREVIEW_QUALITY))
+
+
+def render_pdf_previews(path, preview_dir):
+    """
+    Render every page of a PDF to preview_dir/page-NNNN.jpg and .webp.
+    Returns the number of pages rendered, or None when no renderer is available.
+    """
+    if Image is None:
+        return None
+    os.makedirs(preview_dir, exist_ok=True)
+
+    if pypdfium2 is not None:
+        pdf = pypdfium2.PdfDocument(path)
+        try:
+            for index in range(len(pdf)):
+                page = pdf[index]
+                scale = PDF_PREVIEW_WIDTH / page.get_width()
+                _save_preview(page.render(scale=scale).to_pil(), preview_dir, index + 1)
+                page.close()
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    pdftoppm = shutil.which('pdftoppm')
+    if pdftoppm:
+        with tempfile.TemporaryDirectory(dir=preview_dir) as render_dir:
+            subprocess.run(
+                [pdftoppm, '-png', '-scale-to-x', str(PDF_PREVIEW_WIDTH), '-scale-to-y', '-1', path, os.path.join(render_dir, 'page')],
+                check=True, capture_output=True, timeout=PDF_TOOL_TIMEOUT
+            )
+            # pdftoppm numbers pages page-1.png, page-01.png, ... depending on the page count
+            rendered = sorted(os.listdir(render_dir), key=lambda name: int(name.rsplit('-', 1)[1].split('.')[0]))
+            for page_number, name in enumerate(rendered, start=1):
+                with Image.open(os.path.join(render_dir, name)) as image:
+                    _save_preview(image, preview_dir, page_number)
+            return len(rendered)
+    return None
+
+
+def process_pdf(relative_path, model=None, pk=None):
+    """
+    Run the pipeline on a PDF under MEDIA_ROOT and store what it found on the `model`
+    row `pk` (when given). Returns the values written.
+    """
+    linearized_path = store_linearized_pdf(relative_path)
+    path = os.path.join(settings.MEDIA_ROOT, linearized_path)
+    values = {
+        'file_size': os.path.getsize(path),
+        'page_count': count_pdf_pages(path),
+    }
+    preview_dir = preview_dir_for(linearized_path)
+    rendered = render_pdf_previews(path, os.path.join(settings.MEDIA_ROOT, preview_dir))
+    if rendered:
+        values['preview_dir'] = preview_dir
+        if values['page_count'] is None:
+            values['page_count'] = rendered
+
+    if model is not None and pk is not None:
+        # The row may have moved on to another PDF while this one was processed
+        row = model.objects.filter(pk=pk).only('id', 'doc_url').first()
+        if row is not None and pdf_for_row(row) == relative_path:
+            if linearized_path != relative_path:
+                # Same form as stored (bare name, uploads/..., /media/... or URL)
+                directory, separator, _ = row.doc_url.strip().rpartition('/')
+                values['doc_url'] = directory + separator + linearized_path.rsplit('/', 1)[1]
+            model.objects.filter(pk=pk, doc_url=row.doc_url).update(**values)
+    return values
+
+
+def pdf_for_row(instance):
+    """
+    Helper function to get the media path of a Magazines/Ebook row's PDF, or None.
+    Bare file names are looked up in the row's upload directories (PDF_DIRECTORIES).
+    """
+    relative_path = None
+    for directory in PDF_DIRECTORIES[type(instance)]:
+        candidate, _ = resolve_media_path(instance.doc_url, directory)
+        if candidate is None:
+            return None
+        relative_path = relative_path or candidate
+        if os.path.exists(os.path.join(settings.MEDIA_ROOT, candidate)):
+            relative_path = candidate
+            break
+    if relative_path and relative_path.lower().endswith('.pdf'):
+        return relative_path
+    return None
+
+
+def _remember_doc_url(sender, instance, raw=False, **kwargs):
+    instance._saved_doc_url = None
+    if not raw and instance.pk is not None:
+        instance._saved_doc_url = sender.objects.filter(pk=instance.pk).values_list('doc_url', flat=True).first()
+
+
+def _process_new_pdf(sender, instance, raw=False, **kwargs):
+    if raw or instance.doc_url == getattr(instance, '_saved_doc_url', None):
+        return
+    relative_path = pdf_for_row(instance)
+    if relative_path is None:
+        return
+    entity_type = next(name for name, model in PDF_ENTITY_MODELS.items() if model is sender)
+    payload = {'relative_path': relative_path, 'entity_type': entity_type, 'entity_id': instance.pk}
+    unique_key = f'pdf.process:{entity_type}:{instance.pk}:{relative_path}'[:255]
+    transaction.on_commit(lambda: enqueue('pdf.process', payload, unique_key=unique_key))
+
+
+def process_on_save(*models):
+    """
+    Queue the pipeline whenever a row of `models` is saved with a new doc_url, whichever
+    view, admin page or command saves it. Called from AppConfig.ready().
+    """
+    for model in models:
+        label = model._meta.label_lower
+        pre_save.connect(_remember_doc_url, sender=model, dispatch_uid=f'pdf_pipeline:{label}:pre_save')
+        post_save.connect(_process_new_pdf, sender=model, dispatch_uid=f'pdf_pipeline:{label}:post_save')
@@ -0,0 +1,111 @@
+"""
+In-process registry of active publications and categories.
+
+Public endpoints receive publications by name or display_name ('hilal-english',
+'Hilal English') and categories by name. Rather than querying for each of those on every
+request, the active rows are loaded once per process and resolved from memory. The
+snapshot is rebuilt when the Publications/Categories versions of the response cache
+change; every save or delete bumps those, so each worker picks up edits on its next request.
+"""
+from .models import Categories, Publications
+from .response_cache import get_model_versions
+
+_snapshot = {'version': None}
+
+
+def normalize_identifier(value):
+    """
+    Helper function to normalize a publication/category identifier for comparison
+    (case, surrounding spaces, and spaces/underscores vs hyphens).
+    """
+    return (value or '').strip().lower().replace(' ', '-').replace('_', '-')
+
+
+def _build_snapshot(version):
+    publications = list(Publications.objects.filter(status='Active').order_by('id'))
+    categories = list(Categories.objects.filter(status='Active').order_by('id'))
+
+    publications_by_name = {}
+    publications_by_display_name = {}
+    publications_by_slug = {}
+    for publication in publications:
+        publications_by_name.setdefault(publication.name, publication)
+        publications_by_display_name.setdefault(publication.display_name, publication)
+    # Normalized names win over normalized display names, as with the exact lookups
+    for publication in publications:
+        publications_by_slug.setdefault(normalize_identifier(publication.name), publication)
+    for publication in publications:
+        publications_by_slug.setdefault(normalize_identifier(publication.display_name), publication)
+
+    categories_by_id = {}
+    categories_by_publication = {}
+    for category in categories:
+        categories_by_id[category.id] = category
+        categories_by_publication.setdefault(category.publication_id, []).append(category)
+
+    return {
+        'version': version,
+        'publications_by_name': publications_by_name,
+        'publications_by_display_name': publications_by_display_name,
+        'publications_by_slug': publications_by_slug,
+        'categories_by_id': categories_by_id,
+        'categories_by_publication': categories_by_publication,
+    }
+
+
+def _get_snapshot():
+    global _snapshot
+    version = get_model_versions([Publications, Categories])
+    if _snapshot['version'] != version:
+        # Swapped in whole, so concurrent readers never see a half-built snapshot
+        _snapshot = _build_snapshot(version)
+    return _snapshot
+
+
+def get_publication(identifier):
+    """
+    Resolve an active publication by name, then display_name, then their normalized forms.
+    Raises Publications.DoesNotExist like Publications.objects.get().
+    """
+    snapshot = _get_snapshot()
+    publication = (
+        snapshot['publications_by_name'].get(identifier)
+        or snapshot['publications_by_display_name'].get(identifier)
+        or snapshot['publications_by_slug'].get(normalize_identifier(identifier))
+    )
+    if publication is None:
+        raise Publications.DoesNotExist(f"Publication '{identifier}' not found or inactive")
+    return publication
+
+
+def get_publication_categories(publication):
+    """
+    Active categories of a publication, ordered by id.
+    """
+    return list(_get_snapshot()['categories_by_publication'].get(publication.id, []))
+
+
+def get_category(publication, identifier):
+    """
+    Resolve an active category of `publication` by name, then by its normalized form.
+    Raises Categories.DoesNotExist like Categories.objects.get().
+    """
+    categories = _get_snapshot()['categories_by_publication'].get(publication.id, [])
+    for category in categories:
+        if category.name == identifier:
+            return category
+    slug = normalize_identifier(identifier)
+    for category in categories:
+        if normalize_identifier(category.name) == slug:
+            return category
+    raise Categories.DoesNotExist(f"Category '{identifier}' not found or inactive")
+
+
+def get_category_by_id(category_id):
+    """
+    Resolve an active category by id. Raises Categories.DoesNotExist when missing or inactive.
+    """
+    category = _get_snapshot()['categories_by_id'].get(category_id)
+    if category is None:
+        raise Categories.DoesNotExist(f"Category with ID {category_id} not found or inactive")
+    return category
@@ -0,0 +1,202 @@
+"""
+Versioned response cache for public read endpoints.
+
+Each cached GET handler declares the models its response is built from. The cache key
+embeds the current version of every one of those models, and every save or delete of a
+model bumps its version (post_save/post_delete, see invalidate_on_write). A write
+therefore invalidates every dependent response at once, with no TTL wait and no key
+scanning. Stale entries are never read again and age out of the cache on their own.
+Writes that bypass the signals (QuerySet.update(), bulk_update(), raw SQL) call
+bump_model_versions() themselves.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from rest_framework.response import Response
+
+CACHE_KEY_PREFIX = 'response-cache'
+
+# Safety net only: version bumps are what normally invalidate entries
+RESPONSE_CACHE_TIMEOUT = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 60 * 60)
+
+# Hit/miss counters are kept per process and added to the shared cache at most this
+# often (seconds), so serving a hit does not write to the cache
+STATS_FLUSH_INTERVAL = getattr(settings, 'RESPONSE_CACHE_STATS_FLUSH_INTERVAL', 30)
+
+# Names of decorated views and cached sections, for the stats endpoint
+CACHED_VIEWS = []
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+_stats_flushed_at = time.monotonic()
+
+
+def _model_label(model):
+    # Named versions (e.g. view_counter.ARTICLE_VIEWS) track data that changes without a model write
+    return model if isinstance(model, str) else model._meta.label_lower
+
+
+def _version_key(model):
+    return f'{CACHE_KEY_PREFIX}:version:{_model_label(model)}'
+
+
+def get_model_versions(models):
+    """
+    Current version of each model. Missing versions (first use or eviction) get a fresh one.
+    """
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = time.time_ns()
+            cache.add(key, versions[key], None)
+            versions[key] = cache.get(key, versions[key])
+    return [versions[key] for key in keys]
+
+
+def bump_model_versions(*models):
+    """
+    Invalidate every cached response built from any of `models`.
+    Saves and deletes do this through invalidate_on_write; call it after writes that
+    send no signals.
+    """
+    cache.set_many({_version_key(model): time.time_ns() for model in models}, None)
+
+
+def _bump_sender_version(sender, **kwargs):
+    bump_model_versions(sender)
+
+
+def invalidate_on_write(*models):
+    """
+    Bump the version of each of `models` whenever one of its rows is saved or deleted,
+    whichever view, admin page or command does it. Called from AppConfig.ready().
+    """
+    for model in models:
+        label = _model_label(model)
+        post_save.connect(_bump_sender_version, sender=model, dispatch_uid=f'{CACHE_KEY_PREFIX}:{label}:save')
+        post_delete.connect(_bump_sender_version, sender=model, dispatch_uid=f'{CACHE_KEY_PREFIX}:{label}:delete')
+
+
+def _flush_stats():
+    global _stats_flushed_at
+    with _stats_lock:
+        pending = dict(_stats)
+        _stats.clear()
+        _stats_flushed_at = time.monotonic()
+
+    deltas = Counter()
+    for (view_name, event), count in pending.items():
+        deltas[f'{CACHE_KEY_PREFIX}:stats:{event}'] += count
+        deltas[f'{CACHE_KEY_PREFIX}:stats:{view_name}:{event}'] += count
+    for key, delta in deltas.items():
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(key, delta, None)
+
+
+def _record(event, view_name):
+    with _stats_lock:
+        _stats[(view_name, event)] += 1
+        due = time.monotonic() - _stats_flushed_at >= STATS_FLUSH_INTERVAL
+    if due:
+        _flush_stats()
+
+
+def get_cache_stats():
+    """
+    Hit/miss counters, overall and per cached view. Other processes' counts lag by up
+    to STATS_FLUSH_INTERVAL; with a backend whose incr() is not atomic (the file cache)
+    concurrent flushes can lose counts, so treat the numbers as approximate.
+    """
+    _flush_stats()
+    events = ['hits', 'misses']
+    keys = [f'{CACHE_KEY_PREFIX}:stats:{event}' for event in events]
+    for view_name in CACHED_VIEWS:
+        keys += [f'{CACHE_KEY_PREFIX}:stats:{view_name}:{event}' for event in events]
+    counters = cache.get_many(keys)
+
+    def summary(prefix):
+        hits = counters.get(f'{prefix}:hits', 0)
+        misses = counters.get(f'{prefix}:misses', 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total else None,
+        }
+
+    stats = summary(f'{CACHE_KEY_PREFIX}:stats')
+    stats['views'] = {
+        view_name: summary(f'{CACHE_KEY_PREFIX}:stats:{view_name}') for view_name in CACHED_VIEWS
+    }
+    return stats
+
+
+def _cache_key(name, raw_key):
+    return f'{CACHE_KEY_PREFIX}:{name}:{hashlib.md5(raw_key.encode("utf-8")).hexdigest()}'
+
+
+def cached_section(name, key, models, builder, timeout=None):
+    """
+    Return the cached value of `builder()` for `key`, building and storing it on a miss.
+    Like cached_response, for parts of a response (e.g. sections of the homepage).
+    `builder` must not return None.
+    """
+    if name not in CACHED_VIEWS:
+        CACHED_VIEWS.append(name)
+    versions = get_model_versions(models)
+    cache_key = _cache_key(name, f'{key}:{versions}')
+
+    data = cache.get(cache_key)
+    if data is not None:
+        _record('hits', name)
+        return data
+
+    _record('misses', name)
+    data = builder()
+    cache.set(cache_key, data, RESPONSE_CACHE_TIMEOUT if timeout is None else timeout)
+    return data
+
+
+def cached_response(*models, timeout=None):
+    """
+    Decorator for APIView.get handlers whose response depends only on the URL and on `models`.
+    Only 200 responses are stored. Adds an X-Cache: HIT/MISS header.
+    """
+    def decorator(view_method):
+        view_name = view_method.__qualname__.split('.')[0]
+        if view_name not in CACHED_VIEWS:
+            CACHED_VIEWS.append(view_name)
+
+        @wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            versions = get_model_versions(models)
+            query = sorted(request.GET.lists())
+            key = _cache_key(view_name, f'{view_name}:{request.path}:{query}:{versions}')
+
+            data = cache.get(key)
+            if data is not None:
+                _record('hits', view_name)
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            _record('misses', view_name)
+            response = view_method(view, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, RESPONSE_CACHE_TIMEOUT if timeout is None else timeout)
+            response['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+    return decorator
@@ -0,0 +1,107 @@
+"""
+Full-text search helpers backed by MySQL FULLTEXT indexes.
+
+The indexes are created in migration 0045_add_fulltext_search_indexes. InnoDB's default
+parser splits on whitespace and punctuation, which works for both English and Urdu text.
+On other database vendors (local SQLite) the helpers fall back to __icontains.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# InnoDB ignores tokens shorter than innodb_ft_min_token_size (default 3)
+FULLTEXT_MIN_TOKEN_LENGTH = 3
+
+# InnoDB's default stopword list; a required stopword would make every query miss
+INNODB_STOPWORDS = {
+    'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en', 'for', 'from',
+    'how', 'i', 'in', 'is', 'it', 'la', 'of', 'on', 'or', 'that', 'the', 'this', 'to',
+    'was', 'what', 'when', 'where', 'who', 'will', 'with', 'und', 'www',
+}
+
+# Words of user input: letters and digits, plus the Arabic-script combining marks
+# (zer, zabar, pesh, ...) Urdu words may carry. Everything else, BOOLEAN MODE operators
+# and punctuation alike, separates words as it does for InnoDB's parser.
+WORD_RE = re.compile(r'[\w\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06dc\u06df-\u06e8\u06ea-\u06ed]+')
+
+# Columns covered by a FULLTEXT index, per table. The first entry of each list is
+# the full index; any further entries are boosted sub-indexes (e.g. title only).
+FULLTEXT_INDEXES = {
+    'articles': [('title', 'description'), ('title',)],
+    'billboards': [('title',)],
+    'ebooks': [('title',)],
+    'authors': [('author_name', 'email')],
+}
+
+
+def search_words(term):
+    """
+    Helper function to split a search term into words, split into those in the
+    FULLTEXT index and those too short to be (e.g. two-letter Urdu words).
+    Stopwords are left out of both; InnoDB ignores them.
+    """
+    indexed, short = [], []
+    for word in WORD_RE.findall(term or ''):
+        if word.lower() in INNODB_STOPWORDS:
+            continue
+        (indexed if len(word) >= FULLTEXT_MIN_TOKEN_LENGTH else short).append(word)
+    return indexed, short
+
+
+def build_boolean_query(term):
+    """
+    Turn free text typed by a user into a BOOLEAN MODE query.
+    Every word is required and prefix-matched so results narrow on each keystroke.
+    Returns None when no word is long enough to be in the index.
+    """
+    indexed, short = search_words(term)
+    if not indexed:
+        return None
+    return ' '.join(f'+{word}*' for word in indexed)
+
+
+def _match_sql(queryset, columns):
+    table = connection.ops.quote_name(queryset.model._meta.db_table)
+    column_sql = ', '.join(f'{table}.{connection.ops.quote_name(column)}' for column in columns)
+    return f'MATCH ({column_sql}) AGAINST (%s IN BOOLEAN MODE)'
+
+
+def fulltext_search(queryset, term):
+    """
+    Filter a queryset to rows matching `term` and annotate it with `search_rank`.
+    Matches on a boosted sub-index (article titles) count double.
+    Callers order by '-search_rank' for relevance.
+    """
+    table = queryset.model._meta.db_table
+    indexes = FULLTEXT_INDEXES[table]
+    query = build_boolean_query(term)
+    indexed, short = search_words(term)
+
+    if connection.vendor != 'mysql' or query is None:
+        # Short terms are not in the index; fall back to a substring match
+        # on the narrowest column set (article titles only, as before)
+        condition = Q()
+        for column in indexes[-1]:
+            condition |= Q(**{f'{column}__icontains': term})
+        return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    match_sql = _match_sql(queryset, indexes[0])
+    rank_sql = match_sql
+    rank_params = [query]
+    for boosted_columns in indexes[1:]:
+        rank_sql += f' + 2 * {_match_sql(queryset, boosted_columns)}'
+        rank_params.append(query)
+
+    queryset = queryset.filter(RawSQL(match_sql, [query], output_field=BooleanField()))
+    # Words too short for the index are still required, as substrings
+    for word in short:
+        condition = Q()
+        for column in indexes[0]:
+            condition |= Q(**{f'{column}__icontains': word})
+        queryset = queryset.filter(condition)
+
+    return queryset.annotate(
+        search_rank=RawSQL(rank_sql, rank_params, output_field=FloatField())
+    )
@@ -1,10 +1,51 @@
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 
 from django.conf import settings
 from rest_framework import serializers
 
+from .images import image_srcset
+from .media_urls import build_media_url, get_media_base_url
 from .models import Comments, Articles, Billboards, Ebook, Magazines, Authors, Videos, Publications, Categories, Contributors
 
+
+class SparseFieldsMixin:
+    """
+    Lets callers pass fields=[...] to emit only a subset of the declared fields.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class MediaURLField(serializers.Field):
+    """
+    Read-only URL of a stored media reference (see adminpanel.media_urls). Bare file
+    names are resolved against uploads/<default_subdir>/.
+    """
+
+    def __init__(self, default_subdir, **kwargs):
+        self.default_subdir = default_subdir
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return build_media_url(value, self.default_subdir, base=get_media_base_url(self.context.get('request')))
+
+
+class ImageSrcsetField(MediaURLField):
+    """
+    Read-only srcset strings per format ({'webp': ..., 'jpg': ...}) for an image field,
+    pointing at its resized derivatives (see adminpanel.images).
+    """
+
+    def to_representation(self, value):
+        return image_srcset(value, self.default_subdir, base=get_media_base_url(self.context.get('request')))
+
+
 class CommentSerializer(serializers.ModelSerializer):
     user_first_name = serializers.CharField(source="user.fname", read_only=True)
     user_last_name = serializers.CharField(source="user.lname", read_only=True)
@@ -15,7 +56,7 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ['id', 'comment', 'user', 'user_first_name', 'user_last_name', 'article', 'article_title', 'created_at', 'rating']
         read_only_fields = ['id', 'created_at']
 
-class ArticleSerializer(serializers.ModelSerializer):
+class ArticleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     category_display_name = serializers.CharField(source='category.display_name', read_only=True)
     publication_name = serializers.CharField(source='publication.name', read_only=True)
@@ -23,11 +64,14 @@ class ArticleSerializer(serializers.ModelSerializer):
     magazine_title = serializers.CharField(source='magazine.title', read_only=True)
     author_name = serializers.CharField(source='author.author_name', read_only=True)
     author_image = serializers.CharField(source='author.author_image', read_only=True)
+    author_image_url = MediaURLField('authors', source='author.author_image')
+    cover_image_url = MediaURLField('articles', source='cover_image')
+    cover_image_srcset = ImageSrcsetField('articles', source='cover_image')
     
     class Meta:
         model = Articles
-        fields = ['id', 'author', 'publication', 'magazine', 'category', 'category_name', 'category_display_name', 'publication_name', 'publication_display_name', 'magazine_title', 'cover_image', 'title', 'publish_date', 'publish_date_year', 'publish_date_month', 'visits', 'issue_new', 'status', 'description', 'section', 'author_name', 'author_image']
-        read_only_fields = ['id', 'category_name', 'category_display_name', 'publication_name', 'publication_display_name', 'magazine_title', 'author_name', 'author_image']
+        fields = ['id', 'author', 'publication', 'magazine', 'category', 'category_name', 'category_display_name', 'publication_name', 'publication_display_name', 'magazine_title', 'cover_image', 'cover_image_url', 'cover_image_srcset', 'title', 'publish_date', 'publish_date_year', 'publish_date_month', 'visits', 'issue_new', 'status', 'description', 'excerpt', 'section', 'author_name', 'author_image', 'author_image_url']
+        read_only_fields = ['id', 'category_name', 'category_display_name', 'publication_name', 'publication_display_name', 'magazine_title', 'cover_image_url', 'cover_image_srcset', 'author_name', 'author_image', 'author_image_url', 'publish_date_year', 'publish_date_month', 'excerpt']
         extra_kwargs = {
             'author': {'required': False},
             'publication': {'required': False},
@@ -36,8 +80,6 @@ class ArticleSerializer(serializers.ModelSerializer):
             'cover_image': {'required': False},
             'title': {'required': True},
             'publish_date': {'required': False},
-            'publish_date_year': {'required': False},
-            'publish_date_month': {'required': False},
             'visits': {'required': False},
             'issue_new': {'required': False},
             'status': {'required': False},
@@ -45,34 +87,48 @@ class ArticleSerializer(serializers.ModelSerializer):
             'section': {'required': False},
         }
 
+
+class ArticleListSerializer(ArticleSerializer):
+    """
+    Card/list representation: the excerpt instead of the full description body.
+    """
+
+    class Meta(ArticleSerializer.Meta):
+        fields = [field for field in ArticleSerializer.Meta.fields if field != 'description']
+
 class BillboardSerializer(serializers.ModelSerializer):
+    image_url = MediaURLField('billboards', source='image')
+    image_srcset = ImageSrcsetField('billboards', source='image')
+
     class Meta:
         model = Billboards
-        fields = ['id', 'user', 'image', 'title', 'created', 'location', 'issue_news', 'status']
-        read_only_fields = ['id']
+        fields = ['id', 'user', 'image', 'image_url', 'image_srcset', 'title', 'created', 'location', 'issue_news', 'status']
+        read_only_fields = ['id', 'image_url', 'image_srcset']
 
 class MagazineSerializer(serializers.ModelSerializer):
     publication_name = serializers.CharField(source='publication.name', read_only=True)
     publication_display_name = serializers.CharField(source='publication.display_name', read_only=True)
+    cover_image_url = MediaURLField('magazines', source='cover_image')
+    cover_image_srcset = ImageSrcsetField('magazines', source='cover_image')
+    document_url = MediaURLField('magazinesPdf', source='doc_url')
     
     class Meta:
         model = Magazines
-        fields = ['id', 'title', 'publish_date', 'language', 'direction', 'status', 'cover_image', 'doc_url', 'publication', 'publication_name', 'publication_display_name', 'year', 'month']
-        read_only_fields = ['id', 'publication_name', 'publication_display_name']
+        fields = ['id', 'title', 'publish_date', 'language', 'direction', 'status', 'cover_image', 'cover_image_url', 'cover_image_srcset', 'doc_url', 'document_url', 'publication', 'publication_name', 'publication_display_name', 'year', 'month', 'article_count', 'page_count', 'file_size', 'preview_dir']
+        read_only_fields = ['id', 'publication_name', 'publication_display_name', 'cover_image_url', 'cover_image_srcset', 'document_url', 'article_count', 'page_count', 'file_size', 'preview_dir']
     
 class EbookSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ebook
-        fields = ['id', 'title', 'publish_date', 'language', 'direction', 'status', 'cover_image', 'is_archived', 'doc_url', 'description']
-        read_only_fields = ['id']
+        fields = ['id', 'title', 'publish_date', 'language', 'direction', 'status', 'cover_image', 'is_archived', 'doc_url', 'description', 'page_count', 'file_size', 'preview_dir']
+        read_only_fields = ['id', 'page_count', 'file_size', 'preview_dir']
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
 
-        request = self.context.get('request') if hasattr(self, 'context') else None
-
-        data['cover_image'] = self._build_file_url(data.get('cover_image'), 'ebooks/covers', request)
-        data['doc_url'] = self._build_file_url(data.get('doc_url'), 'ebooks/documents', request)
+        base = get_media_base_url(self.context.get('request'))
+        data['cover_image'] = build_media_url(data.get('cover_image'), 'ebooks/covers', base=base)
+        data['doc_url'] = build_media_url(data.get('doc_url'), 'ebooks/documents', base=base)
 
         return data
 
@@ -105,39 +161,15 @@ class EbookSerializer(serializers.ModelSerializer):
 
         return value
 
-    def _build_file_url(self, value, default_subdir, request):
-        """
-        Build a fully qualified URL for stored files.
-        """
-        if not value:
-            return value
-
-        cleaned_value = value.strip()
-
-        # Already an absolute URL
-        if cleaned_value.startswith('http://') or cleaned_value.startswith('https://'):
-            return cleaned_value
-
-        cleaned_value = cleaned_value.lstrip('/')
-
-        if cleaned_value.startswith('uploads/'):
-            relative_path = cleaned_value
-        else:
-            relative_path = f"uploads/{default_subdir}/{cleaned_value}"
-
-        media_relative_url = f"{settings.MEDIA_URL.rstrip('/')}/{relative_path}"
-
-        if request:
-            return request.build_absolute_uri(media_relative_url)
-
-        return media_relative_url
-
 
 class AuthorSerializer(serializers.ModelSerializer):
+    author_image_url = MediaURLField('authors', source='author_image')
+    author_image_srcset = ImageSrcsetField('authors', source='author_image')
+
     class Meta:
         model = Authors
-        fields = ['id', 'author_image', 'author_name', 'email', 'contact_no', 'no_of_articles', 'status', 'category', 'introduction']
-        read_only_fields = ['id']
+        fields = ['id', 'author_image', 'author_image_url', 'author_image_srcset', 'author_name', 'email', 'contact_no', 'no_of_articles', 'status', 'category', 'introduction']
+        read_only_fields = ['id', 'author_image_url', 'author_image_srcset']
 
 
 class VideosSerializer(serializers.ModelSerializer):
@@ -147,10 +179,13 @@ class VideosSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'video_id', 'thumbnail_url', 'created_at', 'updated_at']
 
 class PublicationsSerializer(serializers.ModelSerializer):
+    cover_image_url = MediaURLField('publications', source='cover_image')
+    cover_image_srcset = ImageSrcsetField('publications', source='cover_image')
+
     class Meta:
         model = Publications
-        fields = ['id', 'name', 'display_name', 'cover_image', 'description', 'status', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'display_name', 'cover_image', 'cover_image_url', 'cover_image_srcset', 'description', 'status', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'cover_image_url', 'cover_image_srcset', 'created_at', 'updated_at']
 
 
 class CategoriesSerializer(serializers.ModelSerializer):
@@ -165,8 +200,10 @@ class CategoriesSerializer(serializers.ModelSerializer):
 class ContributorsSerializer(serializers.ModelSerializer):
     publication_name = serializers.CharField(source='publication.name', read_only=True)
     publication_display_name = serializers.CharField(source='publication.display_name', read_only=True)
+    cover_image_url = MediaURLField('hilalteam', source='cover_image')
+    cover_image_srcset = ImageSrcsetField('hilalteam', source='cover_image')
     
     class Meta:
         model = Contributors
-        fields = ['id', 'publication', 'publication_name', 'publication_display_name', 'name', 'designation', 'about', 'cover_image', 'order', 'status', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'publication_name', 'publication_display_name', 'created_at', 'updated_at']
+        fields = ['id', 'publication', 'publication_name', 'publication_display_name', 'name', 'designation', 'about', 'cover_image', 'cover_image_url', 'cover_image_srcset', 'order', 'status', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'publication_name', 'publication_display_name', 'cover_image_url', 'cover_image_srcset', 'created_at', 'updated_at']
@@ -0,0 +1,62 @@
+"""
+Background tasks run by `manage.py run_worker` (see adminpanel.jobs).
+
+Upload handlers enqueue 'images.derivatives' and magazine/ebook saves 'pdf.process'; the
+monthly magazine assignment and the cleanup of old jobs and abandoned chunked uploads
+are periodic and need no cron entry.
+"""
+from datetime import datetime, time, timedelta
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from .chunked_uploads import purge_expired_sessions
+from .images import generate_image_derivatives
+from .jobs import purge_finished_jobs, task
+from .pdf_pipeline import PDF_ENTITY_MODELS, process_pdf
+from .response_cache import bump_model_versions
+
+
+def first_of_next_month(after):
+    """
+    Helper function to get 02:00 (local time) on the 1st of the month after `after`,
+    when the monthly magazine assignment runs.
+    """
+    after = timezone.localtime(after)
+    year, month = (after.year + 1, 1) if after.month == 12 else (after.year, after.month + 1)
+    return timezone.make_aware(datetime.combine(datetime(year, month, 1).date(), time(2, 0)))
+
+
+@task('pdf.process', kind='cpu')
+def process_uploaded_pdf(relative_path, entity_type=None, entity_id=None):
+    model = PDF_ENTITY_MODELS.get(entity_type)
+    values = process_pdf(relative_path, model, entity_id)
+    if model is not None and entity_id is not None:
+        bump_model_versions(model)
+    return values
+
+
+@task('images.derivatives', kind='cpu')
+def render_image_derivatives(relative_path):
+    return generate_image_derivatives(relative_path)
+
+
+@task('magazines.assign', max_attempts=3, every=first_of_next_month)
+def assign_magazines_monthly():
+    call_command('assign_magazine_to_articles')
+
+
+@task('media.migrate_remote', max_attempts=1)
+def migrate_remote_media(**options):
+    # Resumes from its checkpoint, so a rerun only picks up what is left
+    call_command('migrate_remote_media', **options)
+
+
+@task('jobs.purge', every=timedelta(days=1))
+def purge_jobs():
+    return purge_finished_jobs()
+
+
+@task('uploads.purge', every=timedelta(hours=1))
+def purge_chunked_uploads():
+    return purge_expired_sessions()
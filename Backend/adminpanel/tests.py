@@ -1,3 +1,1203 @@
-from django.test import TestCase
+import base64
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.migrations.loader import MigrationLoader
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.models import CustomUser
+
+from .checks import check_media_host
+from .chunked_uploads import CHUNK_READ_SIZE
+from .images import Image, _srcset_candidates, image_srcset
+from .jobs import claim_jobs, complete_job, enqueue, fail_job, heartbeat_jobs, requeue_stale_jobs
+from .media import media_etag
+from .media_urls import build_media_url
+from .magazine_assignment import assign_article_magazine, assign_magazine_articles
+from .magazine_contents import publish_table_of_contents, refresh_magazine_article_counts
+from .models import Articles, Authors, Categories, Contributors, Job, Magazines, Publications, Videos
+from .pdf_pipeline import pdf_for_row
+from .response_cache import get_cache_stats, get_model_versions
+from .search import build_boolean_query, fulltext_search, search_words
+from .tasks import process_uploaded_pdf
+from .uploads import store_upload
+from .view_counter import apply_article_views, record_article_view
+from .views import (
+    GetAllVideosView,
+    GetArticlesByPublicationView,
+    GetFilteredArticlesView,
+    GetHomePageView,
+    GetPopularArticlesView,
+    GetTrendingArticlesView,
+    MagazineContentsView,
+    ResponseCacheStatsView,
+    SingleArticleView,
+    decode_article_cursor,
+    encode_article_cursor,
+)
+
+
+@skipUnless(connection.vendor == 'mysql', 'Query plans are only checked against MySQL')
+class ArticlesQueryPlanTests(TestCase):
+    """
+    Capture EXPLAIN for the queries each public article endpoint runs and fail if the
+    articles table is read with a full table scan or sorted with a filesort.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.publications = []
+        cls.categories = []
+        for pub_index in range(4):
+            publication = Publications.objects.create(
+                name=f'publication-{pub_index}',
+                display_name=f'Publication {pub_index}',
+                status='Active'
+            )
+            cls.publications.append(publication)
+            for category_name in ['in-focus', 'national-news', 'miscellaneous']:
+                cls.categories.append(Categories.objects.create(
+                    name=category_name,
+                    display_name=category_name.title(),
+                    publication=publication,
+                    status='Active'
+                ))
+
+        # Enough rows spread over publications/categories that the optimizer
+        # prefers the composite indexes over scanning the table
+        base_date = timezone.now()
+        articles = []
+        for i in range(600):
+            category = cls.categories[i % len(cls.categories)]
+            articles.append(Articles(
+                title=f'Article {i}',
+                publication=category.publication,
+                category=category,
+                status='Active' if i % 5 else 'Inactive',
+                publish_date=base_date - timedelta(days=i),
+            ))
+        Articles.objects.bulk_create(articles)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE TABLE articles')
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.publication = self.publications[0]
+        self.category = self.categories[0]
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN {sql}')
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def assertArticlesQueriesUseIndexes(self, view, request, allow_filesort=False, **kwargs):
+        with CaptureQueriesContext(connection) as captured:
+            response = view(request, **kwargs)
+        self.assertEqual(response.status_code, 200, response.data)
+
+        article_queries = [
+            query['sql'] for query in captured.captured_queries
+            if query['sql'].startswith('SELECT') and '`articles`' in query['sql']
+        ]
+        self.assertTrue(article_queries, 'Endpoint did not query the articles table')
+
+        for sql in article_queries:
+            for row in self.explain(sql):
+                if row['table'] != 'articles':
+                    continue
+                self.assertNotEqual(row['type'], 'ALL', f'Full table scan:\n{sql}\n{row}')
+                if not allow_filesort:
+                    self.assertNotIn('Using filesort', row['Extra'] or '', f'Filesort:\n{sql}\n{row}')
+
+    def test_filtered_articles_by_publication(self):
+        request = self.factory.get('/api/articles/filtered/', {'publication': self.publication.name})
+        self.assertArticlesQueriesUseIndexes(GetFilteredArticlesView.as_view(), request)
+
+    def test_filtered_articles_by_publication_with_cursor(self):
+        request = self.factory.get('/api/articles/filtered/', {
+            'publication': self.publication.name,
+            'cursor': '',
+            'page_size': 10
+        })
+        self.assertArticlesQueriesUseIndexes(GetFilteredArticlesView.as_view(), request)
+
+    def test_filtered_articles_by_category(self):
+        request = self.factory.get('/api/articles/filtered/', {'category_id': self.category.id})
+        self.assertArticlesQueriesUseIndexes(GetFilteredArticlesView.as_view(), request)
+
+    def test_filtered_articles_by_author(self):
+        request = self.factory.get('/api/articles/filtered/', {'author_id': 1})
+        self.assertArticlesQueriesUseIndexes(GetFilteredArticlesView.as_view(), request)
+
+    def test_filtered_articles_by_magazine(self):
+        request = self.factory.get('/api/articles/filtered/', {'magazine_id': 1})
+        self.assertArticlesQueriesUseIndexes(GetFilteredArticlesView.as_view(), request)
+
+    def test_trending_articles(self):
+        request = self.factory.get(f'/api/articles/trending/{self.publication.name}/')
+        # ROW_NUMBER() OVER (PARTITION BY category_id ...) sorts each partition;
+        # the rows it ranks must still come from an index
+        self.assertArticlesQueriesUseIndexes(
+            GetTrendingArticlesView.as_view(), request, allow_filesort=True, publication_name=self.publication.name
+        )
+
+    def test_single_article_recent_articles(self):
+        article = Articles.objects.filter(publication=self.publication, status='Active').first()
+        request = self.factory.get(f'/api/article/{article.id}/')
+        self.assertArticlesQueriesUseIndexes(SingleArticleView.as_view(), request, pk=article.id)
+
+    def test_articles_by_publication(self):
+        request = self.factory.get(f'/api/articles/publication/{self.publication.name}/')
+        self.assertArticlesQueriesUseIndexes(
+            GetArticlesByPublicationView.as_view(), request, publication_name=self.publication.name
+        )
+
+
+class ArticleCursorTests(TestCase):
+    """
+    Malformed keyset cursors are rejected with 400, never a server error.
+    """
+
+    def encode(self, payload):
+        raw = json.dumps(payload).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def test_round_trip(self):
+        article = Articles.objects.create(title='Article', status='Active', publish_date=timezone.now())
+        self.assertEqual(
+            list(Articles.objects.filter(decode_article_cursor(encode_article_cursor(article)))),
+            []
+        )
+
+    def test_malformed_cursors_are_rejected(self):
+        for cursor in [
+            'not base64!',
+            self.encode([1, 2]),
+            self.encode({'d': '2025-01-01T00:00:00'}),
+            self.encode({'d': 20250101, 'i': 5}),
+            self.encode({'d': ['2025-01-01'], 'i': 5}),
+            self.encode({'d': 'yesterday', 'i': 5}),
+            self.encode({'d': None, 'i': 'x'}),
+        ]:
+            with self.assertRaises(ValueError, msg=cursor):
+                decode_article_cursor(cursor)
+
+    def test_view_answers_400(self):
+        request = APIRequestFactory().get('/api/articles/filtered/', {'cursor': self.encode({'d': 5, 'i': 5})})
+        response = GetFilteredArticlesView.as_view()(request)
+        self.assertEqual(response.status_code, 400)
+
+
+class SearchQueryTests(TestCase):
+    """
+    Search input is split into words the way InnoDB's parser splits indexed text.
+    """
+
+    def test_punctuation_separates_words(self):
+        self.assertEqual(build_boolean_query('Pakistan,'), '+Pakistan*')
+        self.assertEqual(build_boolean_query('hilal/urdu'), '+hilal* +urdu*')
+        self.assertEqual(build_boolean_query('"army" +(navy) -air~force@'), '+army* +navy* +air* +force*')
+
+    def test_urdu_words_keep_their_marks(self):
+        self.assertEqual(build_boolean_query('پاکستانِ، دفاع'), '+پاکستانِ* +دفاع*')
+
+    def test_short_words_and_stopwords(self):
+        self.assertEqual(search_words('the ISI of پاک فوج کا'), (['ISI', 'پاک', 'فوج'], ['کا']))
+        self.assertEqual(search_words('AI in war'), (['war'], ['AI']))
+        self.assertIsNone(build_boolean_query('of AI'))
+        self.assertIsNone(build_boolean_query(' ,/ '))
+
+    @skipUnless(connection.vendor != 'mysql', 'Substring fallback of other database vendors')
+    def test_fallback_matches_substrings(self):
+        Articles.objects.create(title='Pakistan Navy')
+        Articles.objects.create(title='Air Force')
+        self.assertEqual(
+            [article.title for article in fulltext_search(Articles.objects.all(), 'navy')],
+            ['Pakistan Navy']
+        )
+
+    @skipUnless(connection.vendor == 'mysql', 'FULLTEXT indexes are MySQL only')
+    def test_short_words_are_required(self):
+        Articles.objects.create(title='AI in the Pakistan Navy')
+        Articles.objects.create(title='Pakistan Navy exercises')
+        titles = [article.title for article in fulltext_search(Articles.objects.all(), 'Pakistan, AI')]
+        self.assertEqual(titles, ['AI in the Pakistan Navy'])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ResponseCacheTests(TestCase):
+    """
+    Saves and deletes invalidate cached responses; cache hits do not write stats.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+
+    def test_saves_and_deletes_bump_versions(self):
+        publication = Publications.objects.create(name='hilal-english', display_name='Hilal English')
+        version = get_model_versions([Publications])
+        publication.display_name = 'Hilal'
+        publication.save()
+        self.assertNotEqual(get_model_versions([Publications]), version)
+
+        version = get_model_versions([Publications])
+        articles_version = get_model_versions([Articles])
+        publication.delete()
+        self.assertNotEqual(get_model_versions([Publications]), version)
+        self.assertEqual(get_model_versions([Articles]), articles_version)
+
+    def test_cached_responses_follow_writes(self):
+        view = GetAllVideosView.as_view()
+        first = view(self.factory.get('/api/videos/'))
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(view(self.factory.get('/api/videos/'))['X-Cache'], 'HIT')
+
+        Videos.objects.create(title='New', youtube_url='https://www.youtube.com/watch?v=abc')
+        response = view(self.factory.get('/api/videos/'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertNotEqual(response.data, first.data)
+
+    def test_hits_are_counted_without_cache_writes(self):
+        view = GetAllVideosView.as_view()
+        view(self.factory.get('/api/videos/'))
+        before = get_cache_stats()['views']['GetAllVideosView']
+
+        with mock.patch.object(cache, 'incr') as incr, mock.patch.object(cache, 'add') as add:
+            for _ in range(5):
+                self.assertEqual(view(self.factory.get('/api/videos/'))['X-Cache'], 'HIT')
+        incr.assert_not_called()
+        add.assert_not_called()
+
+        after = get_cache_stats()['views']['GetAllVideosView']
+        self.assertEqual((after['hits'] - before['hits'], after['misses'] - before['misses']), (5, 0))
+
+    def test_stats_are_for_staff_only(self):
+        view = ResponseCacheStatsView.as_view()
+        self.assertIn(view(self.factory.get('/api/cache/stats/')).status_code, (401, 403))
+
+        request = self.factory.get('/api/cache/stats/')
+        force_authenticate(request, CustomUser.objects.create_superuser(email='admin@hilal.gov.pk', password='x'))
+        self.assertEqual(view(request).status_code, 200)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ConditionalResponseTests(TestCase):
+    """
+    Validators come from model versions: a revalidation costs no table scan.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+
+    def test_304_until_a_write(self):
+        view = GetAllVideosView.as_view()
+        response = view(self.factory.get('/api/videos/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as captured:
+            response = view(self.factory.get('/api/videos/', HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(captured.captured_queries, [])
+
+        Videos.objects.create(title='New', youtube_url='https://www.youtube.com/watch?v=abc')
+        response = view(self.factory.get('/api/videos/', HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detail_validators_read_the_row_by_pk(self):
+        publication = Publications.objects.create(name='hilal-english', display_name='Hilal English')
+        article = Articles.objects.create(title='Article', publication=publication, status='Active')
+        view = SingleArticleView.as_view()
+        etag = view(self.factory.get(f'/api/article/{article.id}/'), pk=article.id)['ETag']
+
+        with CaptureQueriesContext(connection) as captured:
+            response = view(self.factory.get(f'/api/article/{article.id}/', HTTP_IF_NONE_MATCH=etag), pk=article.id)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(captured.captured_queries), 1)
+        self.assertNotIn('MAX(', captured.captured_queries[0]['sql'].upper())
+
+        # update() sends no signal; the row's updated_at still changes the validator
+        Articles.objects.filter(pk=article.pk).update(title='Renamed')
+        response = view(self.factory.get(f'/api/article/{article.id}/', HTTP_IF_NONE_MATCH=etag), pk=article.id)
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class PopularArticlesTests(TestCase):
+    """
+    Flushing view counts changes the ranking, so it must change the validators too.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.publication = Publications.objects.create(name='hilal-english', display_name='Hilal English', status='Active')
+        self.first = Articles.objects.create(title='First', publication=self.publication, status='Active')
+        self.second = Articles.objects.create(title='Second', publication=self.publication, status='Active')
+        apply_article_views({self.first.id: 5, self.second.id: 1})
+
+    def get(self, **headers):
+        request = self.factory.get(f'/api/articles/popular/{self.publication.name}/', **headers)
+        return GetPopularArticlesView.as_view()(request, publication_name=self.publication.name)
+
+    def test_flush_changes_ranking_and_etag(self):
+        response = self.get()
+        self.assertEqual([article['title'] for article in response.data['data']], ['First', 'Second'])
+        etag = response['ETag']
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        apply_article_views({self.second.id: 50})
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual([article['title'] for article in response.data['data']], ['Second', 'First'])
+
+    def test_limit_is_clamped_and_validated(self):
+        view = GetPopularArticlesView.as_view()
+        path = f'/api/articles/popular/{self.publication.name}/'
+        response = view(self.factory.get(path, {'limit': '-3'}), publication_name=self.publication.name)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([article['title'] for article in response.data['data']], ['First'])
+        response = view(self.factory.get(path, {'limit': 'six'}), publication_name=self.publication.name)
+        self.assertEqual(response.status_code, 400)
+
+    def test_flush_keeps_recent_trending_cached(self):
+        view = GetTrendingArticlesView.as_view()
+        path = f'/api/articles/trending/{self.publication.name}/'
+        view(self.factory.get(path), publication_name=self.publication.name)
+        apply_article_views({self.second.id: 50})
+        response = view(self.factory.get(path), publication_name=self.publication.name)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        response = view(self.factory.get(path, {'sort': 'popular'}), publication_name=self.publication.name)
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_flush_changes_article_etag(self):
+        view = SingleArticleView.as_view()
+        path = f'/api/articles/{self.first.id}/'
+        with mock.patch('adminpanel.view_counter.record_article_view'):
+            etag = view(self.factory.get(path), pk=self.first.id)['ETag']
+            apply_article_views({self.first.id: 1})
+            response = view(self.factory.get(path, HTTP_IF_NONE_MATCH=etag), pk=self.first.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['article']['visits'], 6)
+
+    def test_first_buffered_view_schedules_a_flush(self):
+        with mock.patch('adminpanel.view_counter._buffer', Counter()), \
+                mock.patch('adminpanel.view_counter._last_flush', time.monotonic()), \
+                mock.patch('adminpanel.view_counter.threading.Timer') as timer, \
+                mock.patch('adminpanel.view_counter.flush_article_views') as flush, \
+                mock.patch('adminpanel.view_counter.connection'):
+            record_article_view(self.first.id)
+            record_article_view(self.second.id)
+            timer.assert_called_once()
+            timer.return_value.start.assert_called_once()
+            flush.assert_not_called()
+            timer.call_args.args[1]()
+            flush.assert_called_once()
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class HomePageTests(TestCase):
+    """
+    The previous-month magazines section turns over on the 1st without any write.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.publication = Publications.objects.create(name='hilal-english', display_name='Hilal English', status='Active')
+
+    def get(self, at, **headers):
+        request = APIRequestFactory().get(f'/api/home/{self.publication.name}/', {'sections': 'magazines'}, **headers)
+        with mock.patch('adminpanel.views.now', return_value=at):
+            response = GetHomePageView.as_view()(request, publication_name=self.publication.name)
+        return response
+
+    def magazine(self, year, month):
+        return Magazines.objects.create(
+            title=f'Hilal {month} {year}', language='English', direction='LTR', status='Active',
+            publication=self.publication, year=year, month=month
+        )
+
+    def titles(self, response):
+        return [magazine['title'] for magazine in response.data['sections']['magazines']]
+
+    def test_month_boundary_changes_validators_and_section(self):
+        self.magazine(2026, 'September')
+        self.magazine(2026, 'October')
+        october = timezone.make_aware(datetime(2026, 10, 31, 23, 0))
+        november = timezone.make_aware(datetime(2026, 11, 1, 1, 0))
+
+        response = self.get(october)
+        self.assertEqual(self.titles(response), ['Hilal September 2026'])
+        etag = response['ETag']
+        response = self.get(october, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # The section key and the list it holds both move to November
+        response = self.get(november, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.titles(response), ['Hilal October 2026', 'Hilal September 2026'])
+
+
+class MagazineContentsTests(TestCase):
+    """
+    Reading the contents of an issue never writes; the count matches the contents.
+    """
+
+    def setUp(self):
+        self.publication = Publications.objects.create(name='hilal-english', display_name='Hilal English')
+        self.magazine = Magazines.objects.create(
+            title='Hilal', language='English', direction='LTR', publication=self.publication, status='Active'
+        )
+
+    def get(self):
+        request = APIRequestFactory().get(f'/api/magazines/{self.magazine.pk}/contents/')
+        return MagazineContentsView.as_view()(request, pk=self.magazine.pk)
+
+    def article(self, title):
+        return Articles.objects.create(title=title, publication=self.publication, magazine=self.magazine, status='Active')
+
+    def test_get_is_read_only(self):
+        self.article('First')
+        response = self.get()
+        self.assertEqual([article['title'] for article in response.data['data']['articles']], ['First'])
+        self.magazine.refresh_from_db()
+        self.assertIsNone(self.magazine.table_of_contents)
+
+    def test_article_count_follows_the_frozen_contents(self):
+        self.article('First')
+        publish_table_of_contents(self.magazine)
+        self.article('Second')
+        refresh_magazine_article_counts(self.magazine.pk)
+
+        response = self.get()
+        self.assertEqual(len(response.data['data']['articles']), 1)
+        self.assertEqual(response.data['article_count'], 1)
+
+
+class MagazineAssignmentTests(TestCase):
+    """
+    Only active articles are assigned, as the monthly command does.
+    """
+
+    def setUp(self):
+        self.publication = Publications.objects.create(name='hilal-english', display_name='Hilal English')
+
+    def article(self, year, month, status='Active'):
+        return Articles.objects.create(
+            title=f'{year}-{month} {status}', publication=self.publication, status=status,
+            publish_date=timezone.make_aware(datetime(year, month, 10))
+        )
+
+    def magazine(self, year, month):
+        return Magazines.objects.create(
+            title=f'Hilal {month}/{year}', language='English', direction='LTR',
+            publication=self.publication, year=year, month=datetime(year, month, 1).strftime('%B')
+        )
+
+    def test_drafts_are_not_assigned(self):
+        active, draft = self.article(2025, 9), self.article(2025, 9, status='Draft')
+        magazine = self.magazine(2025, 9)
+        self.assertEqual(assign_magazine_articles(magazine), 1)
+        draft.refresh_from_db()
+        self.assertIsNone(draft.magazine_id)
+        self.assertFalse(assign_article_magazine(draft))
+
+        # Publishing the draft assigns it
+        draft.status = 'Active'
+        draft.save()
+        self.assertTrue(assign_article_magazine(draft, (draft.publication_id, draft.publish_date)))
+        self.assertEqual(draft.magazine_id, magazine.id)
+        active.refresh_from_db()
+        self.assertEqual(active.magazine_id, magazine.id)
+
+    def test_backfill_of_all_months(self):
+        # Written directly, as before assignment on write existed
+        august, september, october = self.article(2025, 8), self.article(2025, 9), self.article(2025, 10)
+        inactive = self.article(2025, 10, status='Inactive')
+        september_issue, november_issue = self.magazine(2025, 9), self.magazine(2025, 11)
+        Articles.objects.update(magazine=None)
+
+        call_command('assign_magazine_to_articles', '--all-months', stdout=StringIO())
+
+        for article in [august, september, october, inactive]:
+            article.refresh_from_db()
+        self.assertEqual(august.magazine_id, september_issue.id)
+        self.assertEqual(september.magazine_id, september_issue.id)
+        self.assertEqual(october.magazine_id, november_issue.id)
+        self.assertIsNone(inactive.magazine_id)
+
+
+class PdfPipelineTests(TestCase):
+    """
+    Saving a magazine with a new PDF queues the pipeline for that row.
+    """
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.publication = Publications.objects.create(name='hilal-english', display_name='Hilal English')
+
+    def write_pdf(self, relative_path):
+        path = os.path.join(self.media_root, *relative_path.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as handle:
+            handle.write(b'%PDF-1.4 ' + relative_path.encode())
+
+    def save_magazine(self, magazine=None, **values):
+        magazine = magazine or Magazines(
+            title='Hilal', language='English', direction='LTR', publication=self.publication
+        )
+        for field, value in values.items():
+            setattr(magazine, field, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            magazine.save()
+        return magazine
+
+    def test_bare_file_names_resolve_to_the_upload_directories(self):
+        self.write_pdf('uploads/magazines/legacy.pdf')
+        self.assertEqual(pdf_for_row(Magazines(doc_url='new.pdf')), 'uploads/magazinesPdf/new.pdf')
+        self.assertEqual(pdf_for_row(Magazines(doc_url='legacy.pdf')), 'uploads/magazines/legacy.pdf')
+        self.assertEqual(pdf_for_row(Magazines(doc_url='/media/uploads/magazinesPdf/a.pdf')), 'uploads/magazinesPdf/a.pdf')
+        self.assertIsNone(pdf_for_row(Magazines(doc_url='https://res.cloudinary.com/x/a.pdf')))
+        self.assertIsNone(pdf_for_row(Magazines(doc_url='cover.jpg')))
+
+    @mock.patch('adminpanel.pdf_pipeline.count_pdf_pages', return_value=12)
+    def test_saving_a_new_pdf_queues_processing_of_the_row(self, count_pdf_pages):
+        self.write_pdf('uploads/magazinesPdf/issue.pdf')
+        magazine = self.save_magazine(doc_url='issue.pdf')
+
+        job = Job.objects.get(name='pdf.process')
+        self.assertEqual(job.payload, {
+            'relative_path': 'uploads/magazinesPdf/issue.pdf', 'entity_type': 'magazinesPdf', 'entity_id': magazine.id
+        })
+        process_uploaded_pdf(**job.payload)
+        magazine.refresh_from_db()
+        self.assertEqual(magazine.page_count, 12)
+        self.assertEqual(magazine.file_size, os.path.getsize(os.path.join(self.media_root, 'uploads/magazinesPdf/issue.pdf')))
+
+        # Saving without changing the PDF queues nothing
+        Job.objects.all().delete()
+        self.save_magazine(magazine, title='Hilal September')
+        self.assertFalse(Job.objects.exists())
+
+    @mock.patch('adminpanel.pdf_pipeline.count_pdf_pages', return_value=12)
+    def test_a_replaced_pdf_is_not_recorded_on_the_row(self, count_pdf_pages):
+        self.write_pdf('uploads/magazinesPdf/first.pdf')
+        magazine = self.save_magazine(doc_url='first.pdf')
+        first_job = Job.objects.get(name='pdf.process')
+        self.save_magazine(magazine, doc_url='second.pdf')
+        self.assertEqual(Job.objects.filter(name='pdf.process').count(), 2)
+
+        process_uploaded_pdf(**first_job.payload)
+        magazine.refresh_from_db()
+        self.assertIsNone(magazine.page_count)
+
+    def test_uploads_are_stored_as_uploaded(self):
+        content = b'%PDF-1.4 not linearized'
+        relative_path, content_hash, created = store_upload([content], ['uploads', 'magazinesPdf'], '.pdf')
+        self.assertEqual(content_hash, hashlib.sha256(content).hexdigest())
+        with open(os.path.join(self.media_root, relative_path), 'rb') as handle:
+            self.assertEqual(handle.read(), content)
+
+    @mock.patch('adminpanel.pdf_pipeline.count_pdf_pages', return_value=3)
+    def test_the_linearized_pdf_is_stored_under_its_own_hash(self, count_pdf_pages):
+        linearized = b'%PDF-1.4 linearized'
+
+        def linearize_pdf(path, output_path):
+            with open(output_path, 'wb') as handle:
+                handle.write(linearized)
+            return True
+
+        self.write_pdf('uploads/magazinesPdf/issue.pdf')
+        magazine = self.save_magazine(doc_url='issue.pdf')
+        with mock.patch('adminpanel.pdf_pipeline.linearize_pdf', side_effect=linearize_pdf):
+            process_uploaded_pdf(**Job.objects.get(name='pdf.process').payload)
+
+        magazine.refresh_from_db()
+        content_hash = hashlib.sha256(linearized).hexdigest()
+        self.assertEqual(magazine.doc_url, f'{content_hash}.pdf')
+        self.assertEqual(magazine.file_size, len(linearized))
+        with open(os.path.join(self.media_root, 'uploads', 'magazinesPdf', f'{content_hash}.pdf'), 'rb') as handle:
+            self.assertEqual(handle.read(), linearized)
+        # The original is left for media_gc; no temporary files remain
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.media_root, 'uploads', 'magazinesPdf'))),
+            sorted([f'{content_hash}.pdf', 'issue.pdf'])
+        )
+
+
+class ImageSrcsetTests(TestCase):
+    """
+    srcset strings only list derivatives that can be rendered, at their rendered width.
+    """
+
+    SOURCE = hashlib.sha256(b'cover').hexdigest() + '.jpg'
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        _srcset_candidates.cache_clear()
+        self.addCleanup(_srcset_candidates.cache_clear)
+
+    def test_no_srcset_without_pillow(self):
+        with mock.patch('adminpanel.images.Image', None):
+            self.assertIsNone(image_srcset(self.SOURCE, 'articles'))
+
+    def test_widths_are_capped_at_the_source_width(self):
+        with mock.patch('adminpanel.images.Image', mock.Mock()), mock.patch('adminpanel.images._source_width', return_value=800):
+            srcset = image_srcset(self.SOURCE, 'articles')
+        prefix = f'/media/uploads/derivatives/articles/{self.SOURCE}'
+        self.assertEqual(
+            srcset['webp'],
+            f'{prefix}/thumb-320w.webp 320w, {prefix}/card-640w.webp 640w, {prefix}/hero-1280w.webp 800w'
+        )
+
+    @skipUnless(Image, 'Pillow is not installed')
+    def test_a_narrow_source_lists_one_candidate(self):
+        os.makedirs(os.path.join(self.media_root, 'uploads', 'articles'))
+        Image.new('RGB', (300, 200)).save(os.path.join(self.media_root, 'uploads', 'articles', self.SOURCE), 'JPEG')
+        srcset = image_srcset(self.SOURCE, 'articles')
+        self.assertEqual(srcset['jpg'], f'/media/uploads/derivatives/articles/{self.SOURCE}/thumb-320w.jpg 300w')
+        # A missing upload gets no srcset
+        self.assertIsNone(image_srcset(hashlib.sha256(b'missing').hexdigest() + '.jpg', 'articles'))
+
+
+class JobQueueTests(TestCase):
+    """
+    Running jobs are only requeued when their worker stopped sending heartbeats, and a
+    worker only finishes a job it still holds.
+    """
+
+    def claim(self, worker_id, max_attempts=5):
+        enqueue('images.derivatives', {'relative_path': 'uploads/articles/a.jpg'}, max_attempts=max_attempts)
+        job, = claim_jobs(worker_id, 1)
+        return job
+
+    def age(self, job):
+        past = timezone.now() - timedelta(hours=2)
+        Job.objects.filter(id=job.id).update(started_at=past, heartbeat_at=past)
+
+    def test_a_long_job_with_a_heartbeat_is_not_requeued(self):
+        job = self.claim('worker-1')
+        self.age(job)
+        # Started two hours ago, alive now
+        self.assertEqual(heartbeat_jobs('worker-1', [job.id]), 1)
+
+        self.assertEqual(requeue_stale_jobs(), 0)
+        self.assertTrue(complete_job(job))
+        self.assertEqual(Job.objects.get(id=job.id).status, 'succeeded')
+
+    def test_a_requeued_job_is_not_finished_by_its_old_worker(self):
+        job = self.claim('worker-1')
+        self.age(job)
+        self.assertEqual(requeue_stale_jobs(), 1)
+        # The old worker's heartbeat no longer applies
+        self.assertEqual(heartbeat_jobs('worker-1', [job.id]), 0)
+        reclaimed, = claim_jobs('worker-2', 1)
+
+        self.assertFalse(complete_job(job))
+        self.assertFalse(fail_job(job, RuntimeError('late')))
+        reclaimed_row = Job.objects.get(id=job.id)
+        self.assertEqual((reclaimed_row.status, reclaimed_row.locked_by, reclaimed_row.attempts), ('running', 'worker-2', 2))
+        self.assertTrue(complete_job(reclaimed))
+
+    def test_a_stale_job_without_attempts_left_fails(self):
+        job = self.claim('worker-1', max_attempts=1)
+        self.age(job)
+
+        self.assertEqual(requeue_stale_jobs(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIsNone(job.unique_key)
+        self.assertIn('worker-1', job.last_error)
+
+
+class ChunkedUploadTests(TestCase):
+    """
+    Upload a file in chunks through the API, out of order, and check both checksums.
+    """
+
+    CONTENT = b'%PDF-1.4 ' + os.urandom(CHUNK_READ_SIZE + 1000)
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def create_session(self, **values):
+        response = self.client.post('/api/uploads/', {
+            'filename': 'issue.pdf', 'size': len(self.CONTENT), 'chunk_size': CHUNK_READ_SIZE,
+            'entity_type': 'magazinesPdf', 'entity_id': 'new', **values
+        })
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+
+    def put_chunk(self, session, index, content=None, **headers):
+        start = index * CHUNK_READ_SIZE
+        content = self.CONTENT[start:start + CHUNK_READ_SIZE] if content is None else content
+        return self.client.put(
+            f"/api/uploads/{session['upload_id']}/chunks/{index}/", content,
+            content_type='application/octet-stream', **headers
+        )
+
+    def complete(self, session):
+        return self.client.post(f"/api/uploads/{session['upload_id']}/complete/")
+
+    def test_chunks_in_any_order_are_stored_by_hash(self):
+        content_hash = hashlib.sha256(self.CONTENT).hexdigest()
+        session = self.create_session(sha256=content_hash)
+
+        response = self.put_chunk(session, 1, HTTP_CONTENT_RANGE=f'bytes {CHUNK_READ_SIZE}-{len(self.CONTENT) - 1}/{len(self.CONTENT)}')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['missing_chunks'], [0])
+        # Completing with a chunk missing is refused
+        self.assertEqual(self.complete(session).status_code, 409)
+
+        chunk = self.CONTENT[:CHUNK_READ_SIZE]
+        response = self.put_chunk(session, 0, HTTP_X_CHUNK_SHA256=hashlib.sha256(chunk).hexdigest())
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['missing_chunks'], [])
+
+        response = self.complete(session)
+        self.assertEqual(response.status_code, 201, response.content)
+        data = response.json()
+        self.assertEqual(data['relative_path'], f'uploads/magazinesPdf/{content_hash}.pdf')
+        self.assertEqual(data['content_hash'], content_hash)
+        with open(os.path.join(self.media_root, 'uploads', 'magazinesPdf', f'{content_hash}.pdf'), 'rb') as handle:
+            self.assertEqual(handle.read(), self.CONTENT)
+
+    def test_chunk_checks(self):
+        session = self.create_session()
+        # Wrong length, wrong offset, wrong checksum
+        self.assertEqual(self.put_chunk(session, 0, b'short').status_code, 400)
+        self.assertEqual(self.put_chunk(session, 0, HTTP_CONTENT_RANGE=f'bytes 10-{CHUNK_READ_SIZE + 9}/{len(self.CONTENT)}').status_code, 400)
+        self.assertEqual(self.put_chunk(session, 0, HTTP_X_CHUNK_SHA256='0' * 64).status_code, 422)
+        self.assertEqual(self.put_chunk(session, 2).status_code, 400)
+        # A rejected chunk is not counted as received
+        status = self.client.get(f"/api/uploads/{session['upload_id']}/").json()
+        self.assertEqual(status['missing_chunks'], [0, 1])
+
+    def test_whole_file_checksum_mismatch(self):
+        session = self.create_session(sha256='0' * 64)
+        self.put_chunk(session, 0)
+        self.put_chunk(session, 1)
+        self.assertEqual(self.complete(session).status_code, 422)
+        upload_dir = os.path.join(self.media_root, 'uploads', 'magazinesPdf')
+        self.assertEqual(os.listdir(upload_dir) if os.path.isdir(upload_dir) else [], [])
+
+    def test_unknown_session(self):
+        self.assertEqual(self.client.get(f"/api/uploads/{'0' * 32}/").status_code, 404)
+
+
+@mock.patch('adminpanel.media.MEDIA_ACCEL_REDIRECT_PREFIX', '')
+@mock.patch('adminpanel.media.MEDIA_SENDFILE_HEADER', '')
+class ServeMediaTests(TestCase):
+    """
+    Byte ranges, If-Range and unsatisfiable ranges of /media/.
+    """
+
+    CONTENT = bytes(range(256)) * 4
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.path = os.path.join(self.media_root, 'uploads', 'magazinesPdf', 'issue.pdf')
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'wb') as handle:
+            handle.write(self.CONTENT)
+        self.etag = media_etag(os.stat(self.path))
+
+    def get(self, **headers):
+        response = self.client.get('/media/uploads/magazinesPdf/issue.pdf', **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_range(self):
+        response, body = self.get(HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.CONTENT)}')
+        self.assertEqual(body, self.CONTENT[10:20])
+
+        response, body = self.get(HTTP_RANGE='bytes=-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.CONTENT[-5:])
+
+        response, body = self.get(HTTP_RANGE='bytes=1000-')
+        self.assertEqual(response['Content-Range'], f'bytes 1000-1023/{len(self.CONTENT)}')
+        self.assertEqual(body, self.CONTENT[1000:])
+
+    def test_if_range(self):
+        response, body = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=self.etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.CONTENT[:10])
+
+        # The file changed since the client's first request: send all of it
+        response, body = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.CONTENT)
+
+    def test_unsatisfiable_range(self):
+        response, body = self.get(HTTP_RANGE=f'bytes={len(self.CONTENT)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.CONTENT)}')
+
+    def test_not_modified_and_hidden_paths(self):
+        response, body = self.get(HTTP_IF_NONE_MATCH=self.etag)
+        self.assertEqual(response.status_code, 304)
+        os.makedirs(os.path.join(self.media_root, '.staging'))
+        shutil.copy(self.path, os.path.join(self.media_root, '.staging', 'data.part'))
+        self.assertEqual(self.client.get('/media/.staging/data.part').status_code, 404)
+
+
+class MediaURLTests(TestCase):
+    """
+    Media URL settings are read when URLs are built, not when the module is imported.
+    """
+
+    def test_media_host_and_media_url_are_read_per_call(self):
+        with override_settings(MEDIA_HOST=''):
+            self.assertEqual(build_media_url('a.jpg', 'articles'), '/media/uploads/articles/a.jpg')
+        with override_settings(MEDIA_HOST='https://api.example.com/'):
+            self.assertEqual(build_media_url('a.jpg', 'articles'), 'https://api.example.com/media/uploads/articles/a.jpg')
+        with override_settings(MEDIA_HOST='', MEDIA_URL='/files/'):
+            self.assertEqual(build_media_url('/files/a.jpg', 'articles'), '/files/uploads/articles/a.jpg')
+
+    def test_media_host_is_required_in_production(self):
+        with override_settings(MEDIA_HOST=''):
+            self.assertEqual([error.id for error in check_media_host(None)], ['adminpanel.E001'])
+        with override_settings(MEDIA_HOST='https://api.example.com'):
+            self.assertEqual(check_media_host(None), [])
+
+
+class MediaGCTests(TestCase):
+    """
+    media_gc keeps files referenced from rich text and files just uploaded again.
+    """
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def write_old_file(self, relative_path):
+        path = os.path.join(self.media_root, *relative_path.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as handle:
+            handle.write(relative_path.encode())
+        self.age(path)
+        return path
+
+    def age(self, path):
+        two_days_ago = time.time() - 48 * 3600
+        os.utime(path, (two_days_ago, two_days_ago))
+
+    def gc(self):
+        call_command('media_gc', '--delete', stdout=StringIO())
+
+    def test_a_deduplicated_upload_is_not_collected(self):
+        content = b'cover image'
+        relative_path, content_hash, created = store_upload([content], ['uploads', 'articles'], '.jpg')
+        path = os.path.join(self.media_root, relative_path)
+        self.age(path)
+
+        # Uploaded again for a row that is about to reference it
+        self.assertEqual(store_upload([content], ['uploads', 'articles'], '.jpg'), (relative_path, content_hash, False))
+        self.gc()
+        self.assertTrue(os.path.exists(path))
+
+    def test_media_embedded_in_author_and_video_text_is_kept(self):
+        introduction = self.write_old_file('uploads/articles/introduction.jpg')
+        description = self.write_old_file('uploads/articles/description.jpg')
+        orphan = self.write_old_file('uploads/articles/orphan.jpg')
+        Authors.objects.create(
+            author_name='Author', email='author@example.com', contact_no='1', category='Defence',
+            introduction='<p><img src="/media/uploads/articles/introduction.jpg"></p>'
+        )
+        Videos.objects.create(
+            title='Video', youtube_url='https://www.youtube.com/watch?v=x',
+            description='<img src="https://api.example.com/media/uploads/articles/description.jpg">'
+        )
+
+        self.gc()
+        self.assertTrue(os.path.exists(introduction))
+        self.assertTrue(os.path.exists(description))
+        self.assertFalse(os.path.exists(orphan))
+
+    def test_media_in_frozen_tables_of_contents_is_kept(self):
+        paths = [self.write_old_file(relative_path) for relative_path in [
+            'uploads/magazinesPdf/original.pdf', 'uploads/magazines/cover.jpg',
+            'uploads/articles/article.jpg', 'uploads/authors/author.jpg',
+        ]]
+        publication = Publications.objects.create(name='hilal-english', display_name='Hilal English')
+        author = Authors.objects.create(
+            author_name='Author', email='author@example.com', contact_no='1', category='Defence',
+            introduction='', author_image='author.jpg'
+        )
+        magazine = Magazines.objects.create(
+            title='Hilal', language='English', direction='LTR', publication=publication, status='Active',
+            doc_url='original.pdf', cover_image='cover.jpg'
+        )
+        Articles.objects.create(
+            title='Article', publication=publication, magazine=magazine, status='Active',
+            cover_image='article.jpg', author=author
+        )
+        publish_table_of_contents(magazine)
+        # Linearized by pdf.process and edited since the issue was published
+        Magazines.objects.filter(pk=magazine.pk).update(doc_url='linearized.pdf', cover_image='new.jpg')
+        Articles.objects.update(cover_image='new.jpg')
+        Authors.objects.update(author_image='new.jpg')
+
+        self.gc()
+        for path in paths:
+            self.assertTrue(os.path.exists(path), path)
+
+
+class DataMigrationTests(TestCase):
+    """
+    Run the data migrations against the historical models they were written for, so a
+    reference to a field the model did not have at that point fails here, not in migrate.
+    """
+
+    def run_data_migration(self, migration_name, function_name):
+        # The migration graph, even where the test database was created without it
+        with override_settings(MIGRATION_MODULES={}):
+            loader = MigrationLoader(None, ignore_no_migrations=True)
+        apps = loader.project_state(('adminpanel', migration_name)).apps
+        module = importlib.import_module(f'adminpanel.migrations.{migration_name}')
+        getattr(module, function_name)(apps, None)
+
+    def test_updated_at_is_added_empty(self):
+        # The backfill only sees rows the AddField left NULL; an auto_now column would be
+        # filled with the migration time instead
+        module = importlib.import_module('adminpanel.migrations.0047_articles_updated_at')
+        add_field = module.Migration.operations[0]
+        self.assertIsNone(BaseDatabaseSchemaEditor._effective_default(add_field.field))
+        alter_field = module.Migration.operations[-1]
+        self.assertTrue(alter_field.field.auto_now)
+        self.assertTrue(alter_field.field.db_index)
+
+    def test_article_backfills(self):
+        published = timezone.now() - timedelta(days=40)
+        article = Articles.objects.create(title='Article', description='<p>Body</p>', publish_date=published)
+        undated = Articles.objects.create(title='Undated')
+        # The state the migrations leave existing rows in (see test_updated_at_is_added_empty)
+        Articles.objects.filter(pk__in=[article.pk, undated.pk]).update(
+            updated_at=None, excerpt=None, publish_date_year=None, publish_date_month=None
+        )
+
+        self.run_data_migration('0044_backfill_article_date_fields', 'backfill_article_date_fields')
+        self.run_data_migration('0046_articles_excerpt', 'backfill_article_excerpts')
+        self.run_data_migration('0047_articles_updated_at', 'backfill_articles_updated_at')
+
+        article.refresh_from_db()
+        self.assertEqual(article.excerpt, 'Body')
+        self.assertEqual(article.updated_at, published)
+        self.assertIsNotNone(article.publish_date_year)
+        undated.refresh_from_db()
+        self.assertIsNotNone(undated.updated_at)
+
+
+class StubMediaHandler(BaseHTTPRequestHandler):
+    """
+    Serves the `routes` of its server: path -> list of (status, content type, body),
+    one per request; the last response repeats. Requests are counted per path.
+    """
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests[self.path] = server.requests.get(self.path, 0) + 1
+            responses = server.routes.get(self.path, [(404, 'text/plain', b'not found')])
+            status_code, content_type, body = responses[min(server.requests[self.path], len(responses)) - 1]
+        self.send_response(status_code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MigrateRemoteMediaTests(TestCase):
+    """
+    Run migrate_remote_media against a local HTTP server standing in for Cloudinary.
+    """
+
+    JPEG = b'\xff\xd8\xff\xe0' + b'jpeg-bytes' * 1000
+    PNG = b'\x89PNG\r\n\x1a\n' + b'png-bytes' * 1000
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubMediaHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = {}
+        self.server.routes = {
+            '/image/upload/cover.jpg': [(200, 'image/jpeg', self.JPEG)],
+            '/image/upload/flaky': [(503, 'text/plain', b'busy'), (502, 'text/plain', b'busy'), (200, 'image/png', self.PNG)],
+            '/image/upload/page.jpg': [(200, 'text/html', b'<html></html>')],
+        }
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+        self.media_root = tempfile.mkdtemp()
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.publication = Publications.objects.create(name='hilal-english', display_name='Hilal English')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def migrate(self, *args):
+        out = StringIO()
+        call_command('migrate_remote_media', '--backoff', '0', '--workers', '4', *args, stdout=out)
+        return out.getvalue()
+
+    def test_downloads_are_stored_by_hash_and_shared_urls_fetched_once(self):
+        url = f'{self.base_url}/image/upload/cover.jpg'
+        articles = [Articles.objects.create(title=f'Article {i}', cover_image=url) for i in range(3)]
+        contributor = Contributors.objects.create(publication=self.publication, name='Editor', cover_image=url)
+        local = Articles.objects.create(title='Local', cover_image='local.jpg')
+
+        self.migrate('--only', 'articles', 'contributors', '--batch-size', '2')
+
+        filename = f'{hashlib.sha256(self.JPEG).hexdigest()}.jpg'
+        for article in articles:
+            article.refresh_from_db()
+            self.assertEqual(article.cover_image, filename)
+        contributor.refresh_from_db()
+        self.assertEqual(contributor.cover_image, filename)
+        local.refresh_from_db()
+        self.assertEqual(local.cover_image, 'local.jpg')
+        with open(os.path.join(self.media_root, 'uploads', 'articles', filename), 'rb') as stored:
+            self.assertEqual(stored.read(), self.JPEG)
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, 'uploads', 'hilalteam', filename)))
+        # Batches of 2 rows: the article URL is fetched by both article batches and the contributors
+        self.assertEqual(self.server.requests['/image/upload/cover.jpg'], 3)
+
+    def test_transient_errors_are_retried(self):
+        article = Articles.objects.create(title='Flaky', cover_image=f'{self.base_url}/image/upload/flaky')
+
+        self.migrate('--only', 'articles')
+
+        article.refresh_from_db()
+        self.assertEqual(article.cover_image, f'{hashlib.sha256(self.PNG).hexdigest()}.png')
+        self.assertEqual(self.server.requests['/image/upload/flaky'], 3)
+
+    def test_failures_are_checkpointed_and_retried_when_resuming(self):
+        missing = Articles.objects.create(title='Missing', cover_image=f'{self.base_url}/image/upload/missing.jpg')
+        html = Articles.objects.create(title='Not an image', cover_image=f'{self.base_url}/image/upload/page.jpg')
+
+        self.migrate('--only', 'articles')
+
+        for article in [missing, html]:
+            original = article.cover_image
+            article.refresh_from_db()
+            self.assertEqual(article.cover_image, original)
+        with open(os.path.join(self.media_root, '.staging', 'migrate_remote_media.json')) as handle:
+            checkpoint = json.load(handle)
+        self.assertEqual(checkpoint['articles']['last_id'], html.id)
+        self.assertEqual(set(checkpoint['articles']['failed']), {str(missing.id), str(html.id)})
+        # A 404 is not retried
+        self.assertEqual(self.server.requests['/image/upload/missing.jpg'], 1)
+
+        # Resuming retries the failed rows, then continues after the checkpoint
+        self.server.routes['/image/upload/missing.jpg'] = [(200, 'image/jpeg', self.JPEG)]
+        added = Articles.objects.create(title='Added', cover_image=f'{self.base_url}/image/upload/cover.jpg')
+        self.migrate('--only', 'articles')
+        self.assertEqual(self.server.requests['/image/upload/missing.jpg'], 2)
+        self.assertEqual(self.server.requests['/image/upload/page.jpg'], 2)
+        for article in [missing, added]:
+            article.refresh_from_db()
+            self.assertEqual(article.cover_image, f'{hashlib.sha256(self.JPEG).hexdigest()}.jpg')
+        with open(os.path.join(self.media_root, '.staging', 'migrate_remote_media.json')) as handle:
+            checkpoint = json.load(handle)
+        self.assertEqual(checkpoint['articles']['last_id'], added.id)
+        self.assertEqual(set(checkpoint['articles']['failed']), {str(html.id)})
+
+        # Rows no longer remote are dropped from the failures
+        Articles.objects.filter(pk=html.pk).update(cover_image='local.jpg')
+        self.migrate('--only', 'articles')
+        self.assertEqual(self.server.requests['/image/upload/page.jpg'], 2)
+        with open(os.path.join(self.media_root, '.staging', 'migrate_remote_media.json')) as handle:
+            self.assertEqual(json.load(handle)['articles']['failed'], {})
+
+    def test_checkpoints_are_kept_per_target_and_host(self):
+        other_host = f'http://localhost:{self.server.server_address[1]}'
+        other = Articles.objects.create(title='Other host', cover_image=f'{other_host}/image/upload/cover.jpg')
+        article = Articles.objects.create(title='Article', cover_image=f'{self.base_url}/image/upload/cover.jpg')
+        contributor = Contributors.objects.create(
+            publication=self.publication, name='Editor', cover_image=f'{self.base_url}/image/upload/missing.jpg'
+        )
+        checkpoint_path = os.path.join(self.media_root, '.staging', 'migrate_remote_media.json')
+        stored = f'{hashlib.sha256(self.JPEG).hexdigest()}.jpg'
+
+        # A run limited to one host does not move the checkpoint past rows of other hosts
+        self.migrate('--only', 'articles', 'contributors', '--host', '127.0.0.1')
+        article.refresh_from_db()
+        self.assertEqual(article.cover_image, stored)
+        self.migrate('--only', 'articles', 'contributors')
+        other.refresh_from_db()
+        self.assertEqual(other.cover_image, stored)
+
+        # --restart only resets the targets being run
+        self.migrate('--only', 'articles', '--restart')
+        with open(checkpoint_path) as handle:
+            checkpoint = json.load(handle)
+        self.assertEqual(set(checkpoint['contributors']['failed']), {str(contributor.id)})
+        self.assertEqual(checkpoint['contributors@127.0.0.1']['last_id'], contributor.id)
+        self.assertEqual(checkpoint['articles@127.0.0.1']['last_id'], article.id)
+
+    def test_dry_run_changes_nothing(self):
+        url = f'{self.base_url}/image/upload/cover.jpg'
+        article = Articles.objects.create(title='Article', cover_image=url)
+
+        output = self.migrate('--only', 'articles', '--dry-run')
+
+        self.assertIn(url, output)
+        article.refresh_from_db()
+        self.assertEqual(article.cover_image, url)
+        self.assertEqual(self.server.requests, {})
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, '.staging', 'migrate_remote_media.json')))
 
-# Create your tests here.
@@ -0,0 +1,91 @@
+"""
+Trending articles for a publication: 2 latest (or most viewed) articles per trending category.
+
+The categories come from settings.TRENDING_CATEGORIES and are resolved from the
+in-process registry. All articles are then fetched with one windowed query,
+ROW_NUMBER() OVER (PARTITION BY category_id ORDER BY publish_date DESC), instead of one
+sliced query per category.
+"""
+from django.conf import settings
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from .models import Categories
+from .registry import get_category, get_publication_categories, normalize_identifier
+
+TRENDING_ARTICLES_PER_CATEGORY = 2
+TRENDING_ARTICLES_TOTAL = 6
+TRENDING_DEFAULT_CATEGORY_COUNT = 3
+
+
+def _config_key(value):
+    # 'hilal-english', 'Hilal English' and 'hilalenglish' all name the same publication
+    return normalize_identifier(value).replace('-', '')
+
+
+def get_trending_categories(publication, identifier=None):
+    """
+    Helper function to pick the trending categories of a publication, in display order.
+    Returns (categories, fill): `fill` is True when the strip should be topped up to
+    TRENDING_ARTICLES_TOTAL with the latest articles of any category.
+    """
+    config = {_config_key(key): slots for key, slots in getattr(settings, 'TRENDING_CATEGORIES', {}).items()}
+    slots = config.get(_config_key(publication.name))
+    if slots is None and identifier:
+        slots = config.get(_config_key(identifier))
+
+    if slots is None:
+        categories = get_publication_categories(publication)[:TRENDING_DEFAULT_CATEGORY_COUNT]
+        return categories, True
+
+    categories = []
+    for names in slots:
+        for name in names:
+            try:
+                categories.append(get_category(publication, name))
+                break
+            except Categories.DoesNotExist:
+                continue
+    return categories, False
+
+
+def get_trending_articles(articles, publication, identifier=None, popular=False):
+    """
+    Trending articles of `publication` from the `articles` queryset (already filtered to
+    the publication's active articles), in category order, with one query.
+    With `popular`, each category's articles are ranked by trending_score (time-decayed
+    views, see adminpanel.view_counter) before publish_date.
+    """
+    categories, fill = get_trending_categories(publication, identifier)
+    category_ids = [category.id for category in categories]
+    if not category_ids and not fill:
+        return []
+
+    ordering = [F('publish_date').desc(), F('id').desc()]
+    if popular:
+        ordering.insert(0, F('trending_score').desc())
+    if not fill:
+        # Only the trending categories need ranking
+        articles = articles.filter(category_id__in=category_ids)
+    articles = articles.annotate(
+        category_rank=Window(RowNumber(), partition_by=[F('category_id')], order_by=ordering)
+    )
+    condition = Q(category_id__in=category_ids, category_rank__lte=TRENDING_ARTICLES_PER_CATEGORY)
+    if fill:
+        # The latest N articles not already picked are always among the latest
+        # N + (picked) overall, so rows ranked that high publication-wide cover the top-up
+        articles = articles.annotate(publication_rank=Window(RowNumber(), order_by=ordering))
+        condition |= Q(publication_rank__lte=TRENDING_ARTICLES_TOTAL + len(category_ids) * TRENDING_ARTICLES_PER_CATEGORY)
+    rows = list(articles.filter(condition).order_by(*ordering))
+
+    by_category = {category_id: [] for category_id in category_ids}
+    for article in rows:
+        if article.category_id in by_category and article.category_rank <= TRENDING_ARTICLES_PER_CATEGORY:
+            by_category[article.category_id].append(article)
+    trending = [article for category_id in category_ids for article in by_category[category_id]]
+
+    if fill and len(trending) < TRENDING_ARTICLES_TOTAL:
+        picked_ids = {article.id for article in trending}
+        remaining = [article for article in rows if article.id not in picked_ids]
+        trending.extend(remaining[:TRENDING_ARTICLES_TOTAL - len(trending)])
+    return trending
@@ -0,0 +1,81 @@
+"""
+Content-addressed storage for uploaded files.
+
+Uploads are hashed (SHA-256) while they are streamed to a temporary file next to their
+destination, then renamed to uploads/<entity>/<sha256>.<ext>. The rename is atomic, so a
+crash mid-upload never leaves a partial file at a live path, identical files are stored
+once, and a URL always names the same bytes; adminpanel.media serves these paths with a
+year-long immutable Cache-Control. Files are stored exactly as uploaded; the pdf.process
+job stores a linearized PDF as a new file under its own hash (adminpanel.pdf_pipeline).
+"""
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+
+# Bytes read per call while hashing a file that is already written
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _store_file(temp_path, upload_parts, extension, content_hash):
+    # Move a fully written file with the given hash to its content-addressed path
+    filename = f'{content_hash}{extension}'
+    file_path = os.path.join(settings.MEDIA_ROOT, *upload_parts, filename)
+    relative_path = '/'.join([*upload_parts, filename])
+    try:
+        # A fresh mtime keeps media_gc (--min-age) from deleting the stored copy before
+        # the row this upload is for references it
+        os.utime(file_path)
+    except FileNotFoundError:
+        pass
+    else:
+        os.remove(temp_path)
+        return relative_path, content_hash, False
+
+    os.chmod(temp_path, settings.FILE_UPLOAD_PERMISSIONS or 0o644)
+    # A concurrent upload of the same content renames identical bytes; either wins
+    os.replace(temp_path, file_path)
+    return relative_path, content_hash, True
+
+
+def store_upload(chunks, upload_parts, extension):
+    """
+    Write the byte `chunks` of an upload under MEDIA_ROOT/<upload_parts...>/ named by
+    their SHA-256. Returns (relative_path, content_hash, created); `created` is False
+    when the same content was already stored.
+    """
+    upload_dir = os.path.join(settings.MEDIA_ROOT, *upload_parts)
+    os.makedirs(upload_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    fd, temp_path = tempfile.mkstemp(dir=upload_dir, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as destination:
+            for chunk in chunks:
+                digest.update(chunk)
+                destination.write(chunk)
+            destination.flush()
+            os.fsync(destination.fileno())
+        return _store_file(temp_path, upload_parts, extension, digest.hexdigest())
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def store_staged_file(path, upload_parts, extension, content_hash=None):
+    """
+    Move a complete file written elsewhere under MEDIA_ROOT (a chunked upload, see
+    adminpanel.chunked_uploads) whose SHA-256 is `content_hash` to the same layout as
+    store_upload, without copying it. Without `content_hash` the file is hashed first.
+    Returns (relative_path, content_hash, created).
+    """
+    os.makedirs(os.path.join(settings.MEDIA_ROOT, *upload_parts), exist_ok=True)
+    if content_hash is None:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as source:
+            for chunk in iter(lambda: source.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+    return _store_file(path, upload_parts, extension, content_hash)
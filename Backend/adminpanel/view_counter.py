@@ -0,0 +1,172 @@
+"""
+Buffered article view counting.
+
+SingleArticleView records each read into a per-process buffer instead of updating the
+row, so popular articles do not become lock hotspots. The buffer is flushed as batched
+`visits = visits + n` UPDATEs once it holds ARTICLE_VIEWS_FLUSH_THRESHOLD articles, and
+otherwise by a timer the first buffered view starts, ARTICLE_VIEWS_FLUSH_INTERVAL seconds
+later, so counts do not wait for the next request. Whatever is left is flushed on
+interpreter exit. The buffer lives in each web process, so the flush runs there rather
+than in the job worker.
+
+The same UPDATE maintains Articles.trending_score, a time-decayed view count kept in log
+space: trending_score = log2(sum over views of 2 ** ((viewed_at - epoch) / half_life)).
+Every score decays at the same rate, so ordering by the stored column ranks articles by
+their current decayed count and needs no periodic decay job; storing the log keeps the
+value small however far the clock moves from the epoch.
+
+The UPDATE leaves updated_at alone (a view is not an edit) and sends no signal. Each flush
+bumps the ARTICLE_VIEWS response cache version instead, which endpoints ranked by views
+declare next to their models.
+"""
+import atexit
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+from math import log2
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Abs, Coalesce, Greatest, Log, Power
+from django.utils import timezone
+
+from .models import Articles
+from .response_cache import bump_model_versions
+
+ARTICLE_VIEWS_FLUSH_INTERVAL = getattr(settings, 'ARTICLE_VIEWS_FLUSH_INTERVAL', 60)
+ARTICLE_VIEWS_FLUSH_THRESHOLD = getattr(settings, 'ARTICLE_VIEWS_FLUSH_THRESHOLD', 1000)
+TRENDING_HALF_LIFE_HOURS = getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 48)
+TRENDING_EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+# Articles updated per statement
+ARTICLE_VIEWS_BATCH_SIZE = 500
+
+# Response cache version bumped by every flush (see response_cache)
+ARTICLE_VIEWS = 'adminpanel.articles:views'
+
+_lock = threading.Lock()
+_buffer = Counter()
+_last_flush = time.monotonic()
+
+
+def trending_score_increment(views, at=None):
+    """
+    Helper function to compute the log-space weight of `views` views at time `at`.
+    """
+    at = at or timezone.now()
+    half_lives = (at - TRENDING_EPOCH).total_seconds() / (TRENDING_HALF_LIFE_HOURS * 3600)
+    return half_lives + log2(views)
+
+
+def current_trending_score(at=None):
+    """
+    Helper function to get the score of a single view at time `at`; subtract it from a
+    stored trending_score and raise 2 to the result to get the decayed view count.
+    """
+    return trending_score_increment(1, at)
+
+
+def _add_log_scores(score, increment):
+    # log2(2 ** score + 2 ** increment), computed without leaving log space
+    increment = Value(increment, output_field=FloatField())
+    return Case(
+        When(trending_score__isnull=True, then=increment),
+        default=Greatest(score, increment) + Log(
+            Value(2.0), Value(1.0) + Power(Value(2.0), -Abs(score - increment))
+        ),
+        output_field=FloatField(),
+    )
+
+
+def apply_article_views(counts, at=None):
+    """
+    Add `counts` ({article_id: views}) to visits and trending_score with batched UPDATEs.
+    Articles with the same count share a statement; ids are updated in ascending order
+    so concurrent flushes from several workers lock rows in the same order.
+    """
+    ids_by_views = defaultdict(list)
+    for article_id, views in counts.items():
+        ids_by_views[views].append(article_id)
+
+    with transaction.atomic():
+        for views, article_ids in sorted(ids_by_views.items()):
+            increment = trending_score_increment(views, at)
+            article_ids.sort()
+            for start in range(0, len(article_ids), ARTICLE_VIEWS_BATCH_SIZE):
+                Articles.objects.filter(id__in=article_ids[start:start + ARTICLE_VIEWS_BATCH_SIZE]).update(
+                    visits=Coalesce(F('visits'), 0) + views,
+                    trending_score=_add_log_scores(F('trending_score'), increment),
+                    # A view is not an edit; keep updated_at for edits
+                    updated_at=F('updated_at'),
+                )
+    # Rankings by trending_score (and the visits served) changed
+    bump_model_versions(ARTICLE_VIEWS)
+
+
+def flush_article_views():
+    """
+    Write the buffered views of this process to the database.
+    On a database error the views are put back and retried on the next flush.
+    """
+    global _last_flush
+    with _lock:
+        pending = _buffer.copy()
+        _buffer.clear()
+        _last_flush = time.monotonic()
+    if not pending:
+        return 0
+
+    try:
+        apply_article_views(pending)
+    except DatabaseError:
+        with _lock:
+            _buffer.update(pending)
+        return 0
+    return sum(pending.values())
+
+
+def _flush_on_timer():
+    try:
+        flush_article_views()
+    finally:
+        # The timer thread's own connection; it is not reused
+        connection.close()
+
+
+def record_article_view(article_id):
+    """
+    Count one view of an article. Cheap enough to call on every request.
+    """
+    with _lock:
+        first = not _buffer
+        _buffer[article_id] += 1
+        due = (
+            len(_buffer) >= ARTICLE_VIEWS_FLUSH_THRESHOLD
+            or time.monotonic() - _last_flush >= ARTICLE_VIEWS_FLUSH_INTERVAL
+        )
+    if due:
+        flush_article_views()
+    elif first:
+        timer = threading.Timer(ARTICLE_VIEWS_FLUSH_INTERVAL, _flush_on_timer)
+        timer.daemon = True
+        timer.start()
+
+
+def counts_article_views(view_method):
+    """
+    Decorator for an APIView.get handler taking the article `pk`. Counts the view when
+    the article was served, including 304 revalidations.
+    """
+    @wraps(view_method)
+    def wrapper(view, request, *args, **kwargs):
+        response = view_method(view, request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            record_article_view(int(kwargs['pk']))
+        return response
+    return wrapper
+
+
+atexit.register(flush_article_views)
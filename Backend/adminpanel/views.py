@@ -2,40 +2,228 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Comments, Articles, Billboards, Magazines, Authors, Ebook, Videos, Publications, Categories, Contributors
-from .serializers import CommentSerializer, ArticleSerializer, BillboardSerializer, MagazineSerializer, AuthorSerializer, EbookSerializer, VideosSerializer, PublicationsSerializer, CategoriesSerializer, ContributorsSerializer
+from .models import Comments, Articles, Billboards, Magazines, Authors, Ebook, Videos, Publications, Categories, Contributors, publish_month_range
+from .conditional import conditional_response
+from .magazine_assignment import assign_article_magazine, assign_magazine_articles
+from .magazine_contents import get_table_of_contents, publish_table_of_contents, refresh_magazine_article_counts
+from .uploads import store_upload
+from .chunked_uploads import ChunkedUploadError, complete_session, create_session, delete_session, get_session_status, load_session, write_chunk
+from .images import IMAGE_EXTENSIONS
+from .jobs import enqueue, get_queue_stats
+from .media_urls import build_media_url
+from .registry import get_category, get_category_by_id, get_publication
+from .response_cache import bump_model_versions, cached_response, cached_section, get_cache_stats
+from .search import fulltext_search
+from .trending import get_trending_articles
+from .view_counter import ARTICLE_VIEWS, counts_article_views
+from .serializers import CommentSerializer, ArticleSerializer, ArticleListSerializer, BillboardSerializer, MagazineSerializer, AuthorSerializer, EbookSerializer, VideosSerializer, PublicationsSerializer, CategoriesSerializer, ContributorsSerializer
 from django.http import HttpResponse
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from django.utils import timezone
 from django.utils.timezone import now
 from rest_framework.generics import ListAPIView
 from django.db.models import Count, Q
+from django.utils.dateparse import parse_datetime
 from datetime import datetime
+import base64
+import binascii
+import json
 import os
+import re
 from django.conf import settings
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 
 
-def extract_date_fields(publish_date):
+def get_article_list_serializer(request):
     """
-    Helper function to extract year and month from publish_date
+    Helper function to pick the article serializer for a list endpoint.
+    `mode=list` swaps the description body for the precomputed excerpt and
+    `fields=id,title,...` restricts the output to a sparse fieldset.
     """
-    if publish_date:
-        if isinstance(publish_date, str):
-            # Parse string date
-            try:
-                date_obj = datetime.fromisoformat(publish_date.replace('Z', '+00:00'))
-            except ValueError:
-                try:
-                    date_obj = datetime.strptime(publish_date, '%Y-%m-%d')
-                except ValueError:
-                    return None, None
-        else:
-            # Already a datetime object
-            date_obj = publish_date
-        
-        return date_obj.year, date_obj.month
-    return None, None
+    serializer_class = ArticleListSerializer if request.GET.get('mode') == 'list' else ArticleSerializer
+    fields = request.GET.get('fields')
+    if fields:
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+    return serializer_class, fields or None
+
+
+def defer_article_body(articles, serializer_class, fields=None):
+    """
+    Helper function to skip loading the description body when it will not be serialized
+    """
+    emitted_fields = fields or serializer_class.Meta.fields
+    if 'description' not in emitted_fields:
+        return articles.defer('description')
+    return articles
+
+
+def encode_article_cursor(article):
+    """
+    Helper function to build an opaque keyset cursor from an article's (publish_date, id)
+    """
+    payload = {
+        'd': article.publish_date.isoformat() if article.publish_date else None,
+        'i': article.id,
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_article_cursor(cursor):
+    """
+    Helper function to turn a keyset cursor back into a filter that seeks past it.
+    Articles are ordered by (-publish_date, -id); MySQL sorts NULL dates last in that order.
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        last_id = int(payload['i'])
+        last_date = payload.get('d')
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+
+    if last_date is None:
+        return Q(publish_date__isnull=True, id__lt=last_id)
+    if not isinstance(last_date, str):
+        raise ValueError("Invalid cursor")
+
+    last_date = parse_datetime(last_date)
+    if last_date is None:
+        raise ValueError("Invalid cursor")
+
+    return (
+        Q(publish_date__lt=last_date) |
+        Q(publish_date=last_date, id__lt=last_id) |
+        Q(publish_date__isnull=True)
+    )
+
+
+def build_active_publications():
+    """
+    Helper function to list active publications for the navigation menu
+    """
+    return list(Publications.objects.filter(status='Active').values('id', 'name', 'display_name', 'cover_image', 'description', 'status'))
+
+
+def build_active_categories():
+    """
+    Helper function to list active categories with their publication name
+    """
+    categories = Categories.objects.filter(status='Active').select_related('publication').values(
+        'id', 'name', 'display_name', 'publication', 'publication__name', 'status'
+    )
+    
+    # Transform the data to include publication_name
+    categories_data = []
+    for category in categories:
+        categories_data.append({
+            'id': category['id'],
+            'name': category['name'],
+            'display_name': category['display_name'],
+            'publication': category['publication'],
+            'publication_name': category['publication__name'],
+            'status': category['status']
+        })
+    return categories_data
+
+
+def build_trending_articles(publication, identifier, serializer_class, fields=None, popular=False):
+    """
+    Helper function to serialize the trending articles of a publication
+    """
+    # Active articles of this publication, without the body unless it will be serialized
+    publication_articles = defer_article_body(
+        Articles.objects.filter(publication_id=publication.id, status='Active').select_related(
+            'author', 'publication', 'magazine', 'category'
+        ),
+        serializer_class,
+        fields
+    )
+    
+    # 2 latest articles per configured trending category (settings.TRENDING_CATEGORIES),
+    # or the 2 most viewed recently with popular
+    articles = get_trending_articles(publication_articles, publication, identifier, popular=popular)
+    return serializer_class(articles, many=True, fields=fields).data
+
+
+def build_billboards_by_location(location):
+    """
+    Helper function to serialize the active billboards of a location, newest first
+    """
+    billboards = Billboards.objects.filter(location=location, status='Active').order_by('-id')
+    return BillboardSerializer(billboards, many=True).data
+
+
+def build_hilal_digital():
+    """
+    Helper function to build the Hilal Digital block: a featured video and the rest
+    """
+    # Get first active video (for left side)
+    featured_video = Videos.objects.filter(status='Active').first()
+    
+    # Get other active videos (for right side, excluding featured)
+    other_videos = Videos.objects.filter(
+        status='Active'
+    ).order_by('order', 'created_at')[1:]  # Skip first one, get all remaining
+    
+    featured_serializer = VideosSerializer(featured_video) if featured_video else None
+    other_serializer = VideosSerializer(other_videos, many=True)
+    return {
+        "featured_video": featured_serializer.data if featured_serializer else None,
+        "other_videos": other_serializer.data
+    }
+
+
+def current_month_start():
+    """
+    Helper function to get the start of the current month (local time), when the
+    previous-month magazines change without any write
+    """
+    return timezone.localtime(now()).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def build_previous_month_magazines(publication, month_start=None):
+    """
+    Helper function to list a publication's last 4 magazines before the current month
+    (the one starting at `month_start`, default current_month_start()), with article counts
+    """
+    # The same clock as the section cache key and the validators
+    current_date = month_start or current_month_start()
+    current_year = current_date.year
+    
+    # Get magazines from previous months (not current month)
+    previous_magazines = Magazines.objects.filter(
+        publication=publication,
+        status='Active',
+        year__isnull=False,
+        month__isnull=False
+    ).exclude(
+        # Exclude current month
+        year=current_year,
+        month=current_date.strftime('%B')  # e.g., 'October'
+    ).order_by('-issue_date')
+    
+    # Get last 4 previous month magazines with their article counts
+    magazines_with_counts = []
+    for magazine in previous_magazines[:4]:
+        magazines_with_counts.append({
+            'id': magazine.id,
+            'title': magazine.title,
+            'year': magazine.year,
+            'month': magazine.month,
+            'month_num': datetime.strptime(magazine.month, '%B').month if magazine.month else None,
+            'cover_image': magazine.cover_image,
+            'doc_url': magazine.doc_url,
+            'article_count': magazine.article_count,
+            'publication': {
+                'id': publication.id,
+                'name': publication.name,
+                'display_name': publication.display_name
+            }
+        })
+    return magazines_with_counts
 
 
 def home(request):
@@ -94,20 +282,15 @@ class CreateArticleView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
-        # Create a mutable copy of the request data
-        data = request.data.copy()
-        
-        # Extract year and month from publish_date if provided
-        publish_date = data.get('publish_date')
-        if publish_date:
-            year, month = extract_date_fields(publish_date)
-            if year and month:
-                data['publish_date_year'] = year
-                data['publish_date_month'] = month
-        
-        serializer = ArticleSerializer(data=data)
+        # publish_date_year/publish_date_month are derived from publish_date in Articles.save()
+        serializer = ArticleSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            article = serializer.save()
+            # Assign the magazine of the article's period unless one was given
+            if assign_article_magazine(article):
+                serializer = ArticleSerializer(article)
+            if refresh_magazine_article_counts(article.magazine_id):
+                bump_model_versions(Magazines)
             return Response({"message": "Article created successfully", "data": serializer.data}, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -116,14 +299,18 @@ class GetAllArticlesView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        articles = Articles.objects.all().order_by('-publish_date')
-        serializer = ArticleSerializer(articles, many=True)
+        serializer_class, fields = get_article_list_serializer(request)
+        articles = defer_article_body(Articles.objects.all(), serializer_class, fields).order_by('-publish_date')
+        serializer = serializer_class(articles, many=True, fields=fields)
         return Response({"message": "Articles retrieved successfully", "data": serializer.data}, status=status.HTTP_200_OK)
 
 
 class SingleArticleView(APIView):
     permission_classes = [AllowAny]
 
+    @counts_article_views
+    # ARTICLE_VIEWS: the payload includes visits, which flushes change without a row write
+    @conditional_response(Articles, Categories, Publications, Authors, Magazines, ARTICLE_VIEWS, lookup='pk')
     def get(self, request, pk):
         try:
             # Get the main article with all related data
@@ -151,7 +338,9 @@ class SingleArticleView(APIView):
                 recent_articles_query = Articles.objects.filter(
                     publication=article.publication,
                     status='Active'
-                ).exclude(id=pk).select_related('category').order_by('-publish_date')
+                ).exclude(id=pk).select_related(
+                    'author', 'publication', 'magazine', 'category'
+                ).defer('description').order_by('-publish_date')
                 
                 # Filter by language if needed
                 if is_urdu_article:
@@ -166,8 +355,8 @@ class SingleArticleView(APIView):
                 # Apply slice after all filters
                 recent_articles_query = recent_articles_query[:10]
                 
-                # Serialize recent articles
-                recent_serializer = ArticleSerializer(recent_articles_query, many=True)
+                # Serialize recent articles (list representation, no body)
+                recent_serializer = ArticleListSerializer(recent_articles_query, many=True)
                 recent_articles = recent_serializer.data
             
             # Get category display name
@@ -213,21 +402,19 @@ class SingleArticleView(APIView):
     def put(self, request, pk):
         try:
             article = Articles.objects.get(pk=pk)
+            previous_period = (article.publication_id, article.publish_date)
+            previous_magazine_id = article.magazine_id
             
-            # Create a mutable copy of the request data
-            data = request.data.copy()
-            
-            # Extract year and month from publish_date if provided
-            publish_date = data.get('publish_date')
-            if publish_date:
-                year, month = extract_date_fields(publish_date)
-                if year and month:
-                    data['publish_date_year'] = year
-                    data['publish_date_month'] = month
-            
-            serializer = ArticleSerializer(article, data=data, partial=True)
+            # publish_date_year/publish_date_month are derived from publish_date in Articles.save()
+            serializer = ArticleSerializer(article, data=request.data, partial=True)
             if serializer.is_valid():
-                serializer.save()
+                article = serializer.save()
+                # Follow a publication/publish_date change unless the magazine was set explicitly
+                if 'magazine' not in request.data and assign_article_magazine(article, previous_period):
+                    serializer = ArticleSerializer(article)
+                # Reassignment and status changes both move magazine counts
+                if refresh_magazine_article_counts(previous_magazine_id, article.magazine_id):
+                    bump_model_versions(Magazines)
                 return Response(serializer.data, status=status.HTTP_200_OK)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Articles.DoesNotExist:
@@ -236,7 +423,10 @@ class SingleArticleView(APIView):
     def delete(self, request, pk):
         try:
             article = Articles.objects.get(pk=pk)
+            magazine_id = article.magazine_id
             article.delete()
+            if refresh_magazine_article_counts(magazine_id):
+                bump_model_versions(Magazines)
             return Response({"message": "Article deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
         except Articles.DoesNotExist:
             return Response({"error": "Article not found"}, status=status.HTTP_404_NOT_FOUND)
@@ -245,9 +435,14 @@ class SingleArticleView(APIView):
 class GetTopArticlesView(APIView):
     permission_classes = [AllowAny]
 
+    @conditional_response(Articles, Categories, Publications, Authors, Magazines)
     def get(self, request):
-        articles = Articles.objects.filter(publish_date__lte=now()).order_by('-publish_date')[:10]
-        serializer = ArticleSerializer(articles, many=True)
+        serializer_class, fields = get_article_list_serializer(request)
+        articles = Articles.objects.filter(publish_date__lte=now()).select_related(
+            'author', 'publication', 'magazine', 'category'
+        ).order_by('-publish_date')
+        articles = defer_article_body(articles, serializer_class, fields)[:10]
+        serializer = serializer_class(articles, many=True, fields=fields)
         return Response({"message": "Top 10 recent articles retrieved successfully", "data": serializer.data}, status=status.HTTP_200_OK)
 
 
@@ -258,8 +453,9 @@ class GetArticlesByUserView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, author_id):
-        articles = Articles.objects.filter(author_id=author_id)
-        serializer = ArticleSerializer(articles, many=True)
+        serializer_class, fields = get_article_list_serializer(request)
+        articles = defer_article_body(Articles.objects.filter(author_id=author_id), serializer_class, fields)
+        serializer = serializer_class(articles, many=True, fields=fields)
         return Response(
             {"message": "Articles retrieved successfully", "data": serializer.data},
             status=status.HTTP_200_OK
@@ -301,12 +497,12 @@ class GetAllBillboardsView(APIView):
         # Filter billboards
         billboards = Billboards.objects.filter(**filter_kwargs)
         
-        # Add search filter for title if provided (before ordering and pagination)
+        # Add full-text search on title if provided (before ordering and pagination)
         if search:
-            billboards = billboards.filter(title__icontains=search)
-        
-        # Order by created date
-        billboards = billboards.order_by('-created')
+            billboards = fulltext_search(billboards, search).order_by('-search_rank', '-created_on')
+        else:
+            # Order by created date (parsed column, indexed)
+            billboards = billboards.order_by('-created_on', '-id')
         
         # Get total count before pagination
         total_count = billboards.count()
@@ -425,12 +621,11 @@ class GetBillboardsByLocationView(APIView):
 
     def get(self, request, location):
         try:
-            billboards = Billboards.objects.filter(location=location, status='Active').order_by('-id')
-            serializer = BillboardSerializer(billboards, many=True)
+            billboards = build_billboards_by_location(location)
             return Response({
                 "message": f"Billboards retrieved successfully for location {location}", 
-                "data": serializer.data,
-                "count": billboards.count()
+                "data": billboards,
+                "count": len(billboards)
             }, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({"error": f"Error retrieving billboards: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -454,11 +649,8 @@ class GetAllMagazinesView(APIView):
         # Add publication filter
         if publication_name:
             try:
-                # Try to find by name first, then by display_name
-                try:
-                    publication = Publications.objects.get(name=publication_name, status='Active')
-                except Publications.DoesNotExist:
-                    publication = Publications.objects.get(display_name=publication_name, status='Active')
+                # Find by name, then display_name
+                publication = get_publication(publication_name)
                 filter_kwargs['publication_id'] = publication.id
             except Publications.DoesNotExist:
                 return Response({
@@ -487,7 +679,7 @@ class GetAllMagazinesView(APIView):
             filter_kwargs['language'] = language_filter
         
         # Filter magazines
-        magazines = Magazines.objects.filter(**filter_kwargs).order_by('-publish_date')
+        magazines = Magazines.objects.filter(**filter_kwargs).order_by('-issue_date', '-id')
         
         # Get total count before pagination
         total_count = magazines.count()
@@ -572,6 +764,27 @@ class SingleMagazineView(APIView):
         except Magazines.DoesNotExist:
             return Response({"error": "Magazine not found"}, status=status.HTTP_404_NOT_FOUND)
 
+class MagazineContentsView(APIView):
+    """
+    API to get the table of contents of a magazine issue: the snapshot frozen when the
+    issue was published, read with the magazine row.
+    """
+    permission_classes = [AllowAny]
+
+    @conditional_response(Magazines)
+    def get(self, request, pk):
+        try:
+            magazine = Magazines.objects.get(pk=pk)
+            contents = get_table_of_contents(magazine)
+            return Response({
+                "message": "Magazine contents retrieved successfully",
+                "data": contents,
+                # Counted from the contents, which may be frozen, not the live column
+                "article_count": len(contents['articles'])
+            }, status=status.HTTP_200_OK)
+        except Magazines.DoesNotExist:
+            return Response({"error": "Magazine not found"}, status=status.HTTP_404_NOT_FOUND)
+
 class ForceDeleteMagazineView(APIView):
     """
     API to force delete a magazine by first unassigning all articles referencing it.
@@ -583,15 +796,13 @@ class ForceDeleteMagazineView(APIView):
         try:
             magazine = Magazines.objects.get(pk=pk)
             
-            # Get articles referencing this magazine
-            articles = Articles.objects.filter(magazine=magazine)
-            articles_count = articles.count()
+            # Unassign articles from this magazine; the update returns how many there were
+            articles_count = Articles.objects.filter(magazine=magazine).update(magazine=None)
             
-            if articles_count > 0:
-                # Unassign articles from this magazine
-                articles.update(magazine=None)
-                
+            # Its article_count and table of contents go with the row
             magazine.delete()
+            # The unassignment was an update(), which sends no signal
+            bump_model_versions(Articles)
             
             message = f"Magazine '{magazine.title}' deleted successfully"
             if articles_count > 0:
@@ -607,7 +818,16 @@ class CreateOrUpdateMagazineView(APIView):
     def post(self, request):
         serializer = MagazineSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            magazine = serializer.save()
+            if assign_magazine_articles(magazine):
+                bump_model_versions(Articles)
+            refresh_magazine_article_counts(magazine.id)
+            # Issues created active are published: freeze their table of contents
+            publish_table_of_contents(magazine)
+            magazine.refresh_from_db(fields=['article_count'])
+            serializer = MagazineSerializer(magazine)
+            # The count and contents were written with update() after the save
+            bump_model_versions(Magazines)
             return Response({"message": "Magazine created successfully", "data": serializer.data}, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -616,7 +836,18 @@ class CreateOrUpdateMagazineView(APIView):
             magazine = Magazines.objects.get(pk=pk)
             serializer = MagazineSerializer(magazine, data=request.data, partial=True)
             if serializer.is_valid():
-                serializer.save()
+                magazine = serializer.save()
+                # A magazine that gains a period (or is activated) picks up its articles
+                if assign_magazine_articles(magazine):
+                    bump_model_versions(Articles)
+                # save() wrote back the article_count read above; recount
+                refresh_magazine_article_counts(magazine.id)
+                # Saving an active issue (re)publishes it
+                publish_table_of_contents(magazine)
+                magazine.refresh_from_db(fields=['article_count'])
+                serializer = MagazineSerializer(magazine)
+                # The count and contents were written with update() after the save
+                bump_model_versions(Magazines)
                 return Response({"message": "Magazine updated successfully", "data": serializer.data}, status=status.HTTP_200_OK)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Magazines.DoesNotExist:
@@ -659,12 +890,12 @@ class GetAllEbooksView(APIView):
         # Filter ebooks
         ebooks = Ebook.objects.filter(**filter_kwargs)
         
-        # Add search filter for title if provided (before ordering and pagination)
+        # Add full-text search on title if provided (before ordering and pagination)
         if search:
-            ebooks = ebooks.filter(title__icontains=search)
-        
-        # Order by publish date
-        ebooks = ebooks.order_by('-publish_date')
+            ebooks = fulltext_search(ebooks, search).order_by('-search_rank', '-published_on')
+        else:
+            # Order by publish date (parsed column, indexed)
+            ebooks = ebooks.order_by('-published_on', '-id')
         
         # Get total count before pagination
         total_count = ebooks.count()
@@ -844,14 +1075,12 @@ class GetAllAuthorsView(APIView):
         # Filter authors
         authors = Authors.objects.filter(**filter_kwargs)
         
-        # Add search filter for author_name or email if provided (before ordering and pagination)
+        # Add full-text search on author_name/email if provided (before ordering and pagination)
         if search:
-            authors = authors.filter(
-                Q(author_name__icontains=search) | Q(email__icontains=search)
-            )
-        
-        # Order by id
-        authors = authors.order_by('-id')
+            authors = fulltext_search(authors, search).order_by('-search_rank', '-id')
+        else:
+            # Order by id
+            authors = authors.order_by('-id')
         
         # Get total count before pagination
         total_count = authors.count()
@@ -949,6 +1178,8 @@ def hello_view(request):
 class GetAllVideosView(APIView):
     permission_classes = [AllowAny]
 
+    @conditional_response(Videos)
+    @cached_response(Videos)
     def get(self, request):
         videos = Videos.objects.filter(status='Active').order_by('order', 'created_at')
         serializer = VideosSerializer(videos, many=True)
@@ -958,6 +1189,7 @@ class GetAllVideosView(APIView):
 class SingleVideoView(APIView):
     permission_classes = [AllowAny]
 
+    @conditional_response(Videos, lookup='pk')
     def get(self, request, pk):
         try:
             video = Videos.objects.get(pk=pk)
@@ -1084,24 +1316,12 @@ class GetAllVideosManagementView(APIView):
 class GetHilalDigitalView(APIView):
     permission_classes = [AllowAny]
 
+    @conditional_response(Videos)
+    @cached_response(Videos)
     def get(self, request):
-        # Get first active video (for left side)
-        featured_video = Videos.objects.filter(status='Active').first()
-        
-        # Get other active videos (for right side, excluding featured)
-        other_videos = Videos.objects.filter(
-            status='Active'
-        ).order_by('order', 'created_at')[1:]  # Skip first one, get all remaining
-        
-        featured_serializer = VideosSerializer(featured_video) if featured_video else None
-        other_serializer = VideosSerializer(other_videos, many=True)
-        
         return Response({
             "message": "Hilal Digital data retrieved successfully",
-            "data": {
-                "featured_video": featured_serializer.data if featured_serializer else None,
-                "other_videos": other_serializer.data
-            }
+            "data": build_hilal_digital()
         }, status=status.HTTP_200_OK)
 
 
@@ -1237,6 +1457,7 @@ class GetAllPublicationsView(APIView):
 class SinglePublicationView(APIView):
     permission_classes = [AllowAny]
 
+    @conditional_response(Publications, lookup='pk')
     def get(self, request, pk):
         try:
             publication = Publications.objects.get(pk=pk)
@@ -1272,8 +1493,9 @@ class GetArticlesByPublicationView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, publication_id):
-        articles = Articles.objects.filter(publication_id=publication_id)
-        serializer = ArticleSerializer(articles, many=True)
+        serializer_class, fields = get_article_list_serializer(request)
+        articles = defer_article_body(Articles.objects.filter(publication_id=publication_id), serializer_class, fields)
+        serializer = serializer_class(articles, many=True, fields=fields)
         return Response(
             {"message": "Articles retrieved successfully", "data": serializer.data},
             status=status.HTTP_200_OK
@@ -1297,11 +1519,8 @@ class GetArticlesByPublicationNameView(APIView):
         year = request.GET.get('year')
         
         try:
-            # Get publication by name first, then by display_name
-            try:
-                publication = Publications.objects.get(name=publication_name, status='Active')
-            except Publications.DoesNotExist:
-                publication = Publications.objects.get(display_name=publication_name, status='Active')
+            # Find by name, then display_name
+            publication = get_publication(publication_name)
             
             # Use provided month/year or default to current month/year
             now = datetime.now()
@@ -1316,13 +1535,16 @@ class GetArticlesByPublicationNameView(APIView):
             
             # Add date filters if provided
             if month and year:
-                filter_kwargs['publish_date__month'] = filter_month
-                filter_kwargs['publish_date__year'] = filter_year
+                month_start, month_end = publish_month_range(filter_year, filter_month)
+                filter_kwargs['publish_date__gte'] = month_start
+                filter_kwargs['publish_date__lt'] = month_end
             
             # Filter articles
+            serializer_class, fields = get_article_list_serializer(request)
             articles = Articles.objects.filter(**filter_kwargs).order_by('-publish_date')
+            articles = defer_article_body(articles, serializer_class, fields)
             
-            serializer = ArticleSerializer(articles, many=True)
+            serializer = serializer_class(articles, many=True, fields=fields)
             return Response({
                 "message": f"{publication_name} articles retrieved successfully", 
                 "data": serializer.data,
@@ -1349,11 +1571,12 @@ class GetActivePublicationsView(APIView):
     """
     permission_classes = [AllowAny]
 
+    @conditional_response(Publications)
+    @cached_response(Publications)
     def get(self, request):
-        publications = Publications.objects.filter(status='Active').values('id', 'name', 'display_name', 'cover_image', 'description', 'status')
         return Response({
             "message": "Active publications retrieved successfully", 
-            "data": list(publications)
+            "data": build_active_publications()
         }, status=status.HTTP_200_OK)
 
 
@@ -1390,30 +1613,11 @@ class GetFilteredMagazineArticlesView(APIView):
                 query &= Q(year=int(year))
             
             # Get magazines with related data
-            magazines = Magazines.objects.filter(query).select_related('publication').order_by('-year', '-month')
+            magazines = Magazines.objects.filter(query).select_related('publication').order_by('-issue_date')
             
             # Serialize the data
             magazines_data = []
             for magazine in magazines:
-                # Get article count for this magazine
-                article_count = Articles.objects.filter(
-                    magazine=magazine,
-                    status='Active'
-                ).count()
-                
-                # If no articles assigned to magazine, try to get articles from the month/year
-                if article_count == 0:
-                    try:
-                        month_num = datetime.strptime(magazine.month, '%B').month
-                        article_count = Articles.objects.filter(
-                            publication=magazine.publication,
-                            status='Active',
-                            publish_date__year=magazine.year,
-                            publish_date__month=month_num
-                        ).count()
-                    except ValueError:
-                        pass
-                
                 magazine_data = {
                     'id': magazine.id,
                     'title': magazine.title,
@@ -1422,7 +1626,7 @@ class GetFilteredMagazineArticlesView(APIView):
                     'year': magazine.year,
                     'month': magazine.month,
                     'month_num': datetime.strptime(magazine.month, '%B').month if magazine.month else None,
-                    'article_count': article_count,
+                    'article_count': magazine.article_count,
                     'publication_name': magazine.publication.name if magazine.publication else None,
                     'publication_display_name': magazine.publication.display_name if magazine.publication else None,
                 }
@@ -1564,26 +1768,12 @@ class GetActiveCategoriesView(APIView):
     """
     permission_classes = [AllowAny]
 
+    @conditional_response(Categories, Publications)
+    @cached_response(Categories, Publications)
     def get(self, request):
-        categories = Categories.objects.filter(status='Active').select_related('publication').values(
-            'id', 'name', 'display_name', 'publication', 'publication__name', 'status'
-        )
-        
-        # Transform the data to include publication_name
-        categories_data = []
-        for category in categories:
-            categories_data.append({
-                'id': category['id'],
-                'name': category['name'],
-                'display_name': category['display_name'],
-                'publication': category['publication'],
-                'publication_name': category['publication__name'],
-                'status': category['status']
-            })
-        
         return Response({
             "message": "Active categories retrieved successfully",
-            "data": categories_data
+            "data": build_active_categories()
         }, status=status.HTTP_200_OK)
 
 
@@ -1593,6 +1783,7 @@ class SingleCategoryView(APIView):
     """
     permission_classes = [AllowAny]
 
+    @conditional_response(Categories, Publications, lookup='pk')
     def get(self, request, pk):
         try:
             category = Categories.objects.get(pk=pk)
@@ -1629,9 +1820,14 @@ class GetFilteredArticlesView(APIView):
     """
     Unified API to get articles filtered by publication, magazine, category, and date.
     Accepts multiple optional query parameters for flexible filtering.
+    Pass `cursor` (empty for the first page, then `next_cursor`) for keyset pagination;
+    totals are then only computed with `include_total=1`. `page`/`count` keep working.
+    `search` is full-text over title/description; page/count mode orders it by relevance.
+    `mode=list` returns excerpts instead of bodies and `fields=` selects a sparse fieldset.
     """
     permission_classes = [AllowAny]
 
+    @conditional_response(Articles, Categories, Publications, Authors, Magazines)
     def get(self, request):
         from datetime import datetime
         
@@ -1654,11 +1850,8 @@ class GetFilteredArticlesView(APIView):
         # Add publication filter - prioritize name over display_name
         if publication_name:
             try:
-                # Try to find by name first, then by display_name
-                try:
-                    publication = Publications.objects.get(name=publication_name, status='Active')
-                except Publications.DoesNotExist:
-                    publication = Publications.objects.get(display_name=publication_name, status='Active')
+                # Find by name, then display_name
+                publication = get_publication(publication_name)
                 filter_kwargs['publication_id'] = publication.id
             except Publications.DoesNotExist:
                 return Response({
@@ -1681,7 +1874,7 @@ class GetFilteredArticlesView(APIView):
                 category_id = int(category_id)
                 # Verify category exists and is active
                 try:
-                    category = Categories.objects.get(id=category_id, status='Active')
+                    category = get_category_by_id(category_id)
                     filter_kwargs['category_id'] = category_id
                 except Categories.DoesNotExist:
                     return Response({
@@ -1696,17 +1889,10 @@ class GetFilteredArticlesView(APIView):
                 # Find category by name within the publication
                 if publication_name:
                     try:
-                        # Try to find by name first, then by display_name
-                        try:
-                            publication = Publications.objects.get(name=publication_name, status='Active')
-                        except Publications.DoesNotExist:
-                            publication = Publications.objects.get(display_name=publication_name, status='Active')
+                        # Find by name, then display_name
+                        publication = get_publication(publication_name)
                         
-                        category = Categories.objects.get(
-                            name=category_name, 
-                            publication=publication, 
-                            status='Active'
-                        )
+                        category = get_category(publication, category_name)
                         filter_kwargs['category_id'] = category.id
                     except (Publications.DoesNotExist, Categories.DoesNotExist):
                         return Response({
@@ -1732,43 +1918,103 @@ class GetFilteredArticlesView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         
         # Add date filters
-        if month and year:
+        if month or year:
             try:
-                filter_month = int(month)
-                filter_year = int(year)
-                filter_kwargs['publish_date__month'] = filter_month
-                filter_kwargs['publish_date__year'] = filter_year
+                # If only one is provided, use current for the missing one
+                now = datetime.now()
+                filter_month = int(month) if month else now.month
+                filter_year = int(year) if year else now.year
+                month_start, month_end = publish_month_range(filter_year, filter_month)
+                filter_kwargs['publish_date__gte'] = month_start
+                filter_kwargs['publish_date__lt'] = month_end
             except ValueError:
                 return Response({
                     "error": "Invalid month or year parameter. Must be integers."
                 }, status=status.HTTP_400_BAD_REQUEST)
-        elif month or year:
-            # If only one is provided, use current for the missing one
-            now = datetime.now()
-            filter_month = int(month) if month else now.month
-            filter_year = int(year) if year else now.year
-            filter_kwargs['publish_date__month'] = filter_month
-            filter_kwargs['publish_date__year'] = filter_year
         
         # Filter articles with optimized queries using select_related to reduce database hits
         articles = Articles.objects.filter(**filter_kwargs).select_related(
             'author', 'publication', 'magazine', 'category'
         )
         
-        # Add search filter for title if provided (before ordering and pagination)
+        # Add full-text search on title/description if provided (before ordering and pagination)
         if search:
-            articles = articles.filter(title__icontains=search)
-        
-        # Order by publish date
-        articles = articles.order_by('-publish_date')
-        
-        # Get total count before pagination
-        total_count = articles.count()
+            articles = fulltext_search(articles, search)
         
+        # Order by publish date (id breaks ties so pages are stable)
+        articles = articles.order_by('-publish_date', '-id')
+
+        # mode=list / fields= pick a lighter representation; skip loading the body if unused
+        serializer_class, fields = get_article_list_serializer(request)
+        articles = defer_article_body(articles, serializer_class, fields)
+
         # Get pagination parameters
         page = request.GET.get('page', 1)
         page_size = request.GET.get('page_size', 50)  # Default 50 articles per page
-        
+        cursor = request.GET.get('cursor')
+        include_total = request.GET.get('include_total', '').lower() in ['1', 'true', 'yes']
+
+        # Keyset pagination: seek past the cursor instead of scanning skipped rows
+        if cursor is not None and not count:
+            try:
+                page_size = int(page_size)
+            except ValueError:
+                return Response({
+                    "error": "Invalid page_size parameter. Must be an integer."
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if page_size < 1:
+                page_size = 50
+            if page_size > 100:  # Max 100 articles per page to prevent performance issues
+                page_size = 100
+
+            # Count the whole filtered set only when the client asks for it
+            total_count = articles.count() if include_total else None
+
+            if cursor:
+                try:
+                    articles = articles.filter(decode_article_cursor(cursor))
+                except ValueError:
+                    return Response({
+                        "error": "Invalid cursor parameter."
+                    }, status=status.HTTP_400_BAD_REQUEST)
+
+            # Fetch one extra row to know whether another page exists
+            articles = list(articles[:page_size + 1])
+            has_next = len(articles) > page_size
+            articles = articles[:page_size]
+
+            serializer = serializer_class(articles, many=True, fields=fields)
+
+            return Response({
+                "message": "Filtered articles retrieved successfully",
+                "data": serializer.data,
+                "pagination": {
+                    "cursor": cursor or None,
+                    "next_cursor": encode_article_cursor(articles[-1]) if has_next else None,
+                    "page_size": page_size,
+                    "total_count": total_count,
+                    "has_next": has_next,
+                    "has_previous": bool(cursor)
+                },
+                "filters_applied": {
+                    "publication": publication_name,
+                    "magazine_id": magazine_id,
+                    "category_id": category_id,
+                    "category": category_name,
+                    "month": month,
+                    "year": year,
+                    "count": count,
+                    "search": search
+                }
+            }, status=status.HTTP_200_OK)
+
+        # Page/count mode ranks search results by relevance
+        if search:
+            articles = articles.order_by('-search_rank', '-publish_date', '-id')
+
+        # Get total count before pagination
+        total_count = articles.count()
+
         # Apply count limit if provided (for backward compatibility)
         if count:
             try:
@@ -1805,7 +2051,7 @@ class GetFilteredArticlesView(APIView):
                     "error": "Invalid page or page_size parameter. Must be integers."
                 }, status=status.HTTP_400_BAD_REQUEST)
         
-        serializer = ArticleSerializer(articles, many=True)
+        serializer = serializer_class(articles, many=True, fields=fields)
         
         # Calculate pagination metadata
         total_pages = (total_count + page_size - 1) // page_size if page_size > 0 else 0
@@ -1841,15 +2087,13 @@ class GetArticlesByPublicationView(APIView):
     """
     permission_classes = [AllowAny]
 
+    @conditional_response(Articles, Categories, Publications, Authors, Magazines)
     def get(self, request, publication_name):
         from datetime import datetime
         
         try:
-            # Get the publication by name first, then by display_name
-            try:
-                publication = Publications.objects.get(name=publication_name, status='Active')
-            except Publications.DoesNotExist:
-                publication = Publications.objects.get(display_name=publication_name, status='Active')
+            # Find by name, then display_name
+            publication = get_publication(publication_name)
             
             # Get current month and year
             now = datetime.now()
@@ -1857,14 +2101,17 @@ class GetArticlesByPublicationView(APIView):
             current_year = now.year
             
             # Filter articles by publication and current month
+            month_start, month_end = publish_month_range(current_year, current_month)
             articles = Articles.objects.filter(
                 publication_id=publication.id,
                 status='Active',
-                publish_date__month=current_month,
-                publish_date__year=current_year
+                publish_date__gte=month_start,
+                publish_date__lt=month_end
             ).order_by('-publish_date')
+            serializer_class, fields = get_article_list_serializer(request)
+            articles = defer_article_body(articles, serializer_class, fields)
             
-            serializer = ArticleSerializer(articles, many=True)
+            serializer = serializer_class(articles, many=True, fields=fields)
             return Response({
                 "message": f"Articles for {publication_name} (current month) retrieved successfully",
                 "data": serializer.data,
@@ -1887,193 +2134,45 @@ class GetTrendingArticlesView(APIView):
     For hilal-english: 6 articles (2 from in-focus, 2 from national-news, 2 from misc)
     For hilal-urdu: 6 articles (2 from special-focus/in-focus equivalent, 2 from national-and-international-issues, 2 from misc)
     For others: Get articles from available categories (2 from each category, up to 6 total)
+    The category mapping lives in settings.TRENDING_CATEGORIES.
+    Pass sort=popular to rank each category by time-decayed views instead of recency.
     """
     permission_classes = [AllowAny]
 
     def get(self, request, publication_name):
+        # The popular ranking also changes with every flush of the view counts
+        if request.GET.get('sort') == 'popular':
+            return self.get_popular(request, publication_name)
+        return self.get_recent(request, publication_name)
+
+    @conditional_response(Articles, Categories, Publications, Authors, Magazines)
+    @cached_response(Articles, Categories, Publications, Authors, Magazines)
+    def get_recent(self, request, publication_name):
+        return self.build_response(request, publication_name, popular=False)
+
+    @conditional_response(Articles, Categories, Publications, Authors, Magazines, ARTICLE_VIEWS)
+    @cached_response(Articles, Categories, Publications, Authors, Magazines, ARTICLE_VIEWS)
+    def get_popular(self, request, publication_name):
+        return self.build_response(request, publication_name, popular=True)
+
+    def build_response(self, request, publication_name, popular):
         try:
-            # Get the publication by name first, then by display_name
-            try:
-                publication = Publications.objects.get(name=publication_name, status='Active')
-            except Publications.DoesNotExist:
-                publication = Publications.objects.get(display_name=publication_name, status='Active')
+            # Find by name, then display_name
+            publication = get_publication(publication_name)
             
-            # Normalize publication name for comparison (handle spaces, hyphens, case)
-            pub_name_lower = publication_name.lower().replace(' ', '-').replace('_', '-')
-            articles = []
+            serializer_class, fields = get_article_list_serializer(request)
+            articles = build_trending_articles(publication, publication_name, serializer_class, fields, popular=popular)
             
-            # For hilal-english: use specific categories (in-focus, national-news, miscellaneous)
-            if pub_name_lower in ['hilal-english', 'hilalenglish']:
-                # Get in-focus articles (2) - Left column
-                infocus_articles = []
-                try:
-                    infocus_category = Categories.objects.get(
-                        name='in-focus',
-                        publication=publication,
-                        status='Active'
-                    )
-                    infocus_articles = list(Articles.objects.filter(
-                        publication_id=publication.id,
-                        category_id=infocus_category.id,
-                        status='Active'
-                    ).order_by('-publish_date')[:2])
-                except Categories.DoesNotExist:
-                    pass
-                
-                # Get national-news articles (2) - Middle column
-                national_news_articles = []
-                try:
-                    national_news_category = Categories.objects.get(
-                        name='national-news',
-                        publication=publication,
-                        status='Active'
-                    )
-                    national_news_articles = list(Articles.objects.filter(
-                        publication_id=publication.id,
-                        category_id=national_news_category.id,
-                        status='Active'
-                    ).order_by('-publish_date')[:2])
-                except Categories.DoesNotExist:
-                    pass
-                
-                # Get misc articles (2) - Right column
-                misc_articles = []
-                try:
-                    misc_category = Categories.objects.get(
-                        name='miscellaneous',
-                        publication=publication,
-                        status='Active'
-                    )
-                    misc_articles = list(Articles.objects.filter(
-                        publication_id=publication.id,
-                        category_id=misc_category.id,
-                        status='Active'
-                    ).order_by('-publish_date')[:2])
-                except Categories.DoesNotExist:
-                    pass
-                
-                # Combine articles: [in-focus1, in-focus2, national-news1, national-news2, misc1, misc2]
-                articles = infocus_articles + national_news_articles + misc_articles
-                
-            # For hilal-urdu: use Urdu-specific categories
-            elif pub_name_lower in ['hilal-urdu', 'hilalurdu']:
-                # Get special-focus or in-focus equivalent (2) - Left column
-                infocus_articles = []
-                try:
-                    # Try special-focus first (Urdu equivalent of in-focus)
-                    infocus_category = Categories.objects.get(
-                        name='special-focus',
-                        publication=publication,
-                        status='Active'
-                    )
-                    infocus_articles = list(Articles.objects.filter(
-                        publication_id=publication.id,
-                        category_id=infocus_category.id,
-                        status='Active'
-                    ).order_by('-publish_date')[:2])
-                except Categories.DoesNotExist:
-                    # Try in-focus if special-focus doesn't exist
-                    try:
-                        infocus_category = Categories.objects.get(
-                            name='in-focus',
-                            publication=publication,
-                            status='Active'
-                        )
-                        infocus_articles = list(Articles.objects.filter(
-                            publication_id=publication.id,
-                            category_id=infocus_category.id,
-                            status='Active'
-                        ).order_by('-publish_date')[:2])
-                    except Categories.DoesNotExist:
-                        pass
-                
-                # Get national-and-international-issues articles (2) - Middle column
-                national_news_articles = []
-                try:
-                    # Try national-and-international-issues (Urdu category name)
-                    national_category = Categories.objects.get(
-                        name='national-and-international-issues',
-                        publication=publication,
-                        status='Active'
-                    )
-                    national_news_articles = list(Articles.objects.filter(
-                        publication_id=publication.id,
-                        category_id=national_category.id,
-                        status='Active'
-                    ).order_by('-publish_date')[:2])
-                except Categories.DoesNotExist:
-                    # Try national-news as fallback
-                    try:
-                        national_category = Categories.objects.get(
-                            name='national-news',
-                            publication=publication,
-                            status='Active'
-                        )
-                        national_news_articles = list(Articles.objects.filter(
-                            publication_id=publication.id,
-                            category_id=national_category.id,
-                            status='Active'
-                        ).order_by('-publish_date')[:2])
-                    except Categories.DoesNotExist:
-                        pass
-                
-                # Get misc articles (2) - Right column
-                misc_articles = []
-                try:
-                    misc_category = Categories.objects.get(
-                        name='miscellaneous',
-                        publication=publication,
-                        status='Active'
-                    )
-                    misc_articles = list(Articles.objects.filter(
-                        publication_id=publication.id,
-                        category_id=misc_category.id,
-                        status='Active'
-                    ).order_by('-publish_date')[:2])
-                except Categories.DoesNotExist:
-                    pass
-                
-                # Combine articles: [infocus1, infocus2, national1, national2, misc1, misc2]
-                articles = infocus_articles + national_news_articles + misc_articles
-                
-            # For other publications: get articles from available categories
-            else:
-                # Get all active categories for this publication
-                categories = Categories.objects.filter(
-                    publication=publication,
-                    status='Active'
-                ).order_by('id')[:3]  # Get first 3 categories
-                
-                # For each category, get 2 articles
-                for category in categories:
-                    category_articles = list(Articles.objects.filter(
-                        publication_id=publication.id,
-                        category_id=category.id,
-                        status='Active'
-                    ).order_by('-publish_date')[:2])
-                    articles.extend(category_articles)
-                
-                # If we have less than 6 articles, fill with latest articles from any category
-                if len(articles) < 6:
-                    remaining_count = 6 - len(articles)
-                    existing_article_ids = [a.id for a in articles] if articles else []
-                    additional_articles = Articles.objects.filter(
-                        publication_id=publication.id,
-                        status='Active'
-                    ).exclude(id__in=existing_article_ids).order_by('-publish_date')[:remaining_count]
-                    articles.extend(list(additional_articles))
-            
-            serializer = ArticleSerializer(articles, many=True)
             return Response({
                 "message": f"Mixed trending articles for {publication_name} retrieved successfully",
-                "data": serializer.data,
+                "data": articles,
                 "publication": {
                     "id": publication.id,
                     "name": publication.name,
                     "display_name": publication.display_name
                 },
                 "article_type": "mixed",
-                "count": len(serializer.data)
+                "count": len(articles)
             }, status=status.HTTP_200_OK)
             
         except Publications.DoesNotExist:
@@ -2086,6 +2185,56 @@ class GetTrendingArticlesView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class GetPopularArticlesView(APIView):
+    """
+    API to get the most viewed articles of a publication, ranked by time-decayed views.
+    Accepts an optional limit query parameter (default 6, clamped to 1-50).
+    """
+    permission_classes = [AllowAny]
+
+    @conditional_response(Articles, Categories, Publications, Authors, Magazines, ARTICLE_VIEWS)
+    @cached_response(Articles, Categories, Publications, Authors, Magazines, ARTICLE_VIEWS, timeout=5 * 60)
+    def get(self, request, publication_name):
+        try:
+            # A negative limit would slice from the end, which querysets reject
+            limit = max(1, min(int(request.GET.get('limit', 6)), 50))
+        except ValueError:
+            return Response({
+                "error": "Invalid limit parameter. Must be an integer."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            # Find by name, then display_name
+            publication = get_publication(publication_name)
+        except Publications.DoesNotExist:
+            return Response({
+                "error": f"Publication '{publication_name}' not found or inactive"
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        # Served from articles_pub_trending_idx: one backward range scan, no sort
+        serializer_class, fields = get_article_list_serializer(request)
+        articles = Articles.objects.filter(
+            publication_id=publication.id,
+            status='Active',
+            trending_score__isnull=False
+        ).select_related(
+            'author', 'publication', 'magazine', 'category'
+        ).order_by('-trending_score')
+        articles = defer_article_body(articles, serializer_class, fields)[:limit]
+
+        serializer = serializer_class(articles, many=True, fields=fields)
+        return Response({
+            "message": f"Popular articles for {publication_name} retrieved successfully",
+            "data": serializer.data,
+            "publication": {
+                "id": publication.id,
+                "name": publication.name,
+                "display_name": publication.display_name
+            },
+            "count": len(serializer.data)
+        }, status=status.HTTP_200_OK)
+
+
 class GetMagazineAssignmentsView(APIView):
     """
     API to get magazine assignment statistics and details.
@@ -2095,11 +2244,12 @@ class GetMagazineAssignmentsView(APIView):
     def get(self, request):
         try:
             # Get statistics
-            total_articles = Articles.objects.filter(status='Active').count()
-            articles_with_magazines = Articles.objects.filter(
-                status='Active', 
-                magazine__isnull=False
-            ).count()
+            totals = Articles.objects.filter(status='Active').aggregate(
+                total=Count('id'),
+                with_magazines=Count('id', filter=Q(magazine__isnull=False))
+            )
+            total_articles = totals['total']
+            articles_with_magazines = totals['with_magazines']
             articles_without_magazines = total_articles - articles_with_magazines
             
             # Get recent magazine assignments
@@ -2110,21 +2260,16 @@ class GetMagazineAssignmentsView(APIView):
             
             # Get magazines with article counts
             magazines_with_counts = []
-            magazines = Magazines.objects.filter(status='Active').order_by('-year', '-month')
+            magazines = Magazines.objects.filter(status='Active').select_related('publication').order_by('-issue_date')
             
             for magazine in magazines:
-                article_count = Articles.objects.filter(
-                    magazine=magazine,
-                    status='Active'
-                ).count()
-                
                 magazines_with_counts.append({
                     'id': magazine.id,
                     'title': magazine.title,
                     'year': magazine.year,
                     'month': magazine.month,
                     'publication': magazine.publication.display_name if magazine.publication else None,
-                    'article_count': article_count
+                    'article_count': magazine.article_count
                 })
             
             # Serialize recent assignments
@@ -2170,70 +2315,10 @@ class GetPreviousMonthMagazinesView(APIView):
 
     def get(self, request, publication_name):
         try:
-            # Get the publication by name first, then by display_name
-            try:
-                publication = Publications.objects.get(name=publication_name, status='Active')
-            except Publications.DoesNotExist:
-                publication = Publications.objects.get(display_name=publication_name, status='Active')
+            # Find by name, then display_name
+            publication = get_publication(publication_name)
             
-            # Get current date
-            from datetime import datetime
-            current_date = datetime.now()
-            current_month = current_date.month
-            current_year = current_date.year
-            
-            # Get magazines from previous months (not current month)
-            previous_magazines = Magazines.objects.filter(
-                publication=publication,
-                status='Active',
-                year__isnull=False,
-                month__isnull=False
-            ).exclude(
-                # Exclude current month
-                year=current_year,
-                month=current_date.strftime('%B')  # e.g., 'October'
-            ).order_by('-year', '-month')[:4]  # Get last 4 previous month magazines
-            
-            # Get article counts for each magazine
-            magazines_with_counts = []
-            for magazine in previous_magazines:
-                # Count articles assigned to this magazine
-                article_count = Articles.objects.filter(
-                    magazine=magazine,
-                    status='Active'
-                ).count()
-                
-                # If no articles assigned, try to get articles from the month/year
-                if article_count == 0:
-                    # Try to match articles by publication and date
-                    try:
-                        # Convert month name to number
-                        month_num = datetime.strptime(magazine.month, '%B').month
-                        article_count = Articles.objects.filter(
-                            publication=publication,
-                            status='Active',
-                            publish_date__year=magazine.year,
-                            publish_date__month=month_num
-                        ).count()
-                    except ValueError:
-                        # If month name is invalid, keep count as 0
-                        pass
-                
-                magazines_with_counts.append({
-                    'id': magazine.id,
-                    'title': magazine.title,
-                    'year': magazine.year,
-                    'month': magazine.month,
-                    'month_num': datetime.strptime(magazine.month, '%B').month if magazine.month else None,
-                    'cover_image': magazine.cover_image,
-                    'doc_url': magazine.doc_url,
-                    'article_count': article_count,
-                    'publication': {
-                        'id': publication.id,
-                        'name': publication.name,
-                        'display_name': publication.display_name
-                    }
-                })
+            magazines_with_counts = build_previous_month_magazines(publication)
             
             return Response({
                 "message": f"Previous month magazines for {publication_name} retrieved successfully",
@@ -2256,6 +2341,168 @@ class GetPreviousMonthMagazinesView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class GetHomePageView(APIView):
+    """
+    API to get everything the landing page of a publication renders in one request:
+    publications, categories, trending, billboards, videos and magazines.
+    Pass sections=trending,videos to build only those, and billboard_locations=a,b
+    to pick billboard slots (default: all active billboards grouped by location).
+    Each section is cached separately and invalidated by writes to its own models.
+    """
+    permission_classes = [AllowAny]
+
+    # Section name -> models its data is built from
+    HOME_SECTIONS = {
+        'publications': (Publications,),
+        'categories': (Categories, Publications),
+        'trending': (Articles, Categories, Publications, Authors, Magazines),
+        'billboards': (Billboards,),
+        'videos': (Videos,),
+        'magazines': (Magazines, Articles, Publications),
+    }
+
+    @conditional_response(Articles, Categories, Publications, Authors, Magazines, Videos, Billboards, period=current_month_start)
+    def get(self, request, publication_name):
+        sections = request.GET.get('sections')
+        if sections:
+            sections = [section.strip() for section in sections.split(',') if section.strip()]
+            unknown = [section for section in sections if section not in self.HOME_SECTIONS]
+            if unknown:
+                return Response({
+                    "error": f"Unknown sections: {', '.join(unknown)}. Available: {', '.join(self.HOME_SECTIONS)}"
+                }, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            sections = list(self.HOME_SECTIONS)
+
+        locations = request.GET.get('billboard_locations')
+        locations = sorted({location.strip() for location in locations.split(',') if location.strip()}) if locations else None
+
+        try:
+            # Find by name, then display_name
+            publication = get_publication(publication_name)
+        except Publications.DoesNotExist:
+            return Response({
+                "error": f"Publication '{publication_name}' not found or inactive"
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        builders = {
+            'publications': build_active_publications,
+            'categories': build_active_categories,
+            # Cards only: the list serializer carries the excerpt instead of the body
+            'trending': lambda: build_trending_articles(publication, publication_name, ArticleListSerializer),
+            'billboards': lambda: self.build_billboards(locations),
+            'videos': build_hilal_digital,
+            'magazines': lambda: build_previous_month_magazines(publication, month_start),
+        }
+        # Which issues count as previous months changes on the 1st
+        month_start = current_month_start()
+        section_keys = {
+            'trending': publication.id,
+            'billboards': locations,
+            'magazines': (publication.id, month_start.strftime('%Y-%m')),
+        }
+
+        data = {}
+        for section in sections:
+            data[section] = cached_section(
+                f'HomePage:{section}',
+                section_keys.get(section),
+                self.HOME_SECTIONS[section],
+                builders[section]
+            )
+
+        return Response({
+            "publication": {
+                "id": publication.id,
+                "name": publication.name,
+                "display_name": publication.display_name
+            },
+            "sections": data
+        }, status=status.HTTP_200_OK)
+
+    def build_billboards(self, locations):
+        """Helper method to group active billboards by location"""
+        if locations:
+            return {location: build_billboards_by_location(location) for location in locations}
+        billboards = {}
+        for billboard in BillboardSerializer(Billboards.objects.filter(status='Active').order_by('-id'), many=True).data:
+            billboards.setdefault(billboard['location'], []).append(billboard)
+        return billboards
+
+
+UPLOAD_ENTITY_TYPES = ['articles', 'authors', 'gallery', 'magazines', 'publications', 'billboards', 'magazinesPdf', 'ebooks']
+
+
+def get_upload_parts(entity_type, file_purpose, file_extension):
+    """
+    Helper function to validate an upload against the storage rules of its entity type.
+    Returns (upload_parts, error): the directory parts under MEDIA_ROOT, or an error message.
+    """
+    # Validate entity type
+    if entity_type not in UPLOAD_ENTITY_TYPES:
+        return None, f'Invalid entity_type. Must be one of: {UPLOAD_ENTITY_TYPES}'
+    
+    # Validate file type based on entity type
+    # Determine storage rules based on entity type
+    if entity_type == 'magazines':
+        allowed_extensions = ['.jpg', '.jpeg', '.png', '.pdf']
+        subdirectory_parts = []
+    elif entity_type == 'magazinesPdf':
+        allowed_extensions = ['.pdf']
+        subdirectory_parts = []
+    elif entity_type == 'ebooks':
+        cover_extensions = ['.jpg', '.jpeg', '.png', '.jfif']
+        document_extensions = ['.pdf']
+        
+        if file_purpose not in ['cover', 'document']:
+            return None, "file_purpose must be either 'cover' or 'document' for ebooks"
+        
+        if file_purpose == 'cover':
+            allowed_extensions = cover_extensions
+            subdirectory_parts = ['ebooks', 'covers']
+        else:
+            allowed_extensions = document_extensions
+            subdirectory_parts = ['ebooks', 'documents']
+    else:
+        allowed_extensions = ['.jpg', '.jpeg', '.png', '.jfif']
+        subdirectory_parts = []
+    
+    if file_extension not in allowed_extensions:
+        return None, f'Invalid file type. Supported extensions: {", ".join(allowed_extensions)}'
+    
+    # Build upload directory
+    base_upload_parts = ['uploads']
+    if entity_type == 'ebooks' and subdirectory_parts:
+        return base_upload_parts + subdirectory_parts, None
+    return base_upload_parts + [entity_type], None
+
+
+def get_stored_upload_data(relative_path, content_hash, created, entity_type, entity_id):
+    """
+    Helper function to queue the background processing of a stored upload and build the
+    upload response body.
+    """
+    file_extension = os.path.splitext(relative_path)[1].lower()
+    
+    # Render resized variants of new images in the background (manage.py run_worker)
+    if created and file_extension in IMAGE_EXTENSIONS:
+        enqueue('images.derivatives', {'relative_path': relative_path}, unique_key=f'images.derivatives:{relative_path}')
+    
+    # PDFs are processed once a magazine/ebook row is saved with them (adminpanel.pdf_pipeline)
+    
+    return {
+        'message': 'File uploaded successfully',
+        'file_url': build_media_url(relative_path),
+        'file_path': os.path.join(settings.MEDIA_ROOT, *relative_path.split('/')),
+        'filename': os.path.basename(relative_path),
+        'relative_path': relative_path,
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'content_hash': content_hash,
+        'deduplicated': not created
+    }
+
+
 class FileUploadView(APIView):
     permission_classes = [AllowAny]
     
@@ -2273,82 +2520,21 @@ class FileUploadView(APIView):
             if not entity_type or not entity_id:
                 return Response({'error': 'entity_type and entity_id are required'}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Validate entity type
-            valid_entity_types = ['articles', 'authors', 'gallery', 'magazines', 'publications', 'billboards', 'magazinesPdf', 'ebooks']
-            if entity_type not in valid_entity_types:
-                return Response({'error': f'Invalid entity_type. Must be one of: {valid_entity_types}'}, status=status.HTTP_400_BAD_REQUEST)
-            
             # Get file extension
             file_extension = os.path.splitext(file.name)[1].lower()
             
-            # Validate file type based on entity type
-            # Determine storage rules based on entity type
-            if entity_type == 'magazines':
-                allowed_extensions = ['.jpg', '.jpeg', '.png', '.pdf']
-                subdirectory_parts = []
-            elif entity_type == 'magazinesPdf':
-                allowed_extensions = ['.pdf']
-                subdirectory_parts = []
-            elif entity_type == 'ebooks':
-                cover_extensions = ['.jpg', '.jpeg', '.png', '.jfif']
-                document_extensions = ['.pdf']
-                
-                if file_purpose not in ['cover', 'document']:
-                    return Response({'error': "file_purpose must be either 'cover' or 'document' for ebooks"}, status=status.HTTP_400_BAD_REQUEST)
-                
-                if file_purpose == 'cover':
-                    allowed_extensions = cover_extensions
-                    subdirectory_parts = ['ebooks', 'covers']
-                else:
-                    allowed_extensions = document_extensions
-                    subdirectory_parts = ['ebooks', 'documents']
-            else:
-                allowed_extensions = ['.jpg', '.jpeg', '.png', '.jfif']
-                subdirectory_parts = []
-            
-            if file_extension not in allowed_extensions:
-                return Response({'error': f'Invalid file type. Supported extensions: {", ".join(allowed_extensions)}'}, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Build upload directory
-            base_upload_parts = ['uploads']
-            if entity_type == 'ebooks' and subdirectory_parts:
-                upload_parts = base_upload_parts + subdirectory_parts
-            else:
-                upload_parts = base_upload_parts + [entity_type]
-            
-            upload_dir = os.path.join(settings.MEDIA_ROOT, *upload_parts)
-            os.makedirs(upload_dir, exist_ok=True)
-            
-            # Generate filename with entity ID
-            if entity_type == 'magazinesPdf':
-                # Special naming convention for magazine PDFs: {id}-0-hilal-archive.pdf
-                filename = f"{entity_id}-0-hilal-archive.pdf"
-            else:
-                filename = f"{entity_id}{file_extension}"
-            file_path = os.path.join(upload_dir, filename)
-            
-            # Save the file
-            with open(file_path, 'wb') as destination:
-                for chunk in file.chunks():
-                    destination.write(chunk)
-            
-            # Generate the URL for the uploaded file
-            if entity_type == 'ebooks' and subdirectory_parts:
-                relative_path = os.path.join('uploads', *subdirectory_parts, filename).replace('\\', '/')
-            else:
-                relative_path = os.path.join('uploads', entity_type, filename).replace('\\', '/')
-            
-            file_url = f"{settings.MEDIA_URL}{relative_path}"
+            upload_parts, error = get_upload_parts(entity_type, file_purpose, file_extension)
+            if error:
+                return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
             
-            return Response({
-                'message': 'File uploaded successfully',
-                'file_url': file_url,
-                'file_path': file_path,
-                'filename': filename,
-                'relative_path': relative_path,
-                'entity_type': entity_type,
-                'entity_id': entity_id
-            }, status=status.HTTP_201_CREATED)
+            # Stream to a temporary file while hashing, then rename to <sha256><ext>:
+            # identical uploads are stored once and stored files never change
+            relative_path, content_hash, created = store_upload(file.chunks(), upload_parts, file_extension)
+            
+            return Response(
+                get_stored_upload_data(relative_path, content_hash, created, entity_type, entity_id),
+                status=status.HTTP_201_CREATED
+            )
             
         except Exception as e:
             return Response({
@@ -2356,10 +2542,157 @@ class FileUploadView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def parse_content_range_start(header, size):
+    """
+    Helper function to get the first byte offset of a `Content-Range: bytes start-end/size`
+    request header, or None when it is absent. Raises ValueError when it is malformed or
+    names another file size.
+    """
+    if not header:
+        return None
+    match = re.match(r'^bytes (\d+)-(\d+)/(\d+|\*)$', header.strip())
+    if not match or (match.group(3) != '*' and int(match.group(3)) != size):
+        raise ValueError(f'Invalid Content-Range header: {header}')
+    return int(match.group(1))
+
+
+class ChunkedUploadCreateView(APIView):
+    """
+    API to start a resumable chunked upload (see adminpanel.chunked_uploads).
+    """
+    permission_classes = [AllowAny]
+    
+    def post(self, request):
+        try:
+            filename = request.data.get('filename')
+            size = request.data.get('size')
+            entity_type = request.data.get('entity_type')
+            entity_id = request.data.get('entity_id')
+            file_purpose = (request.data.get('file_purpose') or '').lower()
+            chunk_size = request.data.get('chunk_size')
+            
+            if not filename or size in (None, ''):
+                return Response({'error': 'filename and size are required'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            if not entity_type or not entity_id:
+                return Response({'error': 'entity_type and entity_id are required'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            try:
+                size = int(size)
+                chunk_size = int(chunk_size) if chunk_size not in (None, '') else None
+            except (TypeError, ValueError):
+                return Response({'error': 'size and chunk_size must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            file_extension = os.path.splitext(filename)[1].lower()
+            upload_parts, error = get_upload_parts(entity_type, file_purpose, file_extension)
+            if error:
+                return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+            
+            session = create_session(
+                os.path.basename(filename), size, upload_parts, entity_type, entity_id, file_purpose,
+                sha256=request.data.get('sha256') or None, chunk_size=chunk_size
+            )
+            return Response({
+                'message': 'Upload session created successfully',
+                **get_session_status(session),
+                'chunk_url': f"/api/uploads/{session['upload_id']}/chunks/{{index}}/",
+                'complete_url': f"/api/uploads/{session['upload_id']}/complete/"
+            }, status=status.HTTP_201_CREATED)
+        
+        except ChunkedUploadError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        except Exception as e:
+            return Response({
+                'error': f'Error creating upload session: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ChunkedUploadView(APIView):
+    """
+    API to get the progress of a chunked upload (GET) or cancel it (DELETE).
+    """
+    permission_classes = [AllowAny]
+    
+    def get(self, request, upload_id):
+        try:
+            return Response(get_session_status(load_session(upload_id)), status=status.HTTP_200_OK)
+        except ChunkedUploadError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+    
+    def delete(self, request, upload_id):
+        try:
+            delete_session(load_session(upload_id))
+            return Response({'message': 'Upload session deleted successfully'}, status=status.HTTP_200_OK)
+        except ChunkedUploadError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+
+
+class ChunkedUploadChunkView(APIView):
+    """
+    API to upload one chunk of a chunked upload as the raw request body.
+    Optional headers: Content-Range (checked against the chunk's offset) and
+    X-Chunk-SHA256 (checked against the bytes received).
+    """
+    permission_classes = [AllowAny]
+    
+    def put(self, request, upload_id, index):
+        try:
+            session = load_session(upload_id)
+            try:
+                offset = parse_content_range_start(request.META.get('HTTP_CONTENT_RANGE'), session['size'])
+                content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            
+            # request.stream reads the body as it arrives; request.data would buffer it
+            chunk_hash = write_chunk(
+                session, index, request.stream, content_length,
+                offset=offset, sha256=request.META.get('HTTP_X_CHUNK_SHA256')
+            )
+            progress = get_session_status(session)
+            return Response({
+                'message': f'Chunk {index} uploaded successfully',
+                'chunk_sha256': chunk_hash,
+                'bytes_received': progress['bytes_received'],
+                'missing_chunks': progress['missing_chunks']
+            }, status=status.HTTP_200_OK)
+        
+        except ChunkedUploadError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        except Exception as e:
+            return Response({
+                'error': f'Error uploading chunk: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ChunkedUploadCompleteView(APIView):
+    """
+    API to finish a chunked upload: the file is checked and stored like a FileUploadView upload.
+    """
+    permission_classes = [AllowAny]
+    
+    def post(self, request, upload_id):
+        try:
+            session = load_session(upload_id)
+            relative_path, content_hash, created = complete_session(session)
+            return Response({
+                **get_stored_upload_data(relative_path, content_hash, created, session['entity_type'], session['entity_id']),
+                'upload_id': upload_id
+            }, status=status.HTTP_201_CREATED)
+        
+        except ChunkedUploadError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        except Exception as e:
+            return Response({
+                'error': f'Error completing upload: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 # Contributors Related Views
 class GetContributorsView(APIView):
     permission_classes = [AllowAny]
 
+    @conditional_response(Contributors)
     def get(self, request):
         """
         Get all contributors, optionally filtered by publication
@@ -2398,6 +2731,8 @@ class GetContributorsView(APIView):
 class GetContributorsByPublicationView(APIView):
     permission_classes = [AllowAny]
 
+    @conditional_response(Contributors, Publications)
+    @cached_response(Contributors, Publications)
     def get(self, request):
         """
         Get contributors grouped by publication
@@ -2436,3 +2771,27 @@ class GetContributorsByPublicationView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class ResponseCacheStatsView(APIView):
+    """
+    API to get hit/miss counters of the response cache, overall and per cached view.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            "message": "Response cache stats retrieved successfully",
+            "data": get_cache_stats()
+        }, status=status.HTTP_200_OK)
+
+
+class JobQueueStatsView(APIView):
+    """
+    API to get the depth and latency of the background job queue (manage.py run_worker).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            "message": "Job queue stats retrieved successfully",
+            "data": get_queue_stats()
+        }, status=status.HTTP_200_OK)
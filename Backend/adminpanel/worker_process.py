@@ -0,0 +1,18 @@
+"""
+Initializer of the process pool of `manage.py run_worker`.
+
+The pool's children are started by a forkserver, not forked from the worker, which runs
+heartbeat and job threads by then. A child starts as a fresh interpreter: it imports this
+module before Django is set up, so it must not import models (adminpanel.jobs does).
+"""
+import signal
+
+import django
+
+
+def init_process():
+    # Ctrl+C reaches the whole process group; the parent decides when children stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    # Loads the apps, which registers the tasks (adminpanel.tasks)
+    django.setup()
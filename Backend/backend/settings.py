@@ -157,6 +157,45 @@ DATABASES = {
     }
 }
 
+# Cache used for versioned API responses (adminpanel/response_cache.py).
+# File-based by default so every gunicorn worker on the host shares it;
+# set CACHE_BACKEND/CACHE_LOCATION to point at Redis or Memcached instead.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')),
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        }
+    }
+}
+
+# Upper bound for a cached response; writes invalidate entries long before this
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 60 * 60))
+
+# Trending articles (adminpanel/trending.py): per publication, the category slots of the
+# trending strip in display order. Each slot lists category names to try in order; the
+# first active one is used. Publications not listed use their first three categories.
+TRENDING_CATEGORIES = {
+    'hilal-english': [
+        ['in-focus'],
+        ['national-news'],
+        ['miscellaneous'],
+    ],
+    'hilal-urdu': [
+        ['special-focus', 'in-focus'],
+        ['national-and-international-issues', 'national-news'],
+        ['miscellaneous'],
+    ],
+}
+
+# Article view counting (adminpanel/view_counter.py): views are buffered per process
+# and flushed as batched UPDATEs; trending_score halves every TRENDING_HALF_LIFE_HOURS
+ARTICLE_VIEWS_FLUSH_INTERVAL = int(os.getenv('ARTICLE_VIEWS_FLUSH_INTERVAL', 60))
+ARTICLE_VIEWS_FLUSH_THRESHOLD = 1000
+TRENDING_HALF_LIFE_HOURS = 48
+
 # Override Django's MariaDB version check to work with 10.4.32
 import django.db.backends.mysql.base as mysql_base
 import django.db.backends.mysql.features as mysql_features
@@ -308,4 +347,46 @@ SOCIAL_AUTH_FACEBOOK_PROFILE_EXTRA_PARAMS = {
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Media serving (adminpanel/media.py). Behind nginx, set MEDIA_ACCEL_REDIRECT_PREFIX to
+# an internal location aliased to MEDIA_ROOT so nginx sends the files; behind Apache or
+# lighttpd, set MEDIA_SENDFILE_HEADER (e.g. X-Sendfile). Otherwise gunicorn sendfile()s them.
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '')
+MEDIA_SENDFILE_HEADER = os.getenv('MEDIA_SENDFILE_HEADER', '')
+MEDIA_CACHE_CONTROL = os.getenv('MEDIA_CACHE_CONTROL', 'public, max-age=3600')
+
+# Host media URLs in API responses point at (adminpanel/media_urls.py), e.g. a CDN in
+# front of /media/: 'https://cdn.example.com'. Unset, they are relative to MEDIA_URL, or
+# absolute under the request's host where the serializer is given the request. Required
+# in production (`check --deploy` fails, adminpanel.E001): the client runs on another origin.
+MEDIA_HOST = os.getenv('MEDIA_HOST', '')
+
+# Uploaded magazine/ebook PDFs (adminpanel/pdf_pipeline.py): page previews are rendered
+# at this width. Needs the optional pikepdf/pypdf/pypdfium2/Pillow packages (or the
+# qpdf/pdftoppm binaries); steps whose tools are missing are skipped.
+PDF_PREVIEW_WIDTH = int(os.getenv('PDF_PREVIEW_WIDTH', 1200))
+PDF_PREVIEW_QUALITY = 80
+
+# Resized variants of uploaded images (adminpanel/images.py), by name and width in
+# pixels; serializers expose them as <field>_srcset. Needs the optional Pillow package.
+IMAGE_VARIANTS = {'thumb': 320, 'card': 640, 'hero': 1280}
+IMAGE_QUALITY = 80
+
+# Background jobs (adminpanel/jobs.py), run by `python manage.py run_worker`: failed
+# jobs are retried after JOB_RETRY_BASE_DELAY * 2 ** (attempt - 1) seconds. Workers send a
+# heartbeat for their running jobs every JOB_HEARTBEAT_INTERVAL seconds; a job without one
+# for JOB_LOCK_TIMEOUT seconds is assumed abandoned and requeued (or failed, when it has
+# used all of its attempts).
+JOB_RETRY_BASE_DELAY = 30
+JOB_RETRY_MAX_DELAY = 6 * 60 * 60
+JOB_HEARTBEAT_INTERVAL = 30
+JOB_LOCK_TIMEOUT = 5 * 60
+JOB_RETENTION_DAYS = 7
+
+# Resumable chunked uploads (adminpanel/chunked_uploads.py): default chunk size, largest
+# file accepted, and seconds without activity after which a session is deleted. The
+# front server's body size limit (nginx client_max_body_size) only has to fit one chunk.
+CHUNKED_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_SIZE = 1024 * 1024 * 1024
+CHUNKED_UPLOAD_EXPIRY = 24 * 60 * 60
+
 
@@ -62,6 +62,10 @@ DATABASES = {
     }
 }
 
+# The client runs on another origin: media URLs in API responses must be absolute.
+# Required, with no fallback, so a deploy without it fails instead of serving wrong URLs.
+MEDIA_HOST = os.environ['MEDIA_HOST']
+
 # Update CORS settings for production
 CORS_ALLOWED_ORIGINS = ["https://lunarismanagement.com", "https://www.lunarismanagement.com"]
 
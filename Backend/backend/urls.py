@@ -15,9 +15,9 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path,include
+from django.urls import path,include,re_path
 from django.conf import settings
-from django.conf.urls.static import static
+from adminpanel.media import serve_media
 from api.views import CreateUserView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from api.views import GoogleLoginAPIView,LoginView,RefreshTokenView
@@ -33,12 +33,13 @@ from api.views import LogoutAPIView
 from adminpanel.views import SingleBillboardView, CreateBillboardView, GetAllBillboardsView
 from adminpanel.views import DeleteBillboardView
 from adminpanel.views import GetBillboardByPositionView,GetBillboardsByLocationView,GetAllEbooksView,SingleEbookView,CreateOrUpdateEbookView,GetArchivedEbooksView,GetActiveEbooksView,ToggleEbookArchiveView
-from adminpanel.views import GetAllMagazinesView, SingleMagazineView, CreateOrUpdateMagazineView, ForceDeleteMagazineView
+from adminpanel.views import GetAllMagazinesView, SingleMagazineView, CreateOrUpdateMagazineView, ForceDeleteMagazineView, MagazineContentsView
 from adminpanel.views import CreateAuthorView, GetAllAuthorsView, SingleAuthorView
 from adminpanel.views import GetAllVideosView, SingleVideoView, CreateVideoView, GetAllVideosManagementView, DashboardStatsView, GetHilalDigitalView
 from adminpanel.views import CreatePublicationView, GetAllPublicationsView, SinglePublicationView, GetArticlesByPublicationView, GetActivePublicationsView
 from adminpanel.views import GetArticlesByPublicationNameView
-from adminpanel.views import CreateCategoryView, GetAllCategoriesView, SingleCategoryView, GetActiveCategoriesView, GetFilteredArticlesView, GetTrendingArticlesView, GetMagazineAssignmentsView, GetPreviousMonthMagazinesView, GetFilteredMagazineArticlesView, FileUploadView, GetContributorsView, GetContributorsByPublicationView
+from adminpanel.views import CreateCategoryView, GetAllCategoriesView, SingleCategoryView, GetActiveCategoriesView, GetFilteredArticlesView, GetTrendingArticlesView, GetMagazineAssignmentsView, GetPreviousMonthMagazinesView, GetFilteredMagazineArticlesView, FileUploadView, ChunkedUploadCreateView, ChunkedUploadView, ChunkedUploadChunkView, ChunkedUploadCompleteView, GetContributorsView, GetContributorsByPublicationView
+from adminpanel.views import ResponseCacheStatsView, JobQueueStatsView, GetPopularArticlesView, GetHomePageView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -81,6 +82,7 @@ urlpatterns = [
     path('api/magazines/', GetAllMagazinesView.as_view(), name='get-all-magazines'),  # Get all magazines
     path('api/magazine/<int:pk>/', SingleMagazineView.as_view(), name='single-magazine'),  # Get or delete a single magazine
     path('api/magazine/force-delete/<int:pk>/', ForceDeleteMagazineView.as_view(), name='force-delete-magazine'),  # Force delete magazine (unassigns articles)
+    path('api/magazine/<int:pk>/contents/', MagazineContentsView.as_view(), name='magazine-contents'),  # Get the frozen table of contents of a magazine issue
     path('api/magazine/create/', CreateOrUpdateMagazineView.as_view(), name='create-magazine'),  # Create a new magazine
     path('api/magazine/update/<int:pk>/', CreateOrUpdateMagazineView.as_view(), name='update-magazine'),  # Update a magazine
 
@@ -125,14 +127,29 @@ urlpatterns = [
     path('api/articles/magazine-filtered/', GetFilteredMagazineArticlesView.as_view(), name='filtered-magazine-articles'),  # Get magazine articles with year/month/publication filters
     path('api/articles/publication/<str:publication_name>/', GetArticlesByPublicationView.as_view(), name='articles-by-publication'),  # Get articles by publication for current month
     path('api/articles/trending/<str:publication_name>/', GetTrendingArticlesView.as_view(), name='trending-articles'),  # Get latest 6 trending articles for a publication
+    path('api/articles/popular/<str:publication_name>/', GetPopularArticlesView.as_view(), name='popular-articles'),  # Get most viewed articles (time-decayed) for a publication
+    path('api/home/<str:publication_name>/', GetHomePageView.as_view(), name='home-page'),  # Get all landing page sections for a publication in one request
     path('api/magazine-assignments/', GetMagazineAssignmentsView.as_view(), name='magazine-assignments'),  # Get magazine assignment statistics
     path('api/magazines/previous/<str:publication_name>/', GetPreviousMonthMagazinesView.as_view(), name='previous-month-magazines'),  # Get previous month magazines for publication
     
     # File upload URL
     path('api/upload-file/', FileUploadView.as_view(), name='upload-file'),  # File upload endpoint
+    path('api/uploads/', ChunkedUploadCreateView.as_view(), name='chunked-upload-create'),  # Start a resumable chunked upload
+    path('api/uploads/<str:upload_id>/', ChunkedUploadView.as_view(), name='chunked-upload'),  # Progress (GET) or cancel (DELETE) a chunked upload
+    path('api/uploads/<str:upload_id>/chunks/<int:index>/', ChunkedUploadChunkView.as_view(), name='chunked-upload-chunk'),  # PUT one chunk
+    path('api/uploads/<str:upload_id>/complete/', ChunkedUploadCompleteView.as_view(), name='chunked-upload-complete'),  # Check and store the uploaded file
     
     # Contributors URLs
     path('api/contributors/', GetContributorsView.as_view(), name='contributors'),  # Get all contributors
     path('api/contributors/by-publication/', GetContributorsByPublicationView.as_view(), name='contributors-by-publication'),  # Get contributors grouped by publication
+    
+    # Response cache URLs
+    path('api/cache/stats/', ResponseCacheStatsView.as_view(), name='response-cache-stats'),  # Hit/miss counters of the response cache
+
+    # Background job queue URLs
+    path('api/jobs/stats/', JobQueueStatsView.as_view(), name='job-queue-stats'),  # Depth and latency of the job queue
+
+    # Uploaded media: ranges, conditional requests and sendfile/X-Accel-Redirect hand-off
+    re_path(r'^%s(?P<path>.+)$' % settings.MEDIA_URL.lstrip('/'), serve_media, name='media'),
 
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
@@ -3,6 +3,8 @@
 # Monthly Magazine Assignment Script
 # This script runs the Django management command to assign magazine IDs to articles
 # It should be run at the end of each month (e.g., on the 1st of each month at 2 AM)
+# Articles are also assigned when they or their magazine are saved; this run backfills
+# anything those writes missed
 
 # Set the Django project directory
 DJANGO_DIR="/Users/moinkhan/Coding/hilal-main/hilal_server/backend"
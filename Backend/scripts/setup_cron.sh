@@ -2,6 +2,8 @@
 
 # Setup script for monthly magazine assignment cron job
 # This script adds the cron job to run the magazine assignment on the 1st of each month at 2 AM
+# Not needed where `python manage.py run_worker` runs: the worker schedules the same
+# assignment as its periodic 'magazines.assign' job
 
 SCRIPT_DIR="/Users/moinkhan/Coding/hilal-main/hilal_server/backend/scripts"
 CRON_JOB="0 2 1 * * $SCRIPT_DIR/monthly_magazine_assignment.sh"